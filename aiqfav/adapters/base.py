@@ -50,6 +50,61 @@ class StoreApiAdapter(abc.ABC):
             StoreApiUnexpectedResponseError: in case of unexpected response.
         """
 
+    @abc.abstractmethod
+    async def sync_catalog(self) -> int:
+        """Pull the whole catalog from the store API and refresh the cache
+
+        Returns:
+            int: the number of products that changed since the last sync.
+
+        Raises:
+            StoreApiUnavailableError: if the store API is unavailable.
+            StoreApiUnexpectedResponseError: in case of unexpected response.
+        """
+
+
+class PasswordHasher(abc.ABC):
+    """Base class for password hashers"""
+
+    @abc.abstractmethod
+    async def hash(self, password: str) -> str:
+        """Hash a password
+
+        Args:
+            password (str): The plain password.
+
+        Returns:
+            str: The password hash.
+        """
+
+    @abc.abstractmethod
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        """Verify a password against a hash
+
+        Args:
+            password (str): The plain password.
+            hashed_password (str): The password hash.
+
+        Returns:
+            bool: whether the password matches the hash.
+        """
+
+    @abc.abstractmethod
+    async def verify_and_update(
+        self, password: str, hashed_password: str
+    ) -> tuple[bool, str | None]:
+        """Verify a password against a hash, rehashing it if the hash was
+        made with outdated parameters
+
+        Args:
+            password (str): The plain password.
+            hashed_password (str): The password hash.
+
+        Returns:
+            tuple[bool, str | None]: whether the password matches the
+                hash, and the new hash to store, if it needs an update.
+        """
+
 
 class JwtAdapter(abc.ABC):
     """Base class for JWT adapters"""
@@ -0,0 +1,24 @@
+import time
+from typing import Callable
+
+__all__ = ['CatalogIndex']
+
+
+class CatalogIndex:
+    """In-memory id -> product map built from the catalog snapshot.
+
+    While the snapshot is fresh, the index is authoritative: a product
+    that is not in it does not exist in the store API.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self.clock = clock
+        self.products: dict[int, dict] = {}
+        self.fresh_until = 0.0
+
+    def load(self, products: list[dict], fresh_until: float) -> None:
+        self.products = {product['id']: product for product in products}
+        self.fresh_until = fresh_until
+
+    def is_fresh(self) -> bool:
+        return self.clock() < self.fresh_until
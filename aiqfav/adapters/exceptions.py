@@ -17,6 +17,10 @@ class StoreApiNotFoundError(StoreApiAdapterException):
     """Exception for not found errors from store API adapters"""
 
 
+class StoreApiUnavailableError(StoreApiAdapterException):
+    """Exception for when the store API is unreachable or unhealthy"""
+
+
 class JwtAdapterException(Exception):
     """Base exception for JWT adapters"""
 
@@ -1,123 +1,530 @@
 import asyncio
 import json
 import logging
-from typing import Callable, Iterable
+import math
+import time
+from functools import partial
+from typing import Any, Awaitable, Callable, Iterable
 
 import httpx
 
 from aiqfav.adapters.redis_adapter import RedisAsyncProtocol
 from aiqfav.domain.product import ProductPublic
+from aiqfav.utils.background import run_in_background
+from aiqfav.utils.cache import CacheEntry, CacheStats, TTLCache
+from aiqfav.utils.circuit_breaker import CircuitBreaker, CircuitOpenError
 from aiqfav.utils.httpx import raise_for_status
+from aiqfav.utils.singleflight import SingleFlight
 
 from .base import StoreApiAdapter
-from .exceptions import StoreApiNotFoundError, StoreApiUnexpectedResponseError
+from .catalog_index import CatalogIndex
+from .exceptions import (
+    StoreApiNotFoundError,
+    StoreApiUnavailableError,
+    StoreApiUnexpectedResponseError,
+)
 
 __all__ = ['FakeStoreApi']
 
+CATALOG_INDEX_KEY = 'products:index'
+CATALOG_INDEX_FRESH_UNTIL = 'fresh_until'
+
 
 class FakeStoreApi(StoreApiAdapter):
+    """Adapter for the Fake Store API (https://fakestoreapi.com).
+
+    Products are cached in Redis with stale-while-revalidate semantics:
+    `cache_expiration` is the hard TTL, after which a read blocks on the
+    store API, and `cache_soft_expiration` is the soft TTL, after which a
+    read serves the cached product and refreshes it in background.
+
+    Unknown products are cached as well (negative caching), for
+    `negative_cache_expiration` seconds, so repeated lookups of a missing
+    id don't reach the store API. Calls to the store API go through a
+    circuit breaker: while it is open, they fail fast with
+    `StoreApiUnavailableError` and stale products keep being served.
+    """
+
     def __init__(
         self,
         base_url: str,
-        client_factory: Callable[[], httpx.AsyncClient],
+        client: httpx.AsyncClient,
         redis: RedisAsyncProtocol,
         cache_expiration: int = 60 * 60,
+        cache_soft_expiration: int | None = None,
+        cache_stats: CacheStats | None = None,
+        batch_concurrency: int = 10,
+        single_flight: SingleFlight | None = None,
+        fill_lock_timeout: float | None = None,
+        local_cache: TTLCache[ProductPublic] | None = None,
+        catalog_index: CatalogIndex | None = None,
+        negative_cache_expiration: int = 60,
+        circuit_breaker: CircuitBreaker | None = None,
     ):
         assert isinstance(base_url, str) and base_url, (
             'base_url must be a non-empty string'
         )
         self.base_url = base_url.rstrip('/')
-        self.client_factory = client_factory
+        self.client = client
         self.redis = redis
         self.cache_expiration = cache_expiration
+        self.cache_soft_expiration = cache_soft_expiration or cache_expiration
+        self.cache_stats = cache_stats or CacheStats()
+        self.batch_concurrency = batch_concurrency
+        self.single_flight = single_flight or SingleFlight()
+        self.fill_lock_timeout = fill_lock_timeout
+        self.local_cache = local_cache
+        self.catalog_index = catalog_index or CatalogIndex()
+        self.negative_cache_expiration = negative_cache_expiration
+        self.circuit_breaker = circuit_breaker or CircuitBreaker('store_api')
 
     async def list_products(self) -> list[ProductPublic]:
         """List products from the store API"""
         logging.info('Listing products from the store API')
 
-        async with self.client_factory() as client:
-            cached_data = await self.redis.get('products')
-            if cached_data:
-                logging.debug('Cache hit for products')
-                return [
-                    self._validate_product(product)
-                    for product in json.loads(cached_data)
-                ]
-            else:
-                logging.debug('Cache miss for products')
+        entry = self._load_entry(
+            await self.redis.get('products'),
+            'products',
+            self._fetch_and_cache_products,
+        )
+        if entry is not None:
+            logging.debug('Cache hit for products')
+            self.cache_stats.hits += 1
+            data = entry.value
+            if not self.catalog_index.is_fresh():
+                self.catalog_index.load(data, entry.fresh_until)
+        else:
+            logging.debug('Cache miss for products')
+            self.cache_stats.misses += 1
+            data = await self._fill_cache(
+                'products', self._fetch_and_cache_products
+            )
+
+        return [self._validate_product(product) for product in data]
+
+    async def get_product(self, product_id: int) -> ProductPublic:
+        """Get a product from the store API"""
+        logging.info('Getting product %s from the store API', product_id)
 
-            response = await client.get(f'{self.base_url}/products')
+        key = f'product:{product_id}'
+        if self.local_cache is not None and (
+            product := self.local_cache.get(key)
+        ):
+            logging.debug('Local cache hit for product %s', product_id)
+            return product
 
-            data = raise_for_status(
-                response,
-                exc_class=StoreApiUnexpectedResponseError,
+        if self.catalog_index.is_fresh():
+            logging.debug('Catalog index lookup for product %s', product_id)
+            # Answered without Redis nor the store API, even if not found
+            self.cache_stats.hits += 1
+            data = self._lookup_local_catalog_index([product_id])[product_id]
+            return self._cache_locally(self._validate_product(data))
+
+        entry = self._load_entry(
+            await self.redis.get(key),
+            key,
+            lambda: self._load_product(product_id),
+        )
+        if entry is not None:
+            logging.debug('Cache hit for product %s', product_id)
+            self.cache_stats.hits += 1
+            data = entry.value
+        else:
+            logging.debug('Cache miss for product %s', product_id)
+            self.cache_stats.misses += 1
+            data = await self._fill_cache(
+                key, lambda: self._load_product(product_id)
             )
 
-            assert isinstance(data, list)
-            await self.redis.set(
-                'products', json.dumps(data), ex=self.cache_expiration
+        if data is None:
+            raise StoreApiNotFoundError(f'Product {product_id} not found')
+
+        return self._cache_locally(self._validate_product(data))
+
+    async def get_products_in_batch(
+        self, product_ids: Iterable[int]
+    ) -> list[ProductPublic]:
+        """Get products in batch from the store API.
+
+        Reads all the cached products with a single MGET and looks the
+        missing ones up in the catalog index with a single HMGET. Only the
+        products still missing are fetched from the store API (at most
+        `batch_concurrency` at a time), and everything found is written
+        back to the cache in a single pipeline. Stale products are served
+        and refreshed in background.
+        """
+        product_ids = list(product_ids)
+        logging.info(
+            'Getting products in batch %s from the store API', product_ids
+        )
+        if not product_ids:
+            return []
+
+        products: dict[int, ProductPublic] = {}
+        if self.local_cache is not None:
+            for product_id in product_ids:
+                if product := self.local_cache.get(f'product:{product_id}'):
+                    products[product_id] = product
+
+        uncached_ids = [
+            product_id
+            for product_id in dict.fromkeys(product_ids)
+            if product_id not in products
+        ]
+        if uncached_ids and self.catalog_index.is_fresh():
+            logging.debug('Catalog index lookup for products %s', uncached_ids)
+            self.cache_stats.hits += len(uncached_ids)
+            for product_id, data in self._lookup_local_catalog_index(
+                uncached_ids
+            ).items():
+                products[product_id] = self._cache_locally(
+                    self._validate_product(data)
+                )
+            uncached_ids = []
+
+        if not uncached_ids:
+            return [products[product_id] for product_id in product_ids]
+
+        cached_data = await self.redis.mget(
+            [f'product:{product_id}' for product_id in uncached_ids]
+        )
+        for product_id, cached_product in zip(uncached_ids, cached_data):
+            entry = self._load_entry(
+                cached_product,
+                f'product:{product_id}',
+                partial(self._load_product, product_id),
             )
+            if entry is not None:
+                data = entry.value
+                if data is None:
+                    raise StoreApiNotFoundError(
+                        f'Product {product_id} not found'
+                    )
+                products[product_id] = self._cache_locally(
+                    self._validate_product(data)
+                )
+
+        missing_ids = [
+            product_id
+            for product_id in uncached_ids
+            if product_id not in products
+        ]
+        self.cache_stats.hits += len(uncached_ids) - len(missing_ids)
+        self.cache_stats.misses += len(missing_ids)
+
+        if missing_ids:
+            logging.debug('Cache miss for products %s', missing_ids)
+            loaded = await self._lookup_catalog_index(missing_ids)
+            if loaded is None:
+                semaphore = asyncio.Semaphore(self.batch_concurrency)
+
+                async def fetch_product(product_id: int) -> dict:
+                    # Not keyed as `product:{id}`: the loads in flight
+                    # under it (`_fill_cache`) may return a tombstone
+                    async with semaphore:
+                        return await self.single_flight.do(
+                            f'product-fetch:{product_id}',
+                            lambda: self._fetch_product(product_id),
+                        )
+
+                fetched = await asyncio.gather(
+                    *[fetch_product(product_id) for product_id in missing_ids]
+                )
+                loaded = dict(zip(missing_ids, fetched))
 
             pipeline = self.redis.pipeline()
-            for product in data:
+            for product_id, data in loaded.items():
+                products[product_id] = self._cache_locally(
+                    self._validate_product(data)
+                )
                 pipeline.set(
-                    f'product:{product["id"]}',
-                    json.dumps(product),
+                    f'product:{product_id}',
+                    self._dump_entry(data),
                     ex=self.cache_expiration,
                 )
             await pipeline.execute()
 
-            return [self._validate_product(product) for product in data]
+        return [products[product_id] for product_id in product_ids]
 
-    async def get_product(self, product_id: int) -> ProductPublic:
-        """Get a product from the store API"""
-        logging.info('Getting product %s from the store API', product_id)
+    def _lookup_local_catalog_index(
+        self, product_ids: list[int]
+    ) -> dict[int, dict]:
+        """Look products up in the (fresh) in-memory catalog index.
 
-        async with self.client_factory() as client:
-            response = await client.get(
-                f'{self.base_url}/products/{product_id}'
-            )
+        Raises:
+            StoreApiNotFoundError: if one of the products is not in the
+                catalog.
+        """
+        products = self.catalog_index.products
+        for product_id in product_ids:
+            if product_id not in products:
+                raise StoreApiNotFoundError(
+                    f'Product {product_id} is not in the catalog'
+                )
+        return {product_id: products[product_id] for product_id in product_ids}
 
-            cached_data = await self.redis.get(f'product:{product_id}')
-            if cached_data:
-                logging.debug('Cache hit for product %s', product_id)
-                return self._validate_product(json.loads(cached_data))
-            else:
-                logging.debug('Cache miss for product %s', product_id)
+    async def _lookup_catalog_index(
+        self, product_ids: list[int]
+    ) -> dict[int, dict] | None:
+        """Look products up in the catalog index kept in Redis.
+
+        Returns:
+            dict[int, dict] | None: the products by id, or None if there
+                is no fresh catalog snapshot to answer from.
+
+        Raises:
+            StoreApiNotFoundError: if the snapshot is fresh and one of the
+                products is not in the catalog.
+        """
+        fresh_until, *cached_products = await self.redis.hmget(
+            CATALOG_INDEX_KEY,
+            [CATALOG_INDEX_FRESH_UNTIL, *map(str, product_ids)],
+        )
+        if fresh_until is None or float(fresh_until) <= time.time():
+            return None
 
-            # Since the fake store API returns status code 200
-            # with an empty body, we can't check for status 404
-            if response.content == b'':
+        products = {}
+        for product_id, cached_product in zip(product_ids, cached_products):
+            if cached_product is None:
                 raise StoreApiNotFoundError(
-                    response.content, response.status_code
+                    f'Product {product_id} is not in the catalog'
                 )
+            products[product_id] = json.loads(cached_product)
+        return products
 
-            data = raise_for_status(
-                response,
-                exc_class=StoreApiUnexpectedResponseError,
+    def _cache_locally(self, product: ProductPublic) -> ProductPublic:
+        if self.local_cache is not None:
+            self.local_cache.set(f'product:{product.id}', product)
+        return product
+
+    def _dump_entry(self, data: Any) -> str:
+        return CacheEntry.create(data, self.cache_soft_expiration).dumps()
+
+    def _load_entry(
+        self,
+        cached_data: str | bytes | None,
+        key: str,
+        refresh: Callable[[], Awaitable[Any]],
+    ) -> CacheEntry | None:
+        """Load a cached entry, refreshing it in background if stale.
+
+        Returns None on a cache miss, including a value cached in a format
+        other than `CacheEntry`, which is then overwritten by the refill.
+        """
+        entry = CacheEntry.loads(cached_data) if cached_data else None
+        if entry is None:
+            return None
+        if entry.is_stale() and key not in self.single_flight:
+            logging.debug('Stale cache for %s, refreshing in background', key)
+            run_in_background(self._fill_cache(key, refresh))
+        return entry
+
+    async def _fill_cache(
+        self, key: str, load: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Load a missing cache key, at most once at a time.
+
+        Concurrent callers in this worker share a single in-flight `load`.
+        If `fill_lock_timeout` is set, a Redis lock (SET NX) extends this
+        to all workers: the ones that don't get the lock wait for the
+        cache to be filled by the lock owner, up to the timeout.
+        """
+        if not self.fill_lock_timeout:
+            return await self.single_flight.do(key, load)
+
+        async def load_with_lock() -> Any:
+            assert self.fill_lock_timeout
+            lock_key = f'lock:{key}'
+            acquired = await self.redis.set(
+                lock_key,
+                '1',
+                ex=math.ceil(self.fill_lock_timeout),
+                nx=True,
             )
+            if not acquired:
+                logging.debug('Waiting for another worker to fill %s', key)
+                cached_data = await self._wait_for_cache(key)
+                if cached_data and (entry := CacheEntry.loads(cached_data)):
+                    return entry.value
 
-            assert isinstance(data, dict)
-            await self.redis.set(
-                f'product:{product_id}',
-                json.dumps(data),
-                ex=self.cache_expiration,
+            try:
+                return await load()
+            finally:
+                if acquired:
+                    await self.redis.delete(lock_key)
+
+        return await self.single_flight.do(key, load_with_lock)
+
+    async def _wait_for_cache(
+        self, key: str, interval: float = 0.05
+    ) -> bytes | None:
+        assert self.fill_lock_timeout
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.fill_lock_timeout
+        while loop.time() < deadline:
+            await asyncio.sleep(interval)
+            if cached_data := await self.redis.get(key):
+                return cached_data
+        return None
+
+    async def _get(self, path: str) -> httpx.Response:
+        """Send a GET request to the store API through the circuit breaker.
+
+        Raises:
+            StoreApiUnavailableError: if the circuit is open, the request
+                fails at the transport level or the store API answers with
+                a server error.
+        """
+
+        async def get() -> httpx.Response:
+            response = await self.client.get(f'{self.base_url}{path}')
+            if response.status_code >= 500:
+                raise StoreApiUnavailableError(
+                    f'Store API answered {response.status_code} for {path}'
+                )
+            return response
+
+        try:
+            return await self.circuit_breaker.call(
+                get,
+                is_failure=lambda e: isinstance(
+                    e, (httpx.TransportError, StoreApiUnavailableError)
+                ),
             )
+        except CircuitOpenError as e:
+            raise StoreApiUnavailableError(str(e)) from e
+        except httpx.TransportError as e:
+            raise StoreApiUnavailableError(
+                f'Store API request to {path} failed: {e!r}'
+            ) from e
 
-            return self._validate_product(data)
+    async def sync_catalog(self) -> int:
+        """Pull the whole catalog from the store API and refresh the cache.
 
-    async def get_products_in_batch(
-        self, product_ids: Iterable[int]
-    ) -> list[ProductPublic]:
-        """Get products in batch from the store API"""
-        logging.info(
-            'Getting products in batch %s from the store API', product_ids
+        Only the products that changed since the cached snapshot are
+        rewritten; the others just have their expiration extended.
+        """
+        logging.info('Syncing the catalog from the store API')
+        data = await self._fetch_products()
+        return await self._cache_products(data)
+
+    async def _fetch_and_cache_products(self) -> list[dict]:
+        """Fetch all products from the store API and cache them"""
+        data = await self._fetch_products()
+        await self._cache_products(data)
+        return data
+
+    async def _fetch_products(self) -> list[dict]:
+        response = await self._get('/products')
+
+        data = raise_for_status(
+            response,
+            exc_class=StoreApiUnexpectedResponseError,
         )
 
-        # Usando asyncio.gather para executar as chamadas de forma concorrente
-        return await asyncio.gather(
-            *[self.get_product(product_id) for product_id in product_ids]
+        assert isinstance(data, list)
+        return data
+
+    async def _cache_products(self, data: list[dict]) -> int:
+        """Cache a catalog snapshot, diffing it against the cached one.
+
+        Returns:
+            int: the number of products added, changed or removed.
+        """
+        cached_data = await self.redis.get('products')
+        entry = CacheEntry.loads(cached_data) if cached_data else None
+        previous = {
+            product['id']: product
+            for product in (entry.value if entry is not None else [])
+        }
+        snapshot = CacheEntry.create(data, self.cache_soft_expiration)
+
+        pipeline = self.redis.pipeline()
+        pipeline.set('products', snapshot.dumps(), ex=self.cache_expiration)
+        changed = 0
+        for product in data:
+            key = f'product:{product["id"]}'
+            if previous.pop(product['id'], None) == product:
+                # Once stale, it's refreshed from the catalog index below
+                pipeline.expire(key, self.cache_expiration)
+            else:
+                changed += 1
+                pipeline.set(
+                    key, self._dump_entry(product), ex=self.cache_expiration
+                )
+        for product_id in previous:
+            changed += 1
+            pipeline.delete(f'product:{product_id}')
+
+        # Catalog index (id -> product), answering product cache misses
+        pipeline.delete(CATALOG_INDEX_KEY)
+        pipeline.hset(
+            CATALOG_INDEX_KEY,
+            mapping={
+                CATALOG_INDEX_FRESH_UNTIL: snapshot.fresh_until,
+                **{
+                    str(product['id']): json.dumps(product) for product in data
+                },
+            },
+        )
+        pipeline.expire(CATALOG_INDEX_KEY, self.cache_expiration)
+        await pipeline.execute()
+
+        self.catalog_index.load(data, snapshot.fresh_until)
+
+        logging.debug('Cached catalog with %s changed products', changed)
+        return changed
+
+    async def _load_product(self, product_id: int) -> dict:
+        """Load a product from the catalog index or the store API"""
+        products = await self._lookup_catalog_index([product_id])
+        if products is None:
+            return await self._fetch_and_cache_product(product_id)
+
+        data = products[product_id]
+        await self.redis.set(
+            f'product:{product_id}',
+            self._dump_entry(data),
+            ex=self.cache_expiration,
         )
+        return data
+
+    async def _fetch_and_cache_product(self, product_id: int) -> dict:
+        data = await self._fetch_product(product_id)
+        await self.redis.set(
+            f'product:{product_id}',
+            self._dump_entry(data),
+            ex=self.cache_expiration,
+        )
+        return data
+
+    async def _fetch_product(self, product_id: int) -> dict:
+        """Fetch a product from the store API, bypassing the cache.
+
+        Unknown products are cached as a tombstone (an entry with a null
+        value) for `negative_cache_expiration` seconds.
+        """
+        response = await self._get(f'/products/{product_id}')
+
+        # Since the fake store API returns status code 200
+        # with an empty body, we can't check for status 404
+        if response.content == b'':
+            await self.redis.set(
+                f'product:{product_id}',
+                CacheEntry.create(
+                    None, self.negative_cache_expiration
+                ).dumps(),
+                ex=self.negative_cache_expiration,
+            )
+            raise StoreApiNotFoundError(response.content, response.status_code)
+
+        data = raise_for_status(
+            response,
+            exc_class=StoreApiUnexpectedResponseError,
+        )
+
+        assert isinstance(data, dict)
+        return data
 
     def _validate_product(self, product: dict) -> ProductPublic:
         """Validate a product"""
@@ -0,0 +1,80 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, TypeVar
+
+from passlib.context import CryptContext
+
+from .base import PasswordHasher
+
+__all__ = ['PasswordHasherImpl']
+
+T = TypeVar('T')
+
+
+class PasswordHasherImpl(PasswordHasher):
+    """Password hasher running the CPU-heavy hashing and verification in
+    a bounded thread pool, off the event loop.
+
+    argon2 releases the GIL while hashing, so up to `max_workers` hashes
+    run in parallel while the event loop keeps serving other requests.
+    Calls beyond that wait in the pool queue, whose depth is exposed by
+    `stats`.
+    """
+
+    def __init__(self, pwd_context: CryptContext, max_workers: int = 2):
+        self.pwd_context = pwd_context
+        self.max_workers = max_workers
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix='password-hasher'
+        )
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+
+    async def hash(self, password: str) -> str:
+        return await self._run(self.pwd_context.hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._run(
+            self.pwd_context.verify, password, hashed_password
+        )
+
+    async def verify_and_update(
+        self, password: str, hashed_password: str
+    ) -> tuple[bool, str | None]:
+        return await self._run(
+            self.pwd_context.verify_and_update, password, hashed_password
+        )
+
+    def stats(self) -> dict[str, int]:
+        return {
+            'max_workers': self.max_workers,
+            'queued': self.queued,
+            'running': self.running,
+        }
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _run(self, fn: Callable[..., T], *args: object) -> T:
+        def call() -> T:
+            with self._lock:
+                self.queued -= 1
+                self.running += 1
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self.running -= 1
+
+        with self._lock:
+            self.queued += 1
+        future = self.executor.submit(call)
+        try:
+            return await asyncio.wrap_future(future)
+        finally:
+            # Cancelled while still waiting in the queue
+            if future.cancelled():
+                with self._lock:
+                    self.queued -= 1
@@ -1,14 +1,18 @@
 from datetime import timedelta
-from typing import Any, Protocol
+from typing import Any, Iterable, Mapping, Protocol, TypeVar
 
 import redis.asyncio as redis
 
+from aiqfav.utils.request_context import count_redis_command
+
 KeyT = bytes | str | memoryview
 ResponseT = Any
 EncodedT = bytes | bytearray | memoryview
 DecodedT = str | int | float
 EncodableT = EncodedT | DecodedT
+FieldT = EncodableT
 ExpiryT = int | timedelta
+AnyKeyT = TypeVar('AnyKeyT', bytes, str, memoryview)
 
 
 class PipelineAsyncProtocol(Protocol):
@@ -16,6 +20,14 @@ class PipelineAsyncProtocol(Protocol):
         self, name: KeyT, value: EncodableT, ex: ExpiryT | None = None
     ) -> ResponseT: ...
 
+    def delete(self, *names: KeyT) -> ResponseT: ...
+
+    def hset(
+        self, name: KeyT, *, mapping: Mapping[FieldT, EncodableT]
+    ) -> ResponseT: ...
+
+    def expire(self, name: KeyT, time: ExpiryT) -> ResponseT: ...
+
     async def execute(self) -> list[bool]: ...
 
 
@@ -27,9 +39,22 @@ class RedisAsyncProtocol(Protocol):
         key: KeyT,
         value: EncodableT,
         ex: ExpiryT | None = None,
+        nx: bool = False,
+    ) -> ResponseT: ...
+
+    async def delete(self, *names: KeyT) -> ResponseT: ...
+
+    async def mget(self, keys: Iterable[KeyT]) -> list[ResponseT | None]: ...
+
+    async def incr(self, key: KeyT) -> int: ...
+
+    async def mset(
+        self, mapping: Mapping[AnyKeyT, EncodableT]
     ) -> ResponseT: ...
 
-    async def delete(self, key: KeyT) -> int: ...
+    async def hmget(
+        self, name: KeyT, keys: Iterable[str]
+    ) -> list[ResponseT | None]: ...
 
     def pipeline(self) -> PipelineAsyncProtocol: ...
 
@@ -39,15 +64,52 @@ class RedisAdapter:
         self.client = client
 
     async def get(self, key: KeyT) -> ResponseT | None:
+        count_redis_command()
         return await self.client.get(key)
 
     async def set(
-        self, key: KeyT, value: EncodableT, ex: ExpiryT | None = None
+        self,
+        key: KeyT,
+        value: EncodableT,
+        ex: ExpiryT | None = None,
+        nx: bool = False,
     ) -> ResponseT:
-        return await self.client.set(key, value, ex)
+        count_redis_command()
+        return await self.client.set(key, value, ex, nx=nx)
+
+    async def delete(self, *names: KeyT) -> ResponseT:
+        count_redis_command()
+        return await self.client.delete(*names)
 
-    async def delete(self, key: KeyT) -> ResponseT:
-        return await self.client.delete(key)
+    async def mget(self, keys: Iterable[KeyT]) -> list[ResponseT | None]:
+        count_redis_command()
+        return await self.client.mget(keys)
+
+    async def incr(self, key: KeyT) -> int:
+        count_redis_command()
+        return await self.client.incr(key)
+
+    async def mset(self, mapping: Mapping[AnyKeyT, EncodableT]) -> ResponseT:
+        count_redis_command()
+        return await self.client.mset(mapping)
+
+    async def hmget(
+        self, name: KeyT, keys: Iterable[str]
+    ) -> list[ResponseT | None]:
+        count_redis_command()
+        return await self.client.hmget(name, list(keys))
 
     def pipeline(self) -> PipelineAsyncProtocol:
+        # The whole pipeline is sent in a single round trip
+        count_redis_command()
         return self.client.pipeline()
+
+    def pool_stats(self) -> dict[str, int]:
+        """Usage of the client's connection pool"""
+        pool = self.client.connection_pool
+        # redis-py has no public API for the pool usage
+        return {
+            'max_connections': pool.max_connections,
+            'in_use': len(pool._in_use_connections),
+            'available': len(pool._available_connections),
+        }
@@ -0,0 +1,86 @@
+from aiqfav.db.base import CustomerRepository
+from aiqfav.domain.customer import CustomerNotFound
+
+from .redis_adapter import RedisAsyncProtocol
+
+__all__ = ['TokenVersionStore']
+
+# Cached in place of the version of a deleted customer
+DELETED = -1
+
+
+class TokenVersionStore:
+    """Per-customer token versions, stored with the customer and cached in
+    Redis.
+
+    Tokens carry the customer's token version at the time they were
+    issued. Bumping the version (e.g. when a customer is deleted or has
+    their role changed) revokes every token issued before, without having
+    to look the customer up on each request.
+
+    The database is the source of truth: a version missing from the cache
+    (evicted, flushed) is loaded again, so revoked tokens never become
+    valid again; a deleted customer has no valid version at all.
+    """
+
+    def __init__(
+        self,
+        redis: RedisAsyncProtocol,
+        customer_repo: CustomerRepository,
+        cache_expiration: int = 60 * 60,
+    ):
+        self.redis = redis
+        self.customer_repo = customer_repo
+        self.cache_expiration = cache_expiration
+
+    async def get(self, customer_id: int) -> int:
+        """Get the current token version of a customer
+
+        Raises:
+            CustomerNotFound: if the customer cannot be found.
+        """
+        cached_version = await self.redis.get(self._key(customer_id))
+        if cached_version is not None:
+            version = int(cached_version)
+        else:
+            try:
+                version = await self.customer_repo.get_token_version(
+                    customer_id
+                )
+            except CustomerNotFound:
+                version = DELETED
+            # NX: a concurrent bump or delete wins over the version read
+            await self.redis.set(
+                self._key(customer_id),
+                version,
+                ex=self.cache_expiration,
+                nx=True,
+            )
+
+        if version == DELETED:
+            raise CustomerNotFound(f'Customer with id {customer_id} not found')
+        return version
+
+    async def bump(self, customer_id: int) -> int:
+        """Revoke the customer's tokens issued so far
+
+        Returns:
+            int: the new token version.
+
+        Raises:
+            CustomerNotFound: if the customer cannot be found.
+        """
+        version = await self.customer_repo.bump_token_version(customer_id)
+        await self.redis.set(
+            self._key(customer_id), version, ex=self.cache_expiration
+        )
+        return version
+
+    async def delete(self, customer_id: int) -> None:
+        """Revoke all the tokens of a deleted customer"""
+        await self.redis.set(
+            self._key(customer_id), DELETED, ex=self.cache_expiration
+        )
+
+    def _key(self, customer_id: int) -> str:
+        return f'token_version:{customer_id}'
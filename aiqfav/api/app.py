@@ -1,15 +1,71 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager, suppress
+from typing import AsyncIterator
 
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from aiqfav.adapters.exceptions import StoreApiUnavailableError
+from aiqfav.container import Container, env
+from aiqfav.utils.api_errors import ErrorCodes, get_error_response
+from aiqfav.utils.background import wait_background_tasks
+
+from .middleware import RequestContextMiddleware
 from .routes.v1.auth import router as auth_router_v1
 from .routes.v1.customers import router as customers_router_v1
+from .routes.v1.metrics import router as metrics_router_v1
 from .routes.v1.products import router as products_router_v1
 
 __all__ = ['create_app']
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Cria e libera os recursos compartilhados pelo worker"""
+    container = app.state.container = Container()
+
+    # Mantém o catálogo de produtos aquecido no cache (0 desabilita)
+    catalog_sync_task = None
+    if container.catalog_sync.interval > 0:
+        catalog_sync_task = asyncio.create_task(container.catalog_sync.run())
+    try:
+        yield
+    finally:
+        if catalog_sync_task is not None:
+            catalog_sync_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await catalog_sync_task
+        await wait_background_tasks(timeout=5)
+        await container.aclose()
+
+
+async def store_api_unavailable_handler(
+    request: Request, exc: Exception
+) -> JSONResponse:
+    """Responde 503 quando a API de loja está indisponível"""
+    return JSONResponse(
+        status_code=503,
+        content={
+            'detail': get_error_response(
+                error_code=ErrorCodes.STORE_API_UNAVAILABLE,
+                message='A API de produtos está indisponível no momento',
+            )
+        },
+        headers={'Retry-After': '30'},
+    )
+
+
 def create_app() -> FastAPI:
-    app = FastAPI()
+    app = FastAPI(lifespan=lifespan)
+    app.add_middleware(
+        RequestContextMiddleware,
+        stats_headers=env.bool('REQUEST_STATS_HEADERS', False),
+    )
+    app.add_exception_handler(
+        StoreApiUnavailableError, store_api_unavailable_handler
+    )
     app.include_router(auth_router_v1, prefix='/v1')
     app.include_router(customers_router_v1, prefix='/v1')
     app.include_router(products_router_v1, prefix='/v1')
+    app.include_router(metrics_router_v1, prefix='/v1')
     return app
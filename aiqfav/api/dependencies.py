@@ -1,140 +1,129 @@
-import uuid
-from datetime import timedelta
-from typing import Annotated, Any, Generator
-
-import httpx
-import redis.asyncio as redis
-from environs import Env
-from fastapi import Depends, HTTPException
+from typing import Annotated
+
+from fastapi import Depends, HTTPException, Request
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from passlib.context import CryptContext
-from sqlalchemy.ext.asyncio import (
-    AsyncSession,
-    async_sessionmaker,
-    create_async_engine,
-)
 
-from aiqfav.adapters.base import JwtAdapter, StoreApiAdapter
-from aiqfav.adapters.fakestore_api import FakeStoreApi
-from aiqfav.adapters.jwt import JwtAdapterImpl
-from aiqfav.adapters.redis_adapter import RedisAdapter, RedisAsyncProtocol
-from aiqfav.db.base import CustomerRepository
-from aiqfav.db.implementations.customer import CustomerRepositoryImpl
+from aiqfav.adapters.base import StoreApiAdapter
+from aiqfav.adapters.password_hasher import PasswordHasherImpl
+from aiqfav.adapters.redis_adapter import RedisAdapter
+from aiqfav.container import Container
 from aiqfav.domain.customer import (
+    AuthenticatedCustomer,
+    CustomerInDb,
     CustomerNotFound,
     CustomerPublic,
 )
+from aiqfav.domain.product import ProductPublic
 from aiqfav.services.auth import AuthService
 from aiqfav.services.auth.exceptions import InvalidToken
 from aiqfav.services.customer import CustomerService
+from aiqfav.services.export import ExportService
 from aiqfav.utils.api_errors import ErrorCodes, get_error_response
+from aiqfav.utils.cache import CacheStats, TTLCache
+from aiqfav.utils.circuit_breaker import CircuitBreaker
+from aiqfav.utils.dataloader import DataLoader
+from aiqfav.utils.singleflight import SingleFlight
 
-env = Env()
-env.read_env()
+http_bearer = HTTPBearer(auto_error=False)
 
 
-http_bearer = HTTPBearer(auto_error=False)
+def get_container(request: Request) -> Container:
+    """Dependency para obter o container da aplicação, criado no lifespan"""
+    return request.app.state.container
 
 
-def get_async_session() -> async_sessionmaker[AsyncSession]:
-    """Dependency para obter uma sessão assíncrona"""
-    DATABASE_URL = env('DATABASE_URL')
-    engine = create_async_engine(
-        DATABASE_URL,
-        echo=False,
-    )
-    return async_sessionmaker(engine, expire_on_commit=False)
+def get_db_pool_stats(
+    container: Annotated[Container, Depends(get_container)],
+) -> dict[str, int]:
+    """Dependency para obter as métricas do pool de conexões do banco"""
+    if container.customer_repository_asyncpg is not None:
+        return container.customer_repository_asyncpg.pool_stats()
+    assert container.db_pool_stats is not None
+    return container.db_pool_stats.as_dict()
 
 
-def get_pwd_context() -> CryptContext:
-    """Dependency para obter o contexto de hash de senhas"""
-    return CryptContext(schemes=['argon2'], deprecated='auto')
+def get_store_api_cache_stats(
+    container: Annotated[Container, Depends(get_container)],
+) -> CacheStats:
+    """Dependency para obter as métricas de cache da API de loja"""
+    return container.store_api_cache_stats
 
 
-def get_redis_adapter() -> RedisAdapter:
-    """Dependency para obter o Redis"""
-    redis_client = redis.Redis(
-        host=env('REDIS_HOST'),
-        port=env.int('REDIS_PORT'),
-        db=env.int('REDIS_DB'),
-    )
-    return RedisAdapter(redis_client)
+def get_store_api_circuit_breaker(
+    container: Annotated[Container, Depends(get_container)],
+) -> CircuitBreaker:
+    """Dependency para obter o circuit breaker da API de loja"""
+    return container.store_api_circuit_breaker
 
 
-def get_customer_repository(
-    async_session: Annotated[
-        async_sessionmaker[AsyncSession], Depends(get_async_session)
-    ],
-) -> CustomerRepository:
-    """Dependency para obter o repositório de clientes"""
-    return CustomerRepositoryImpl(async_session)
+def get_single_flight(
+    container: Annotated[Container, Depends(get_container)],
+) -> SingleFlight:
+    """Dependency para obter o single-flight compartilhado pelo worker"""
+    return container.single_flight
+
+
+def get_product_local_cache(
+    container: Annotated[Container, Depends(get_container)],
+) -> TTLCache[ProductPublic] | None:
+    """Dependency para obter o cache local de produtos"""
+    return container.product_local_cache
+
+
+def get_customer_local_cache(
+    container: Annotated[Container, Depends(get_container)],
+) -> TTLCache[CustomerPublic] | None:
+    """Dependency para obter o cache local de clientes"""
+    return container.customer_local_cache
+
+
+def get_customer_loader(
+    container: Annotated[Container, Depends(get_container)],
+) -> DataLoader[int, CustomerInDb] | None:
+    """Dependency para obter o loader que agrupa as buscas de clientes"""
+    return container.customer_loader
+
+
+def get_password_hasher(
+    container: Annotated[Container, Depends(get_container)],
+) -> PasswordHasherImpl:
+    """Dependency para obter o hasher de senhas"""
+    return container.password_hasher
+
+
+def get_redis_adapter(
+    container: Annotated[Container, Depends(get_container)],
+) -> RedisAdapter:
+    """Dependency para obter o Redis"""
+    return container.redis
 
 
 def get_store_api_adapter(
-    redis: Annotated[RedisAsyncProtocol, Depends(get_redis_adapter)],
-) -> Generator[StoreApiAdapter, Any, Any]:
+    container: Annotated[Container, Depends(get_container)],
+) -> StoreApiAdapter:
     """Dependency para obter o adaptador de API de loja"""
-    yield FakeStoreApi(
-        base_url=env('FAKE_STORE_API_URL'),
-        client_factory=lambda: httpx.AsyncClient(),
-        redis=redis,
-    )
+    return container.store_api_adapter
 
 
 def get_customer_service(
-    customer_repository: Annotated[
-        CustomerRepository, Depends(get_customer_repository)
-    ],
-    store_api_adapter: Annotated[
-        StoreApiAdapter, Depends(get_store_api_adapter)
-    ],
-    pwd_context: Annotated[CryptContext, Depends(get_pwd_context)],
-    redis: Annotated[RedisAsyncProtocol, Depends(get_redis_adapter)],
+    container: Annotated[Container, Depends(get_container)],
 ) -> CustomerService:
     """Dependency para obter o serviço de clientes"""
-    return CustomerService(
-        customer_repository, store_api_adapter, pwd_context, redis
-    )
-
-
-def get_access_token_expiration() -> timedelta:
-    """Dependency para obter o tempo de expiração do token de acesso"""
-    return timedelta(minutes=env.int('ACCESS_TOKEN_EXPIRE_MINUTES'))
+    return container.customer_service
 
 
-def get_refresh_token_expiration() -> timedelta:
-    """Dependency para obter o tempo de expiração do token de refresh"""
-    return timedelta(days=env.int('REFRESH_TOKEN_EXPIRE_DAYS'))
-
-
-def get_jwt_adapter() -> JwtAdapter:
-    """Dependency para obter o adaptador de JWT"""
-    return JwtAdapterImpl(env('SECRET_KEY'), env('ALGORITHM'))
+def get_export_service(
+    container: Annotated[Container, Depends(get_container)],
+) -> ExportService:
+    """Dependency para obter o serviço de exportação de clientes"""
+    return container.export_service
 
 
 def get_auth_service(
-    customer_repository: Annotated[
-        CustomerRepository, Depends(get_customer_repository)
-    ],
-    pwd_context: Annotated[CryptContext, Depends(get_pwd_context)],
-    access_token_expiration: Annotated[
-        timedelta, Depends(get_access_token_expiration)
-    ],
-    refresh_token_expiration: Annotated[
-        timedelta, Depends(get_refresh_token_expiration)
-    ],
-    jwt_adapter: Annotated[JwtAdapter, Depends(get_jwt_adapter)],
+    container: Annotated[Container, Depends(get_container)],
 ) -> AuthService:
     """Dependency para obter o serviço de autenticação"""
-    return AuthService(
-        customer_repo=customer_repository,
-        pwd_context=pwd_context,
-        access_token_expiration=access_token_expiration,
-        refresh_token_expiration=refresh_token_expiration,
-        jwt_adapter=jwt_adapter,
-        jwt_issuer=env('JWT_ISSUER'),
-        jti_generator=lambda: uuid.uuid4().hex,
-    )
+    return container.auth_service
 
 
 async def get_current_customer(
@@ -159,6 +148,9 @@ async def get_current_customer(
 
     access_token = credentials.credentials
     try:
+        if auth_service.stateless:
+            return await auth_service.get_customer_from_token(access_token)
+
         customer_id = auth_service.get_customer_id_from_token(
             access_token, token_type='access'
         )
@@ -185,7 +177,13 @@ async def get_current_admin(
     Raises:
         HTTPException: Se o cliente não for administrador.
     """
-    if not await customer_service.check_is_admin(customer.id):
+    if isinstance(customer, AuthenticatedCustomer):
+        # Modo stateless: a claim do token já foi validada
+        is_admin = customer.is_admin
+    else:
+        is_admin = await customer_service.check_is_admin(customer.id)
+
+    if not is_admin:
         raise HTTPException(
             status_code=403,
             detail=get_error_response(
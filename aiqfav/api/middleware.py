@@ -0,0 +1,37 @@
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from aiqfav.utils.request_context import request_context
+
+__all__ = ['RequestContextMiddleware']
+
+
+class RequestContextMiddleware:
+    """Executa cada requisição em um contexto próprio (identity map e
+    contadores de round trips).
+
+    Com `stats_headers`, a resposta inclui os cabeçalhos `X-DB-Queries` e
+    `X-Redis-Commands`, com as idas ao banco e ao Redis da requisição.
+    """
+
+    def __init__(self, app: ASGIApp, stats_headers: bool = False):
+        self.app = app
+        self.stats_headers = stats_headers
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        with request_context() as context:
+
+            async def send_with_stats(message: Message) -> None:
+                if message['type'] == 'http.response.start':
+                    headers = MutableHeaders(scope=message)
+                    headers['X-DB-Queries'] = str(context.db_queries)
+                    headers['X-Redis-Commands'] = str(context.redis_commands)
+                await send(message)
+
+            await self.app(
+                scope, receive, send_with_stats if self.stats_headers else send
+            )
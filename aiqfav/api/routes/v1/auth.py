@@ -56,7 +56,7 @@ async def refresh_token(
     data: AuthRefreshTokenRequest,
 ):
     try:
-        access_token, refresh_token = auth_service.refresh_token(
+        access_token, refresh_token = await auth_service.refresh_token(
             data.refresh_token
         )
         return AuthPairTokensResponse(
@@ -1,44 +1,67 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import JSONResponse, Response
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 
 from aiqfav.adapters.exceptions import StoreApiNotFoundError
 from aiqfav.api.dependencies import (
     get_current_admin,
     get_current_customer,
     get_customer_service,
+    get_export_service,
 )
 from aiqfav.domain.customer import (
     CustomerCreate,
+    CustomerInclude,
     CustomerNotFound,
+    CustomerProfile,
     CustomerPublic,
+    CustomerWithFavorites,
     EmailExistsResponse,
 )
-from aiqfav.domain.favorite import FavoriteUpsert
+from aiqfav.domain.favorite import (
+    MAX_BULK_FAVORITES,
+    FavoriteBulkUpsert,
+    FavoriteUpsert,
+)
 from aiqfav.domain.product import ProductPublic
 from aiqfav.services.customer import CustomerService
 from aiqfav.services.customer.exceptions import EmailAlreadyExists
+from aiqfav.services.export import ExportFormat, ExportService
 from aiqfav.utils.api_errors import ErrorCodes, get_error_response
 
 __all__ = ['router']
 
 router = APIRouter(tags=['customers'])
 
+# Máximo de clientes por página na listagem
+MAX_PAGE_SIZE = 500
+
 
 @router.get(
     '/customers',
     response_model=list[CustomerPublic],
     summary='Listar clientes (apenas para administradores)',
-    description='Endpoint para listar todos os clientes',
+    description=(
+        'Endpoint para listar os clientes, ordenados por ID, em páginas de '
+        'até `limit` clientes. Para obter a próxima página, envie em '
+        '`after` o valor do cabeçalho `X-Next-Cursor` da resposta; o '
+        'cabeçalho não é enviado na última página.'
+    ),
 )
 async def list_customers(
     customer_service: Annotated[
         CustomerService, Depends(get_customer_service)
     ],
     admin: Annotated[CustomerPublic, Depends(get_current_admin)],
+    response: Response,
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = 50,
+    after: Annotated[int | None, Query(ge=0)] = None,
 ):
-    return await customer_service.list_customers()
+    page = await customer_service.list_customers(limit=limit, after=after)
+    if page.next_after is not None:
+        response.headers['X-Next-Cursor'] = str(page.next_after)
+    return page.customers
 
 
 @router.post(
@@ -100,17 +123,110 @@ async def validate_email(
         )
 
 
+@router.get(
+    '/customers/export',
+    response_class=StreamingResponse,
+    summary='Exportar clientes e favoritos (apenas para administradores)',
+    responses={
+        200: {
+            'description': 'Exportação em NDJSON ou CSV',
+            'content': {
+                'application/x-ndjson': {},
+                'text/csv': {},
+            },
+        },
+    },
+    description=(
+        'Endpoint para exportar todos os clientes com os IDs dos seus '
+        'produtos favoritos, em NDJSON ou CSV, com uma linha por cliente, '
+        'ordenados por ID. A resposta é enviada aos poucos, com uso de '
+        'memória constante. Para retomar uma exportação interrompida, '
+        'envie em `after` o ID da última linha completa recebida (o CSV '
+        'retomado não repete o cabeçalho).'
+    ),
+)
+async def export_customers(
+    export_service: Annotated[ExportService, Depends(get_export_service)],
+    admin: Annotated[CustomerPublic, Depends(get_current_admin)],
+    format: ExportFormat = ExportFormat.NDJSON,
+    after: Annotated[int | None, Query(ge=0)] = None,
+):
+    return StreamingResponse(
+        export_service.export_customers(format, after),
+        media_type=format.media_type,
+        headers={
+            'Content-Disposition': (
+                f'attachment; filename="customers.{format.value}"'
+            )
+        },
+    )
+
+
+@router.get(
+    '/customers/with-favorites',
+    response_model=list[CustomerWithFavorites],
+    summary='Listar clientes com seus favoritos (apenas para administradores)',
+    description=(
+        'Endpoint para listar os clientes, ordenados por ID, com os IDs dos '
+        'seus produtos favoritos, em páginas de até `limit` clientes. Os '
+        'favoritos da página inteira são carregados de uma vez. Para obter '
+        'a próxima página, envie em `after` o valor do cabeçalho '
+        '`X-Next-Cursor` da resposta; o cabeçalho não é enviado na última '
+        'página.'
+    ),
+)
+async def list_customers_with_favorites(
+    customer_service: Annotated[
+        CustomerService, Depends(get_customer_service)
+    ],
+    admin: Annotated[CustomerPublic, Depends(get_current_admin)],
+    response: Response,
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = 50,
+    after: Annotated[int | None, Query(ge=0)] = None,
+):
+    page = await customer_service.list_customers_with_favorites(
+        limit=limit, after=after
+    )
+    if page.next_after is not None:
+        response.headers['X-Next-Cursor'] = str(page.next_after)
+    return page.customers
+
+
 @router.get(
     '/customers/me',
-    response_model=CustomerPublic,
+    response_model=CustomerProfile,
+    response_model_exclude_unset=True,
     summary='Buscar cliente por ID',
-    description='Endpoint para buscar um cliente por ID',
+    description=(
+        'Endpoint para buscar o cliente autenticado. Com '
+        '`include=favorites`, a resposta inclui também os produtos '
+        'favoritos do cliente, evitando uma segunda requisição para '
+        '`/customers/me/favorites`.'
+    ),
 )
 async def get_me(
+    customer_service: Annotated[
+        CustomerService, Depends(get_customer_service)
+    ],
     customer: Annotated[CustomerPublic, Depends(get_current_customer)],
+    include: CustomerInclude | None = None,
 ):
     """Endpoint para buscar o cliente autenticado"""
-    return customer
+    if include != CustomerInclude.FAVORITES:
+        return CustomerProfile(
+            id=customer.id, name=customer.name, email=customer.email
+        )
+
+    try:
+        return await customer_service.get_customer_profile(customer)
+    except CustomerNotFound:
+        raise HTTPException(
+            status_code=404,
+            detail=get_error_response(
+                error_code=ErrorCodes.CUSTOMER_NOT_FOUND,
+                message='Cliente não encontrado',
+            ),
+        )
 
 
 @router.get(
@@ -185,6 +301,71 @@ async def add_favorite_me(
         )
 
 
+@router.put(
+    '/customers/me/favorites/bulk',
+    summary='Adicionar produtos favoritos do cliente autenticado em lote',
+    response_model=list[ProductPublic],
+    responses={
+        200: {
+            'description': 'Produtos favoritos adicionados com sucesso',
+        },
+        404: {
+            'description': 'Cliente ou algum dos produtos não encontrado',
+        },
+    },
+    description=(
+        'Endpoint para adicionar vários produtos aos favoritos do cliente '
+        'autenticado de uma vez (até 500). Todos os produtos são validados '
+        'antes da gravação: se algum não existir, nenhum é adicionado. Este '
+        'endpoint é idempotente. Retorna 200 em caso de sucesso, contendo '
+        'os produtos adicionados.'
+    ),
+)
+async def add_favorites_me(
+    customer_service: Annotated[
+        CustomerService, Depends(get_customer_service)
+    ],
+    customer: Annotated[CustomerPublic, Depends(get_current_customer)],
+    payload: FavoriteBulkUpsert,
+):
+    return await _add_favorites(
+        customer_service, customer.id, payload.product_ids
+    )
+
+
+# Declarada antes de `/favorites/{product_id}`, que também casaria com `bulk`
+@router.delete(
+    '/customers/me/favorites/bulk',
+    summary='Remover produtos dos favoritos do cliente autenticado em lote',
+    response_class=Response,
+    status_code=204,
+    responses={
+        204: {
+            'description': 'Produtos favoritos removidos com sucesso',
+        },
+        404: {
+            'description': 'Cliente não encontrado',
+        },
+    },
+    description=(
+        'Endpoint para remover vários produtos dos favoritos do cliente '
+        'autenticado de uma vez (até 500), informados em `product_ids` '
+        '(ex.: `?product_ids=1&product_ids=2`). Retorna 204 em caso de '
+        'sucesso.'
+    ),
+)
+async def remove_favorites_me(
+    customer_service: Annotated[
+        CustomerService, Depends(get_customer_service)
+    ],
+    customer: Annotated[CustomerPublic, Depends(get_current_customer)],
+    product_ids: Annotated[
+        list[int], Query(min_length=1, max_length=MAX_BULK_FAVORITES)
+    ],
+):
+    return await _remove_favorites(customer_service, customer.id, product_ids)
+
+
 @router.delete(
     '/customers/me/favorites/{product_id}',
     summary='Remover produto dos favoritos do cliente autenticado',
@@ -350,6 +531,72 @@ async def add_favorite(
         )
 
 
+@router.put(
+    '/customers/{customer_id}/favorites/bulk',
+    summary='Adicionar produtos favoritos em lote (apenas para administradores)',
+    response_model=list[ProductPublic],
+    responses={
+        200: {
+            'description': 'Produtos favoritos adicionados com sucesso',
+        },
+        404: {
+            'description': 'Cliente ou algum dos produtos não encontrado',
+        },
+    },
+    description=(
+        'Endpoint para adicionar vários produtos aos favoritos de um cliente '
+        'de uma vez (até 500). Todos os produtos são validados antes da '
+        'gravação: se algum não existir, nenhum é adicionado. Este endpoint '
+        'é idempotente. Retorna 200 em caso de sucesso, contendo os '
+        'produtos adicionados.'
+    ),
+)
+async def add_favorites(
+    customer_service: Annotated[
+        CustomerService, Depends(get_customer_service)
+    ],
+    admin: Annotated[CustomerPublic, Depends(get_current_admin)],
+    customer_id: int,
+    payload: FavoriteBulkUpsert,
+):
+    return await _add_favorites(
+        customer_service, customer_id, payload.product_ids
+    )
+
+
+# Declarada antes de `/favorites/{product_id}`, que também casaria com `bulk`
+@router.delete(
+    '/customers/{customer_id}/favorites/bulk',
+    summary='Remover produtos dos favoritos em lote (apenas para administradores)',
+    response_class=Response,
+    status_code=204,
+    responses={
+        204: {
+            'description': 'Produtos favoritos removidos com sucesso',
+        },
+        404: {
+            'description': 'Cliente não encontrado',
+        },
+    },
+    description=(
+        'Endpoint para remover vários produtos dos favoritos de um cliente '
+        'de uma vez (até 500), informados em `product_ids` (ex.: '
+        '`?product_ids=1&product_ids=2`). Retorna 204 em caso de sucesso.'
+    ),
+)
+async def remove_favorites(
+    customer_service: Annotated[
+        CustomerService, Depends(get_customer_service)
+    ],
+    admin: Annotated[CustomerPublic, Depends(get_current_admin)],
+    customer_id: int,
+    product_ids: Annotated[
+        list[int], Query(min_length=1, max_length=MAX_BULK_FAVORITES)
+    ],
+):
+    return await _remove_favorites(customer_service, customer_id, product_ids)
+
+
 @router.delete(
     '/customers/{customer_id}/favorites/{product_id}',
     summary='Remover produto dos favoritos (apenas para administradores)',
@@ -387,3 +634,46 @@ async def remove_favorite(
                 message='Cliente não encontrado',
             ),
         )
+
+
+async def _add_favorites(
+    customer_service: CustomerService,
+    customer_id: int,
+    product_ids: list[int],
+) -> list[ProductPublic]:
+    try:
+        return await customer_service.add_favorites(customer_id, product_ids)
+    except CustomerNotFound:
+        raise HTTPException(
+            status_code=404,
+            detail=get_error_response(
+                error_code=ErrorCodes.CUSTOMER_NOT_FOUND,
+                message='Cliente não encontrado',
+            ),
+        )
+    except StoreApiNotFoundError:
+        raise HTTPException(
+            status_code=404,
+            detail=get_error_response(
+                error_code=ErrorCodes.PRODUCT_NOT_FOUND,
+                message='Produto não encontrado',
+            ),
+        )
+
+
+async def _remove_favorites(
+    customer_service: CustomerService,
+    customer_id: int,
+    product_ids: list[int],
+) -> Response:
+    try:
+        await customer_service.remove_favorites(customer_id, product_ids)
+        return Response(status_code=204)
+    except CustomerNotFound:
+        raise HTTPException(
+            status_code=404,
+            detail=get_error_response(
+                error_code=ErrorCodes.CUSTOMER_NOT_FOUND,
+                message='Cliente não encontrado',
+            ),
+        )
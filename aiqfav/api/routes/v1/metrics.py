@@ -0,0 +1,87 @@
+from typing import Annotated, Any
+
+from fastapi import APIRouter, Depends
+
+from aiqfav.adapters.password_hasher import PasswordHasherImpl
+from aiqfav.adapters.redis_adapter import RedisAdapter
+from aiqfav.api.dependencies import (
+    get_current_admin,
+    get_customer_loader,
+    get_customer_local_cache,
+    get_db_pool_stats,
+    get_password_hasher,
+    get_product_local_cache,
+    get_redis_adapter,
+    get_single_flight,
+    get_store_api_cache_stats,
+    get_store_api_circuit_breaker,
+)
+from aiqfav.domain.customer import CustomerPublic
+from aiqfav.utils.cache import CacheStats, TTLCache
+from aiqfav.utils.circuit_breaker import CircuitBreaker
+from aiqfav.utils.dataloader import DataLoader
+from aiqfav.utils.singleflight import SingleFlight
+
+__all__ = ['router']
+
+router = APIRouter(tags=['metrics'])
+
+
+@router.get(
+    '/metrics',
+    summary='Métricas do worker (apenas para administradores)',
+    description=(
+        'Endpoint para consultar as métricas de cache, do pool de conexões '
+        'e o estado do circuit breaker da API de loja neste worker'
+    ),
+)
+async def get_metrics(
+    cache_stats: Annotated[CacheStats, Depends(get_store_api_cache_stats)],
+    circuit_breaker: Annotated[
+        CircuitBreaker, Depends(get_store_api_circuit_breaker)
+    ],
+    single_flight: Annotated[SingleFlight, Depends(get_single_flight)],
+    db_pool_stats: Annotated[dict[str, int], Depends(get_db_pool_stats)],
+    redis: Annotated[RedisAdapter, Depends(get_redis_adapter)],
+    password_hasher: Annotated[
+        PasswordHasherImpl, Depends(get_password_hasher)
+    ],
+    product_local_cache: Annotated[
+        TTLCache | None, Depends(get_product_local_cache)
+    ],
+    customer_local_cache: Annotated[
+        TTLCache | None, Depends(get_customer_local_cache)
+    ],
+    customer_loader: Annotated[
+        DataLoader | None, Depends(get_customer_loader)
+    ],
+    admin: Annotated[CustomerPublic, Depends(get_current_admin)],
+) -> dict[str, Any]:
+    return {
+        'store_api': {
+            'cache': cache_stats.as_dict(),
+            'circuit_breaker': circuit_breaker.as_dict(),
+        },
+        'db_pool': db_pool_stats,
+        'redis_pool': redis.pool_stats(),
+        'password_hasher': password_hasher.stats(),
+        'single_flight': {
+            'calls': single_flight.calls,
+            'coalesced': single_flight.coalesced,
+        },
+        'customer_loader': (
+            customer_loader.as_dict() if customer_loader is not None else None
+        ),
+        'local_cache': {
+            'product': (
+                product_local_cache.stats.as_dict()
+                if product_local_cache is not None
+                else None
+            ),
+            'customer': (
+                customer_local_cache.stats.as_dict()
+                if customer_local_cache is not None
+                else None
+            ),
+        },
+    }
@@ -0,0 +1,329 @@
+import uuid
+from datetime import timedelta
+
+import httpx
+import redis.asyncio as redis
+from environs import Env
+from passlib.context import CryptContext
+from sqlalchemy import event, make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+from aiqfav.adapters.base import JwtAdapter, StoreApiAdapter
+from aiqfav.adapters.catalog_index import CatalogIndex
+from aiqfav.adapters.fakestore_api import FakeStoreApi
+from aiqfav.adapters.jwt import JwtAdapterImpl
+from aiqfav.adapters.password_hasher import PasswordHasherImpl
+from aiqfav.adapters.redis_adapter import RedisAdapter
+from aiqfav.adapters.token_versions import TokenVersionStore
+from aiqfav.db.base import CustomerRepository
+from aiqfav.db.batching import BatchingCustomerRepository
+from aiqfav.db.identity_map import IdentityMapCustomerRepository
+from aiqfav.db.implementations.customer import CustomerRepositoryImpl
+from aiqfav.db.implementations.customer_asyncpg import (
+    CustomerRepositoryAsyncpg,
+)
+from aiqfav.db.pool import PoolStats
+from aiqfav.domain.customer import CustomerInDb, CustomerPublic
+from aiqfav.domain.product import ProductPublic
+from aiqfav.services.admin import AdminService
+from aiqfav.services.auth import AuthService
+from aiqfav.services.catalog import CatalogSyncService
+from aiqfav.services.customer import CustomerService
+from aiqfav.services.export import ExportService
+from aiqfav.utils.cache import CacheStats, TTLCache
+from aiqfav.utils.circuit_breaker import CircuitBreaker
+from aiqfav.utils.dataloader import DataLoader
+from aiqfav.utils.request_context import count_db_query
+from aiqfav.utils.singleflight import SingleFlight
+
+__all__ = ['Container']
+
+env = Env()
+env.read_env()
+
+
+class Container:
+    """Application-scoped object graph, configured by the environment.
+
+    Holds the connection pools (database, Redis and HTTP), the per-worker
+    caches and metrics, and the stateless adapters and services built on
+    top of them. It must be created once per worker (e.g. in the app
+    lifespan, or at the start of a script) and closed on shutdown.
+    """
+
+    def __init__(self):
+        # Connection pools. `DB_REPOSITORY` selects the database one: the
+        # engine's (`sqlalchemy`, ORM, default) or the asyncpg repository's
+        # (`asyncpg`, raw SQL)
+        self.db_engine: AsyncEngine | None = None
+        self.db_pool_stats: PoolStats | None = None
+        self.async_session: async_sessionmaker[AsyncSession] | None = None
+        self.customer_repository_asyncpg: CustomerRepositoryAsyncpg | None = (
+            None
+        )
+        if env('DB_REPOSITORY', 'sqlalchemy') == 'asyncpg':
+            self.customer_repository_asyncpg = (
+                self._create_customer_repository_asyncpg()
+            )
+        else:
+            self.db_engine = self._create_db_engine()
+            self.db_pool_stats = PoolStats(self.db_engine)
+            self.async_session = async_sessionmaker(
+                self.db_engine, expire_on_commit=False
+            )
+        self.redis_client = self._create_redis_client()
+        self.http_client = self._create_http_client()
+
+        # Per-worker caches and metrics
+        self.store_api_cache_stats = CacheStats()
+        self.single_flight = SingleFlight()
+        self.product_local_cache: TTLCache[ProductPublic] | None = (
+            self._create_local_cache('product')
+        )
+        self.customer_local_cache: TTLCache[CustomerPublic] | None = (
+            self._create_local_cache('customer')
+        )
+        self.catalog_index = CatalogIndex()
+        self.store_api_circuit_breaker = CircuitBreaker(
+            'store_api',
+            failure_threshold=env.int(
+                'FAKE_STORE_API_CIRCUIT_FAILURE_THRESHOLD', 5
+            ),
+            recovery_timeout=env.float(
+                'FAKE_STORE_API_CIRCUIT_RECOVERY_TIMEOUT', 30.0
+            ),
+        )
+
+        # Adapters
+        self.redis = RedisAdapter(self.redis_client)
+        self.pwd_context = CryptContext(
+            schemes=['argon2'],
+            deprecated='auto',
+            argon2__time_cost=env.int('ARGON2_TIME_COST', 3),
+            argon2__memory_cost=env.int('ARGON2_MEMORY_COST', 64 * 1024),
+            argon2__parallelism=env.int('ARGON2_PARALLELISM', 4),
+        )
+        self.password_hasher = PasswordHasherImpl(
+            self.pwd_context,
+            max_workers=env.int('PASSWORD_HASHER_MAX_WORKERS', 2),
+        )
+        self.jwt_adapter: JwtAdapter = JwtAdapterImpl(
+            env('SECRET_KEY'), env('ALGORITHM')
+        )
+        self.customer_loader: DataLoader[int, CustomerInDb] | None = None
+        self.customer_repository: CustomerRepository = (
+            self._create_customer_repository()
+        )
+        self.token_versions = TokenVersionStore(
+            self.redis, self.customer_repository
+        )
+        self.store_api_adapter: StoreApiAdapter = FakeStoreApi(
+            base_url=env('FAKE_STORE_API_URL'),
+            client=self.http_client,
+            redis=self.redis,
+            cache_soft_expiration=env.int(
+                'FAKE_STORE_API_CACHE_SOFT_EXPIRATION', 10 * 60
+            ),
+            cache_stats=self.store_api_cache_stats,
+            batch_concurrency=env.int('FAKE_STORE_API_BATCH_CONCURRENCY', 10),
+            single_flight=self.single_flight,
+            fill_lock_timeout=env.float('FAKE_STORE_API_FILL_LOCK_TIMEOUT', 0),
+            local_cache=self.product_local_cache,
+            catalog_index=self.catalog_index,
+            negative_cache_expiration=env.int(
+                'FAKE_STORE_API_NEGATIVE_CACHE_EXPIRATION', 60
+            ),
+            circuit_breaker=self.store_api_circuit_breaker,
+        )
+
+        # Services
+        self.customer_service = CustomerService(
+            self.customer_repository,
+            self.store_api_adapter,
+            self.password_hasher,
+            self.redis,
+            local_cache=self.customer_local_cache,
+            favorites_cache_soft_expiration=env.int(
+                'FAVORITES_CACHE_SOFT_EXPIRATION', 5 * 60
+            ),
+            single_flight=self.single_flight,
+            token_versions=self.token_versions,
+        )
+        self.auth_service = AuthService(
+            customer_repo=self.customer_repository,
+            password_hasher=self.password_hasher,
+            access_token_expiration=timedelta(
+                minutes=env.int('ACCESS_TOKEN_EXPIRE_MINUTES')
+            ),
+            refresh_token_expiration=timedelta(
+                days=env.int('REFRESH_TOKEN_EXPIRE_DAYS')
+            ),
+            jwt_adapter=self.jwt_adapter,
+            jwt_issuer=env('JWT_ISSUER'),
+            jti_generator=lambda: uuid.uuid4().hex,
+            token_versions=self.token_versions,
+            stateless=env.bool('AUTH_STATELESS', False),
+        )
+        self.admin_service = AdminService(
+            customer_service=self.customer_service,
+            customer_repo=self.customer_repository,
+        )
+        self.export_service = ExportService(
+            self.customer_repository,
+            batch_size=env.int('EXPORT_BATCH_SIZE', 1000),
+        )
+        self.catalog_sync = CatalogSyncService(
+            self.store_api_adapter,
+            self.redis,
+            # 0 disables the periodic sync in the app lifespan
+            interval=env.float('CATALOG_SYNC_INTERVAL', 0),
+        )
+
+    async def aclose(self) -> None:
+        """Close the connection pools"""
+        await self.http_client.aclose()
+        await self.redis_client.aclose()
+        if self.db_engine is not None:
+            await self.db_engine.dispose()
+        if self.customer_repository_asyncpg is not None:
+            await self.customer_repository_asyncpg.aclose()
+        self.password_hasher.shutdown()
+
+    def _create_db_engine(self) -> AsyncEngine:
+        """Create the database engine, which holds the connection pool"""
+        connect_args = {}
+        if server_settings := self._db_server_settings():
+            connect_args['server_settings'] = server_settings
+
+        engine = create_async_engine(
+            env('DATABASE_URL'),
+            echo=False,
+            pool_size=env.int('DB_POOL_SIZE', 5),
+            max_overflow=env.int('DB_MAX_OVERFLOW', 10),
+            pool_timeout=env.float('DB_POOL_TIMEOUT', 30.0),
+            pool_pre_ping=env.bool('DB_POOL_PRE_PING', True),
+            pool_recycle=env.int('DB_POOL_RECYCLE', 30 * 60),
+            connect_args=connect_args,
+        )
+        event.listen(
+            engine.sync_engine, 'before_cursor_execute', count_db_query
+        )
+        return engine
+
+    def _create_customer_repository(self) -> CustomerRepository:
+        """Create the customer repository, on the database pool.
+
+        Lookups by id from concurrent requests are batched into a single
+        query within `CUSTOMER_LOADER_BATCH_WINDOW` seconds (0 batches
+        the lookups of one event loop iteration), unless
+        `CUSTOMER_LOADER_MAX_BATCH_SIZE` is 0. On top of that, each
+        customer is loaded at most once per request.
+        """
+        repository: CustomerRepository
+        if self.customer_repository_asyncpg is not None:
+            repository = self.customer_repository_asyncpg
+        else:
+            assert self.async_session is not None
+            repository = CustomerRepositoryImpl(self.async_session)
+
+        max_batch_size = env.int('CUSTOMER_LOADER_MAX_BATCH_SIZE', 100)
+        if max_batch_size > 0:
+            repository = BatchingCustomerRepository(
+                repository,
+                batch_window=env.float('CUSTOMER_LOADER_BATCH_WINDOW', 0),
+                max_batch_size=max_batch_size,
+            )
+            self.customer_loader = repository.loader
+        return IdentityMapCustomerRepository(repository)
+
+    def _create_customer_repository_asyncpg(
+        self,
+    ) -> CustomerRepositoryAsyncpg:
+        """Create the asyncpg customer repository, with a pool configured
+        like the engine's (`DB_POOL_*` and `DB_MAX_OVERFLOW`)"""
+        # asyncpg takes a plain libpq URL, without the SQLAlchemy driver
+        dsn = (
+            make_url(env('DATABASE_URL'))
+            .set(drivername='postgresql')
+            .render_as_string(hide_password=False)
+        )
+        return CustomerRepositoryAsyncpg(
+            dsn,
+            pool_timeout=env.float('DB_POOL_TIMEOUT', 30.0),
+            pre_ping=env.bool('DB_POOL_PRE_PING', True),
+            min_size=0,
+            max_size=env.int('DB_POOL_SIZE', 5)
+            + env.int('DB_MAX_OVERFLOW', 10),
+            max_inactive_connection_lifetime=env.int(
+                'DB_POOL_RECYCLE', 30 * 60
+            ),
+            server_settings=self._db_server_settings(),
+        )
+
+    def _db_server_settings(self) -> dict[str, str]:
+        """Postgres settings of the database connections"""
+        server_settings = {}
+        # In milliseconds (0 disables it)
+        if statement_timeout := env.int('DB_STATEMENT_TIMEOUT', 0):
+            server_settings['statement_timeout'] = str(statement_timeout)
+        return server_settings
+
+    def _create_redis_client(self) -> redis.Redis:
+        """Create the Redis client, owning a bounded connection pool.
+
+        When all the connections are in use, commands wait for a free one
+        for up to `REDIS_POOL_TIMEOUT` seconds.
+        """
+        pool = redis.BlockingConnectionPool(
+            host=env('REDIS_HOST'),
+            port=env.int('REDIS_PORT'),
+            db=env.int('REDIS_DB'),
+            max_connections=env.int('REDIS_MAX_CONNECTIONS', 50),
+            timeout=env.float('REDIS_POOL_TIMEOUT', 5.0),
+            socket_timeout=env.float('REDIS_SOCKET_TIMEOUT', 5.0),
+            socket_connect_timeout=env.float(
+                'REDIS_SOCKET_CONNECT_TIMEOUT', 2.0
+            ),
+            health_check_interval=env.int('REDIS_HEALTH_CHECK_INTERVAL', 30),
+        )
+        return redis.Redis.from_pool(pool)
+
+    def _create_http_client(self) -> httpx.AsyncClient:
+        """Create the HTTP client used to call external APIs.
+
+        The client keeps a pool of keep-alive connections, avoiding a new
+        TCP/TLS handshake on every call.
+        """
+        return httpx.AsyncClient(
+            http2=env.bool('HTTP_CLIENT_HTTP2', False),
+            timeout=httpx.Timeout(
+                env.float('HTTP_CLIENT_TIMEOUT', 10.0),
+                connect=env.float('HTTP_CLIENT_CONNECT_TIMEOUT', 5.0),
+            ),
+            limits=httpx.Limits(
+                max_connections=env.int('HTTP_CLIENT_MAX_CONNECTIONS', 100),
+                max_keepalive_connections=env.int(
+                    'HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS', 20
+                ),
+                keepalive_expiry=env.float(
+                    'HTTP_CLIENT_KEEPALIVE_EXPIRY', 30.0
+                ),
+            ),
+        )
+
+    def _create_local_cache(self, family: str) -> TTLCache | None:
+        """Create the local (L1) cache of a key family, configured by
+        `L1_CACHE_<FAMILY>_MAXSIZE` and `L1_CACHE_<FAMILY>_TTL`.
+
+        Returns None if the cache is disabled (max size 0).
+        """
+        prefix = f'L1_CACHE_{family.upper()}'
+        maxsize = env.int(f'{prefix}_MAXSIZE', 1024)
+        if maxsize <= 0:
+            return None
+        return TTLCache(maxsize=maxsize, ttl=env.float(f'{prefix}_TTL', 5.0))
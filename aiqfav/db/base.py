@@ -1,7 +1,11 @@
 import abc
-from typing import overload
+from typing import AsyncIterator, overload
 
-from aiqfav.domain.customer import CustomerInDb, CustomerWithPassword
+from aiqfav.domain.customer import (
+    CustomerInDb,
+    CustomerWithFavorites,
+    CustomerWithPassword,
+)
 from aiqfav.domain.favorite import FavoriteInDb
 
 
@@ -42,14 +46,75 @@ class CustomerRepository(abc.ABC):
     ) -> CustomerInDb: ...
 
     @abc.abstractmethod
-    async def list_customers(self) -> list[CustomerInDb]:
-        """List all customers."""
+    async def get_customers_by_ids(self, ids: list[int]) -> list[CustomerInDb]:
+        """Query the customers with the given ids, in a single query.
+
+        Args:
+            ids (list[int]): the customer ids.
+
+        Returns:
+            list[Customer]: the customers found, in no particular order;
+                ids not found are left out.
+        """
+
+    @abc.abstractmethod
+    async def list_customers(
+        self, limit: int | None = None, after: int | None = None
+    ) -> list[CustomerInDb]:
+        """List customers ordered by id, using keyset pagination.
+
+        Args:
+            limit (int | None): the max number of customers (None for all).
+            after (int | None): list only the customers with an id greater
+                than this one (the last id of the previous page).
+        """
+
+    @abc.abstractmethod
+    async def list_customers_with_favorites(
+        self, limit: int | None = None, after: int | None = None
+    ) -> list[CustomerWithFavorites]:
+        """List customers with their favorites, ordered by id, using keyset
+        pagination.
+
+        The favorites of the whole page are loaded along with it, in a
+        fixed number of queries, instead of one more query per customer.
+
+        Args:
+            limit (int | None): the max number of customers (None for all).
+            after (int | None): list only the customers with an id greater
+                than this one (the last id of the previous page).
+        """
+
+    @abc.abstractmethod
+    def stream_customers_with_favorites(
+        self, after: int | None = None, batch_size: int = 1000
+    ) -> AsyncIterator[CustomerWithFavorites]:
+        """Stream all customers with their favorites, ordered by id.
+
+        Rows are read through a server-side cursor, `batch_size` at a
+        time, so memory use doesn't grow with the table size.
+
+        Args:
+            after (int | None): stream only the customers with an id
+                greater than this one, to resume an interrupted stream.
+            batch_size (int): the number of rows fetched at a time.
+        """
 
     @abc.abstractmethod
     async def create_customer(
         self, customer: CustomerWithPassword
     ) -> CustomerInDb:
-        """Create a customer."""
+        """Create a customer.
+
+        Args:
+            customer (CustomerWithPassword): the customer to create.
+
+        Returns:
+            Customer: the created customer.
+
+        Raises:
+            DuplicateEmail: if a customer with the same email exists.
+        """
 
     @abc.abstractmethod
     async def delete_customer(self, id: int) -> None:
@@ -84,6 +149,22 @@ class CustomerRepository(abc.ABC):
             product_id (int): the product id.
         """
 
+    @abc.abstractmethod
+    async def add_favorites(
+        self, customer_id: int, product_ids: list[int]
+    ) -> None:
+        """Add products to customer's favorites, in a single statement.
+
+        Products already favorited are skipped.
+
+        Args:
+            customer_id (int): the customer id.
+            product_ids (list[int]): the product ids.
+
+        Raises:
+            CustomerNotFound: if the customer cannot be found.
+        """
+
     @abc.abstractmethod
     async def remove_favorite(self, customer_id: int, product_id: int) -> None:
         """Remove a product from customer's favorites.
@@ -97,9 +178,65 @@ class CustomerRepository(abc.ABC):
         """
 
     @abc.abstractmethod
-    async def set_admin(self, id: int) -> None:
+    async def remove_favorites(
+        self, customer_id: int, product_ids: list[int]
+    ) -> None:
+        """Remove products from customer's favorites, in a single statement.
+
+        Products not favorited are skipped.
+
+        Args:
+            customer_id (int): the customer id.
+            product_ids (list[int]): the product ids.
+        """
+
+    @abc.abstractmethod
+    async def set_admin(self, id: int) -> CustomerInDb:
         """Set a customer as admin.
 
         Args:
             id (int): the customer id.
+
+        Returns:
+            Customer: the updated customer.
+
+        Raises:
+            CustomerNotFound: if the customer cannot be found.
+        """
+
+    @abc.abstractmethod
+    async def update_hashed_password(
+        self, id: int, hashed_password: str
+    ) -> None:
+        """Update the password hash of a customer.
+
+        Args:
+            id (int): the customer id.
+            hashed_password (str): the new password hash.
+        """
+
+    @abc.abstractmethod
+    async def get_token_version(self, id: int) -> int:
+        """Get the token version of a customer.
+
+        Args:
+            id (int): the customer id.
+
+        Raises:
+            CustomerNotFound: if the customer cannot be found.
+        """
+
+    @abc.abstractmethod
+    async def bump_token_version(self, id: int) -> int:
+        """Increment the token version of a customer, revoking the tokens
+        issued with the previous ones.
+
+        Args:
+            id (int): the customer id.
+
+        Returns:
+            int: the new token version.
+
+        Raises:
+            CustomerNotFound: if the customer cannot be found.
         """
@@ -0,0 +1,119 @@
+from typing import AsyncIterator
+
+from aiqfav.domain.customer import (
+    CustomerInDb,
+    CustomerNotFound,
+    CustomerWithFavorites,
+    CustomerWithPassword,
+)
+from aiqfav.domain.favorite import FavoriteInDb
+from aiqfav.utils.dataloader import DataLoader
+
+from .base import CustomerRepository
+
+__all__ = ['BatchingCustomerRepository']
+
+
+class BatchingCustomerRepository(CustomerRepository):
+    """Customer repository that batches concurrent lookups by id.
+
+    Wraps another repository, so the `get_customer(id=...)` calls made
+    within a batch window, from any request, are loaded by a single
+    `get_customers_by_ids` query, taking one pooled connection instead of
+    one per call.
+    """
+
+    def __init__(
+        self,
+        repository: CustomerRepository,
+        batch_window: float = 0,
+        max_batch_size: int = 100,
+    ):
+        self.repository = repository
+        self.loader: DataLoader[int, CustomerInDb] = DataLoader(
+            self._load_customers,
+            batch_window=batch_window,
+            max_batch_size=max_batch_size,
+        )
+
+    async def get_customer(
+        self, *, email: str | None = None, id: int | None = None
+    ) -> CustomerInDb:
+        if not id:
+            # Lookups by email are not batched
+            assert email, 'email or id is required'
+            return await self.repository.get_customer(email=email)
+
+        customer = await self.loader.load(id)
+        if customer is None:
+            raise CustomerNotFound(f'Customer with id {id} not found')
+        return customer
+
+    async def get_customers_by_ids(self, ids: list[int]) -> list[CustomerInDb]:
+        return await self.repository.get_customers_by_ids(ids)
+
+    async def list_customers(
+        self, limit: int | None = None, after: int | None = None
+    ) -> list[CustomerInDb]:
+        return await self.repository.list_customers(limit, after)
+
+    async def list_customers_with_favorites(
+        self, limit: int | None = None, after: int | None = None
+    ) -> list[CustomerWithFavorites]:
+        return await self.repository.list_customers_with_favorites(
+            limit, after
+        )
+
+    def stream_customers_with_favorites(
+        self, after: int | None = None, batch_size: int = 1000
+    ) -> AsyncIterator[CustomerWithFavorites]:
+        return self.repository.stream_customers_with_favorites(
+            after, batch_size
+        )
+
+    async def create_customer(
+        self, customer: CustomerWithPassword
+    ) -> CustomerInDb:
+        return await self.repository.create_customer(customer)
+
+    async def delete_customer(self, id: int) -> None:
+        await self.repository.delete_customer(id)
+
+    async def list_favorites_for_customer(
+        self, customer_id: int
+    ) -> list[FavoriteInDb]:
+        return await self.repository.list_favorites_for_customer(customer_id)
+
+    async def add_favorite(self, customer_id: int, product_id: int) -> None:
+        await self.repository.add_favorite(customer_id, product_id)
+
+    async def add_favorites(
+        self, customer_id: int, product_ids: list[int]
+    ) -> None:
+        await self.repository.add_favorites(customer_id, product_ids)
+
+    async def remove_favorite(self, customer_id: int, product_id: int) -> None:
+        await self.repository.remove_favorite(customer_id, product_id)
+
+    async def remove_favorites(
+        self, customer_id: int, product_ids: list[int]
+    ) -> None:
+        await self.repository.remove_favorites(customer_id, product_ids)
+
+    async def set_admin(self, id: int) -> CustomerInDb:
+        return await self.repository.set_admin(id)
+
+    async def update_hashed_password(
+        self, id: int, hashed_password: str
+    ) -> None:
+        await self.repository.update_hashed_password(id, hashed_password)
+
+    async def get_token_version(self, id: int) -> int:
+        return await self.repository.get_token_version(id)
+
+    async def bump_token_version(self, id: int) -> int:
+        return await self.repository.bump_token_version(id)
+
+    async def _load_customers(self, ids: list[int]) -> dict[int, CustomerInDb]:
+        customers = await self.repository.get_customers_by_ids(ids)
+        return {customer.id: customer for customer in customers}
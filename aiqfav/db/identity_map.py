@@ -0,0 +1,152 @@
+from typing import AsyncIterator
+
+from aiqfav.domain.customer import (
+    CustomerInDb,
+    CustomerWithFavorites,
+    CustomerWithPassword,
+)
+from aiqfav.domain.favorite import FavoriteInDb
+from aiqfav.utils.request_context import get_request_context
+
+from .base import CustomerRepository
+
+__all__ = ['IdentityMapCustomerRepository']
+
+
+class IdentityMapCustomerRepository(CustomerRepository):
+    """Customer repository that loads each customer at most once per
+    request.
+
+    Wraps another repository, keeping the customers it loads in the
+    identity map of the current request context, by id and by email.
+    Writes to a customer evict it from the map. Outside a request context
+    every call goes straight to the wrapped repository.
+    """
+
+    def __init__(self, repository: CustomerRepository):
+        self.repository = repository
+
+    async def get_customer(
+        self, *, email: str | None = None, id: int | None = None
+    ) -> CustomerInDb:
+        context = get_request_context()
+        if context is None:
+            return await self._get_customer(email, id)
+
+        key = ('customer', id) if id else ('customer_email', email)
+        if (customer := context.identity_map.get(key)) is not None:
+            return customer
+
+        customer = await self._get_customer(email, id)
+        self._remember(customer)
+        return customer
+
+    async def get_customers_by_ids(self, ids: list[int]) -> list[CustomerInDb]:
+        context = get_request_context()
+        if context is None:
+            return await self.repository.get_customers_by_ids(ids)
+
+        customers = [
+            customer
+            for id in dict.fromkeys(ids)
+            if (customer := context.identity_map.get(('customer', id)))
+            is not None
+        ]
+        known_ids = {customer.id for customer in customers}
+        if missing_ids := [id for id in ids if id not in known_ids]:
+            for customer in await self.repository.get_customers_by_ids(
+                missing_ids
+            ):
+                self._remember(customer)
+                customers.append(customer)
+        return customers
+
+    async def list_customers(
+        self, limit: int | None = None, after: int | None = None
+    ) -> list[CustomerInDb]:
+        return await self.repository.list_customers(limit, after)
+
+    async def list_customers_with_favorites(
+        self, limit: int | None = None, after: int | None = None
+    ) -> list[CustomerWithFavorites]:
+        return await self.repository.list_customers_with_favorites(
+            limit, after
+        )
+
+    def stream_customers_with_favorites(
+        self, after: int | None = None, batch_size: int = 1000
+    ) -> AsyncIterator[CustomerWithFavorites]:
+        return self.repository.stream_customers_with_favorites(
+            after, batch_size
+        )
+
+    async def create_customer(
+        self, customer: CustomerWithPassword
+    ) -> CustomerInDb:
+        customer_in_db = await self.repository.create_customer(customer)
+        self._remember(customer_in_db)
+        return customer_in_db
+
+    async def delete_customer(self, id: int) -> None:
+        self._forget(id)
+        await self.repository.delete_customer(id)
+
+    async def list_favorites_for_customer(
+        self, customer_id: int
+    ) -> list[FavoriteInDb]:
+        return await self.repository.list_favorites_for_customer(customer_id)
+
+    async def add_favorite(self, customer_id: int, product_id: int) -> None:
+        await self.repository.add_favorite(customer_id, product_id)
+
+    async def add_favorites(
+        self, customer_id: int, product_ids: list[int]
+    ) -> None:
+        await self.repository.add_favorites(customer_id, product_ids)
+
+    async def remove_favorite(self, customer_id: int, product_id: int) -> None:
+        await self.repository.remove_favorite(customer_id, product_id)
+
+    async def remove_favorites(
+        self, customer_id: int, product_ids: list[int]
+    ) -> None:
+        await self.repository.remove_favorites(customer_id, product_ids)
+
+    async def set_admin(self, id: int) -> CustomerInDb:
+        self._forget(id)
+        customer = await self.repository.set_admin(id)
+        self._remember(customer)
+        return customer
+
+    async def update_hashed_password(
+        self, id: int, hashed_password: str
+    ) -> None:
+        self._forget(id)
+        await self.repository.update_hashed_password(id, hashed_password)
+
+    async def get_token_version(self, id: int) -> int:
+        return await self.repository.get_token_version(id)
+
+    async def bump_token_version(self, id: int) -> int:
+        return await self.repository.bump_token_version(id)
+
+    async def _get_customer(
+        self, email: str | None, id: int | None
+    ) -> CustomerInDb:
+        if id:
+            return await self.repository.get_customer(id=id)
+        assert email, 'email or id is required'
+        return await self.repository.get_customer(email=email)
+
+    def _remember(self, customer: CustomerInDb) -> None:
+        if (context := get_request_context()) is not None:
+            context.identity_map[('customer', customer.id)] = customer
+            context.identity_map[('customer_email', customer.email)] = customer
+
+    def _forget(self, id: int) -> None:
+        if (context := get_request_context()) is not None:
+            customer = context.identity_map.pop(('customer', id), None)
+            if customer is not None:
+                context.identity_map.pop(
+                    ('customer_email', customer.email), None
+                )
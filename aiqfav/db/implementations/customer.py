@@ -1,11 +1,17 @@
-from sqlalchemy import delete, select, update
-from sqlalchemy.dialects.postgresql import insert
+from typing import AsyncIterator
+
+from sqlalchemy import BigInteger, any_, bindparam, delete, select, update
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import selectinload
 
 from aiqfav.domain.customer import (
     CustomerInDb,
     CustomerNotFound,
+    CustomerWithFavorites,
     CustomerWithPassword,
+    DuplicateEmail,
 )
 from aiqfav.domain.favorite import FavoriteInDb
 
@@ -13,6 +19,10 @@ from ..base import CustomerRepository
 from .models import Customer as CustomerModel
 from .models import Favorite as FavoriteModel
 
+# SQLSTATE of constraint violations
+FOREIGN_KEY_VIOLATION = '23503'
+UNIQUE_VIOLATION = '23505'
+
 
 class CustomerRepositoryImpl(CustomerRepository):
     def __init__(self, async_session: async_sessionmaker[AsyncSession]):
@@ -40,9 +50,31 @@ class CustomerRepositoryImpl(CustomerRepository):
 
             return CustomerInDb.model_validate(customer)
 
-    async def list_customers(self) -> list[CustomerInDb]:
+    async def get_customers_by_ids(self, ids: list[int]) -> list[CustomerInDb]:
         async with self.async_session() as session:
-            stmt = select(CustomerModel)
+            # A single array parameter keeps one statement for any number of
+            # ids (`IN` would expand into one parameter per id)
+            stmt = select(CustomerModel).where(
+                CustomerModel.id
+                == any_(bindparam('ids', ids, type_=ARRAY(BigInteger)))
+            )
+            result = await session.execute(stmt)
+            return [
+                CustomerInDb.model_validate(customer)
+                for customer in result.scalars().all()
+            ]
+
+    async def list_customers(
+        self, limit: int | None = None, after: int | None = None
+    ) -> list[CustomerInDb]:
+        async with self.async_session() as session:
+            # Seeks the primary key index, instead of scanning the skipped
+            # rows as an OFFSET would
+            stmt = select(CustomerModel).order_by(CustomerModel.id)
+            if after is not None:
+                stmt = stmt.where(CustomerModel.id > after)
+            if limit is not None:
+                stmt = stmt.limit(limit)
             result = await session.execute(stmt)
             customers_in_db = result.scalars().all()
             return [
@@ -50,24 +82,105 @@ class CustomerRepositoryImpl(CustomerRepository):
                 for customer in customers_in_db
             ]
 
+    async def list_customers_with_favorites(
+        self, limit: int | None = None, after: int | None = None
+    ) -> list[CustomerWithFavorites]:
+        async with self.async_session() as session:
+            # The favorites of the whole page are loaded by one more query
+            # (`customer_id IN (...)`), instead of one query per customer
+            stmt = (
+                select(CustomerModel)
+                .options(selectinload(CustomerModel.favorites))
+                .order_by(CustomerModel.id)
+            )
+            if after is not None:
+                stmt = stmt.where(CustomerModel.id > after)
+            if limit is not None:
+                stmt = stmt.limit(limit)
+            result = await session.execute(stmt)
+            return [
+                CustomerWithFavorites(
+                    id=customer.id,
+                    name=customer.name,
+                    email=customer.email,
+                    favorites=sorted(
+                        (
+                            FavoriteInDb.model_validate(favorite)
+                            for favorite in customer.favorites
+                        ),
+                        key=lambda favorite: favorite.product_id,
+                    ),
+                )
+                for customer in result.scalars().all()
+            ]
+
+    async def stream_customers_with_favorites(
+        self, after: int | None = None, batch_size: int = 1000
+    ) -> AsyncIterator[CustomerWithFavorites]:
+        stmt = (
+            select(
+                CustomerModel.id,
+                CustomerModel.name,
+                CustomerModel.email,
+                FavoriteModel.product_id,
+            )
+            .outerjoin(FavoriteModel)
+            .order_by(CustomerModel.id, FavoriteModel.product_id)
+            .execution_options(yield_per=batch_size)
+        )
+        if after is not None:
+            stmt = stmt.where(CustomerModel.id > after)
+
+        async with self.async_session() as session:
+            result = await session.stream(stmt)
+            customer: CustomerWithFavorites | None = None
+            async for id, name, email, product_id in result:
+                if customer is None or customer.id != id:
+                    if customer is not None:
+                        yield customer
+                    customer = CustomerWithFavorites(
+                        id=id, name=name, email=email
+                    )
+                if product_id is not None:
+                    customer.favorites.append(
+                        FavoriteInDb(customer_id=id, product_id=product_id)
+                    )
+            if customer is not None:
+                yield customer
+
     async def create_customer(
         self, customer: CustomerWithPassword
     ) -> CustomerInDb:
         async with self.async_session() as session:
-            custmer_in_db = CustomerModel(**customer.model_dump())
-            session.add(custmer_in_db)
-            await session.commit()
-            await session.refresh(custmer_in_db)
-            return CustomerInDb.model_validate(custmer_in_db)
+            # The unique email constraint is the check for an existing
+            # customer, so there is no race between a check and the insert
+            stmt = (
+                insert(CustomerModel)
+                .values(**customer.model_dump())
+                .returning(CustomerModel)
+            )
+            try:
+                result = await session.scalars(stmt)
+                customer_in_db = result.one()
+                await session.commit()
+            except IntegrityError as exc:
+                if getattr(exc.orig, 'sqlstate', None) == UNIQUE_VIOLATION:
+                    raise DuplicateEmail(
+                        f'Customer with email {customer.email} already exists'
+                    ) from exc
+                raise
+            return CustomerInDb.model_validate(customer_in_db)
 
     async def delete_customer(self, id: int) -> None:
         async with self.async_session() as session:
-            customer_in_db = await session.get(CustomerModel, id)
-            if not customer_in_db:
+            stmt = (
+                delete(CustomerModel)
+                .where(CustomerModel.id == id)
+                .returning(CustomerModel.id)
+            )
+            result = await session.execute(stmt)
+            if result.scalar_one_or_none() is None:
                 raise CustomerNotFound(f'Customer with id {id} not found')
-
-            stmt = delete(CustomerModel).where(CustomerModel.id == id)
-            await session.execute(stmt)
             await session.commit()
 
     async def list_favorites_for_customer(
@@ -99,6 +212,36 @@ class CustomerRepositoryImpl(CustomerRepository):
             await session.execute(stmt)
             await session.commit()
 
+    async def add_favorites(
+        self, customer_id: int, product_ids: list[int]
+    ) -> None:
+        async with self.async_session() as session:
+            stmt = (
+                insert(FavoriteModel)
+                .values(
+                    [
+                        {'customer_id': customer_id, 'product_id': product_id}
+                        for product_id in product_ids
+                    ]
+                )
+                .on_conflict_do_nothing(  # For idempotency
+                    index_elements=['customer_id', 'product_id']
+                )
+            )
+            try:
+                await session.execute(stmt)
+                await session.commit()
+            except IntegrityError as exc:
+                # The customer foreign key checks if the customer exists
+                if (
+                    getattr(exc.orig, 'sqlstate', None)
+                    == FOREIGN_KEY_VIOLATION
+                ):
+                    raise CustomerNotFound(
+                        f'Customer with id {customer_id} not found'
+                    ) from exc
+                raise
+
     async def remove_favorite(self, customer_id: int, product_id: int) -> None:
         async with self.async_session() as session:
             stmt = delete(FavoriteModel).where(
@@ -108,19 +251,69 @@ class CustomerRepositoryImpl(CustomerRepository):
             await session.execute(stmt)
             await session.commit()
 
-    async def set_admin(self, id: int) -> CustomerInDb:
-        """Set a customer as admin.
+    async def remove_favorites(
+        self, customer_id: int, product_ids: list[int]
+    ) -> None:
+        async with self.async_session() as session:
+            stmt = delete(FavoriteModel).where(
+                FavoriteModel.customer_id == customer_id,
+                FavoriteModel.product_id
+                == any_(
+                    bindparam(
+                        'product_ids', product_ids, type_=ARRAY(BigInteger)
+                    )
+                ),
+            )
+            await session.execute(stmt)
+            await session.commit()
 
-        Args:
-            id (int): the customer id.
-        """
+    async def set_admin(self, id: int) -> CustomerInDb:
         async with self.async_session() as session:
             stmt = (
                 update(CustomerModel)
                 .where(CustomerModel.id == id)
                 .values(is_admin=True)
+                .returning(CustomerModel)
+            )
+            result = await session.scalars(stmt)
+            customer_in_db = result.one_or_none()
+            if customer_in_db is None:
+                raise CustomerNotFound(f'Customer with id {id} not found')
+            await session.commit()
+            return CustomerInDb.model_validate(customer_in_db)
+
+    async def update_hashed_password(
+        self, id: int, hashed_password: str
+    ) -> None:
+        async with self.async_session() as session:
+            stmt = (
+                update(CustomerModel)
+                .where(CustomerModel.id == id)
+                .values(hashed_password=hashed_password)
             )
             await session.execute(stmt)
             await session.commit()
 
-        return await self.get_customer(id=id)
+    async def get_token_version(self, id: int) -> int:
+        async with self.async_session() as session:
+            stmt = select(CustomerModel.token_version).where(
+                CustomerModel.id == id
+            )
+            version = await session.scalar(stmt)
+            if version is None:
+                raise CustomerNotFound(f'Customer with id {id} not found')
+            return version
+
+    async def bump_token_version(self, id: int) -> int:
+        async with self.async_session() as session:
+            stmt = (
+                update(CustomerModel)
+                .where(CustomerModel.id == id)
+                .values(token_version=CustomerModel.token_version + 1)
+                .returning(CustomerModel.token_version)
+            )
+            version = await session.scalar(stmt)
+            if version is None:
+                raise CustomerNotFound(f'Customer with id {id} not found')
+            await session.commit()
+            return version
@@ -0,0 +1,352 @@
+import asyncio
+import contextlib
+from typing import Any, AsyncIterator
+
+import asyncpg
+
+from aiqfav.domain.customer import (
+    CustomerInDb,
+    CustomerNotFound,
+    CustomerWithFavorites,
+    CustomerWithPassword,
+    DuplicateEmail,
+)
+from aiqfav.domain.favorite import FavoriteInDb
+from aiqfav.utils.request_context import count_db_query
+
+from ..base import CustomerRepository
+
+__all__ = ['CustomerRepositoryAsyncpg']
+
+# asyncpg prepares each statement on first use and keeps it in the
+# connection's statement cache, so the queries below are parsed and
+# planned once per connection
+_CUSTOMER_COLUMNS = 'id, name, email, is_admin, hashed_password'
+_GET_CUSTOMER_BY_ID = f'SELECT {_CUSTOMER_COLUMNS} FROM customer WHERE id = $1'
+_GET_CUSTOMER_BY_EMAIL = (
+    f'SELECT {_CUSTOMER_COLUMNS} FROM customer WHERE email = $1'
+)
+_GET_CUSTOMERS_BY_IDS = (
+    f'SELECT {_CUSTOMER_COLUMNS} FROM customer WHERE id = ANY($1::bigint[])'
+)
+# LIMIT NULL means no limit
+_LIST_CUSTOMERS = (
+    f'SELECT {_CUSTOMER_COLUMNS} FROM customer WHERE id > $1 '
+    'ORDER BY id LIMIT $2'
+)
+# The page of customers is aggregated with its favorites in one query
+_LIST_CUSTOMERS_WITH_FAVORITES = (
+    'SELECT c.id, c.name, c.email, '
+    'COALESCE(array_agg(f.product_id ORDER BY f.product_id) '
+    "FILTER (WHERE f.product_id IS NOT NULL), '{}') AS product_ids "
+    'FROM (SELECT id, name, email FROM customer WHERE id > $1 '
+    'ORDER BY id LIMIT $2) c '
+    'LEFT JOIN favorite f ON f.customer_id = c.id '
+    'GROUP BY c.id, c.name, c.email ORDER BY c.id'
+)
+_STREAM_CUSTOMERS_WITH_FAVORITES = (
+    'SELECT c.id, c.name, c.email, f.product_id FROM customer c '
+    'LEFT JOIN favorite f ON f.customer_id = c.id '
+    'WHERE c.id > $1 ORDER BY c.id, f.product_id'
+)
+_CREATE_CUSTOMER = (
+    'INSERT INTO customer (name, email, is_admin, hashed_password) '
+    f'VALUES ($1, $2, false, $3) RETURNING {_CUSTOMER_COLUMNS}'
+)
+_DELETE_CUSTOMER = 'DELETE FROM customer WHERE id = $1'
+_LIST_FAVORITES = (
+    'SELECT customer_id, product_id FROM favorite WHERE customer_id = $1'
+)
+_ADD_FAVORITE = (
+    'INSERT INTO favorite (customer_id, product_id) VALUES ($1, $2) '
+    'ON CONFLICT (customer_id, product_id) DO NOTHING'
+)
+_ADD_FAVORITES = (
+    'INSERT INTO favorite (customer_id, product_id) '
+    'SELECT $1, unnest($2::bigint[]) '
+    'ON CONFLICT (customer_id, product_id) DO NOTHING'
+)
+_REMOVE_FAVORITES = (
+    'DELETE FROM favorite '
+    'WHERE customer_id = $1 AND product_id = ANY($2::bigint[])'
+)
+_REMOVE_FAVORITE = (
+    'DELETE FROM favorite WHERE customer_id = $1 AND product_id = $2'
+)
+_SET_ADMIN = (
+    'UPDATE customer SET is_admin = true WHERE id = $1 '
+    f'RETURNING {_CUSTOMER_COLUMNS}'
+)
+_UPDATE_HASHED_PASSWORD = (
+    'UPDATE customer SET hashed_password = $2 WHERE id = $1'
+)
+_GET_TOKEN_VERSION = 'SELECT token_version FROM customer WHERE id = $1'
+_BUMP_TOKEN_VERSION = (
+    'UPDATE customer SET token_version = token_version + 1 WHERE id = $1 '
+    'RETURNING token_version'
+)
+
+
+def _to_customer(row: asyncpg.Record) -> CustomerInDb:
+    # Rows come from the database schema, so validation is skipped
+    return CustomerInDb.model_construct(
+        id=row[0],
+        name=row[1],
+        email=row[2],
+        is_admin=row[3],
+        hashed_password=row[4],
+    )
+
+
+class CustomerRepositoryAsyncpg(CustomerRepository):
+    """Customer repository running SQL directly on an asyncpg pool.
+
+    A faster alternative to `CustomerRepositoryImpl`: rows are mapped
+    straight into the domain models, skipping the ORM objects and their
+    validation, and every method is a single round trip.
+
+    The pool is created on first use, since it can only be created
+    within a running event loop; close it with `aclose`. Like the
+    engine's pool, a connection is waited for at most `pool_timeout`
+    seconds and, with `pre_ping`, checked before use.
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        pool_timeout: float | None = None,
+        pre_ping: bool = False,
+        **pool_kwargs: Any,
+    ):
+        self.dsn = dsn
+        self.pool_timeout = pool_timeout
+        self.pre_ping = pre_ping
+        self.pool_kwargs = pool_kwargs
+        self._pool: asyncpg.Pool | None = None
+        self._pool_lock = asyncio.Lock()
+
+    async def aclose(self) -> None:
+        """Close the connection pool, if created"""
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+
+    def pool_stats(self) -> dict[str, int]:
+        """Usage of the connection pool (empty until it is created)"""
+        if self._pool is None:
+            return {}
+        size = self._pool.get_size()
+        idle = self._pool.get_idle_size()
+        return {
+            'size': size,
+            'max_size': self._pool.get_max_size(),
+            'checked_out': size - idle,
+            'checked_in': idle,
+        }
+
+    async def get_customer(
+        self, *, email: str | None = None, id: int | None = None
+    ) -> CustomerInDb:
+        if id:
+            row = await self._fetchrow(_GET_CUSTOMER_BY_ID, id)
+            if row is None:
+                raise CustomerNotFound(f'Customer with id {id} not found')
+        elif email:
+            row = await self._fetchrow(_GET_CUSTOMER_BY_EMAIL, email)
+            if row is None:
+                raise CustomerNotFound(
+                    f'Customer with email {email} not found'
+                )
+        else:
+            raise ValueError('Either email or id must be provided')
+
+        return _to_customer(row)
+
+    async def get_customers_by_ids(self, ids: list[int]) -> list[CustomerInDb]:
+        rows = await self._fetch(_GET_CUSTOMERS_BY_IDS, ids)
+        return [_to_customer(row) for row in rows]
+
+    async def list_customers(
+        self, limit: int | None = None, after: int | None = None
+    ) -> list[CustomerInDb]:
+        rows = await self._fetch(_LIST_CUSTOMERS, after or 0, limit)
+        return [_to_customer(row) for row in rows]
+
+    async def list_customers_with_favorites(
+        self, limit: int | None = None, after: int | None = None
+    ) -> list[CustomerWithFavorites]:
+        rows = await self._fetch(
+            _LIST_CUSTOMERS_WITH_FAVORITES, after or 0, limit
+        )
+        return [
+            CustomerWithFavorites.model_construct(
+                id=row['id'],
+                name=row['name'],
+                email=row['email'],
+                favorites=[
+                    FavoriteInDb.model_construct(
+                        customer_id=row['id'], product_id=product_id
+                    )
+                    for product_id in row['product_ids']
+                ],
+            )
+            for row in rows
+        ]
+
+    async def stream_customers_with_favorites(
+        self, after: int | None = None, batch_size: int = 1000
+    ) -> AsyncIterator[CustomerWithFavorites]:
+        count_db_query()
+        # Server-side cursors only live within a transaction
+        async with self._acquire() as conn, conn.transaction():
+            customer: CustomerWithFavorites | None = None
+            async for id, name, email, product_id in conn.cursor(
+                _STREAM_CUSTOMERS_WITH_FAVORITES,
+                after or 0,
+                prefetch=batch_size,
+            ):
+                if customer is None or customer.id != id:
+                    if customer is not None:
+                        yield customer
+                    customer = CustomerWithFavorites.model_construct(
+                        id=id, name=name, email=email, favorites=[]
+                    )
+                if product_id is not None:
+                    customer.favorites.append(
+                        FavoriteInDb.model_construct(
+                            customer_id=id, product_id=product_id
+                        )
+                    )
+            if customer is not None:
+                yield customer
+
+    async def create_customer(
+        self, customer: CustomerWithPassword
+    ) -> CustomerInDb:
+        try:
+            row = await self._fetchrow(
+                _CREATE_CUSTOMER,
+                customer.name,
+                customer.email,
+                customer.hashed_password,
+            )
+        except asyncpg.UniqueViolationError as exc:
+            raise DuplicateEmail(
+                f'Customer with email {customer.email} already exists'
+            ) from exc
+        assert row is not None
+        return _to_customer(row)
+
+    async def delete_customer(self, id: int) -> None:
+        status = await self._execute(_DELETE_CUSTOMER, id)
+        if status == 'DELETE 0':
+            raise CustomerNotFound(f'Customer with id {id} not found')
+
+    async def list_favorites_for_customer(
+        self, customer_id: int
+    ) -> list[FavoriteInDb]:
+        rows = await self._fetch(_LIST_FAVORITES, customer_id)
+        return [
+            FavoriteInDb.model_construct(customer_id=row[0], product_id=row[1])
+            for row in rows
+        ]
+
+    async def add_favorite(self, customer_id: int, product_id: int) -> None:
+        await self._execute(_ADD_FAVORITE, customer_id, product_id)
+
+    async def add_favorites(
+        self, customer_id: int, product_ids: list[int]
+    ) -> None:
+        try:
+            await self._execute(_ADD_FAVORITES, customer_id, product_ids)
+        except asyncpg.ForeignKeyViolationError as exc:
+            raise CustomerNotFound(
+                f'Customer with id {customer_id} not found'
+            ) from exc
+
+    async def remove_favorite(self, customer_id: int, product_id: int) -> None:
+        await self._execute(_REMOVE_FAVORITE, customer_id, product_id)
+
+    async def remove_favorites(
+        self, customer_id: int, product_ids: list[int]
+    ) -> None:
+        await self._execute(_REMOVE_FAVORITES, customer_id, product_ids)
+
+    async def set_admin(self, id: int) -> CustomerInDb:
+        row = await self._fetchrow(_SET_ADMIN, id)
+        if row is None:
+            raise CustomerNotFound(f'Customer with id {id} not found')
+        return _to_customer(row)
+
+    async def update_hashed_password(
+        self, id: int, hashed_password: str
+    ) -> None:
+        await self._execute(_UPDATE_HASHED_PASSWORD, id, hashed_password)
+
+    async def get_token_version(self, id: int) -> int:
+        row = await self._fetchrow(_GET_TOKEN_VERSION, id)
+        if row is None:
+            raise CustomerNotFound(f'Customer with id {id} not found')
+        return row[0]
+
+    async def bump_token_version(self, id: int) -> int:
+        row = await self._fetchrow(_BUMP_TOKEN_VERSION, id)
+        if row is None:
+            raise CustomerNotFound(f'Customer with id {id} not found')
+        return row[0]
+
+    async def _get_pool(self) -> asyncpg.Pool:
+        if self._pool is None:
+            async with self._pool_lock:
+                if self._pool is None:
+                    self._pool = await asyncpg.create_pool(
+                        self.dsn, **self.pool_kwargs
+                    )
+        return self._pool
+
+    @contextlib.asynccontextmanager
+    async def _acquire(
+        self,
+    ) -> AsyncIterator[asyncpg.pool.PoolConnectionProxy]:
+        """Acquire a connection from the pool.
+
+        With `pre_ping`, a connection found closed (e.g. after a database
+        restart) expires all the pooled ones, which reconnect on their
+        next use, and is replaced by a new one.
+        """
+        pool = await self._get_pool()
+        conn = await pool.acquire(timeout=self.pool_timeout)
+        if self.pre_ping and not await self._ping(conn):
+            await pool.expire_connections()
+            await pool.release(conn)
+            conn = await pool.acquire(timeout=self.pool_timeout)
+        try:
+            yield conn
+        finally:
+            await pool.release(conn)
+
+    async def _ping(self, conn: asyncpg.pool.PoolConnectionProxy) -> bool:
+        try:
+            await conn.execute('SELECT 1')
+        except (
+            OSError,
+            asyncpg.InterfaceError,
+            asyncpg.PostgresConnectionError,
+        ):
+            return False
+        return True
+
+    async def _fetch(self, query: str, *args: Any) -> list[asyncpg.Record]:
+        async with self._acquire() as conn:
+            count_db_query()
+            return await conn.fetch(query, *args)
+
+    async def _fetchrow(self, query: str, *args: Any) -> asyncpg.Record | None:
+        async with self._acquire() as conn:
+            count_db_query()
+            return await conn.fetchrow(query, *args)
+
+    async def _execute(self, query: str, *args: Any) -> str:
+        async with self._acquire() as conn:
+            count_db_query()
+            return await conn.execute(query, *args)
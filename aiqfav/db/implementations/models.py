@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from sqlalchemy import BigInteger, Boolean, ForeignKey, String
+from sqlalchemy import BigInteger, Boolean, ForeignKey, Integer, String
 from sqlalchemy.ext.asyncio import AsyncAttrs
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
@@ -19,6 +19,9 @@ class Customer(Base):
     email: Mapped[str] = mapped_column(String(255), unique=True)
     is_admin: Mapped[bool] = mapped_column(Boolean(), default=False)
     hashed_password: Mapped[str] = mapped_column(String(255))
+    token_version: Mapped[int] = mapped_column(
+        Integer(), default=0, server_default='0'
+    )
 
     favorites: Mapped[list[Favorite]] = relationship(
         back_populates='customer', cascade='all, delete-orphan'
@@ -0,0 +1,57 @@
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import QueuePool
+
+__all__ = ['PoolStats']
+
+
+class PoolStats:
+    """Connection pool metrics of an engine, collected from pool events.
+
+    SQLAlchemy has no event before a checkout starts waiting for a free
+    connection, so the time spent waiting on the pool isn't measured; a
+    high `checked_out` close to `size + max_overflow` is the saturation
+    signal instead.
+    """
+
+    def __init__(self, engine: AsyncEngine):
+        self.pool = engine.sync_engine.pool
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+
+        event.listen(self.pool, 'connect', self._on_connect)
+        event.listen(self.pool, 'checkout', self._on_checkout)
+        event.listen(self.pool, 'checkin', self._on_checkin)
+        event.listen(self.pool, 'invalidate', self._on_invalidate)
+
+    def _on_connect(self, *args: Any) -> None:
+        self.connects += 1
+
+    def _on_checkout(self, *args: Any) -> None:
+        self.checkouts += 1
+
+    def _on_checkin(self, *args: Any) -> None:
+        self.checkins += 1
+
+    def _on_invalidate(self, *args: Any) -> None:
+        self.invalidations += 1
+
+    def as_dict(self) -> dict[str, int]:
+        stats = {
+            'connects': self.connects,
+            'checkouts': self.checkouts,
+            'checkins': self.checkins,
+            'invalidations': self.invalidations,
+        }
+        if isinstance(self.pool, QueuePool):
+            stats |= {
+                'size': self.pool.size(),
+                'checked_out': self.pool.checkedout(),
+                'checked_in': self.pool.checkedin(),
+                'overflow': self.pool.overflow(),
+            }
+        return stats
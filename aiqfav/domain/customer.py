@@ -1,8 +1,11 @@
+from enum import StrEnum
+
 from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
 
 from aiqfav.utils.pydantic.types import Password
 
 from .favorite import FavoriteInDb
+from .product import ProductPublic
 
 
 ### Models
@@ -34,6 +37,42 @@ class CustomerPublic(CustomerBase):
     id: int = Field(description='ID do cliente', gt=0)
 
 
+class CustomerInclude(StrEnum):
+    """Dados adicionais que podem ser incluídos no perfil do cliente"""
+
+    FAVORITES = 'favorites'
+
+
+class CustomerProfile(CustomerPublic):
+    """Modelo para o perfil de um cliente, com os dados incluídos"""
+
+    favorites: list[ProductPublic] | None = Field(
+        default=None,
+        description=(
+            'Produtos favoritos do cliente (apenas com include=favorites)'
+        ),
+    )
+
+
+class AuthenticatedCustomer(CustomerPublic):
+    """Modelo para um cliente autenticado pelas claims do token"""
+
+    is_admin: bool = Field(description='Se o cliente é administrador')
+
+
+class CustomerPage(BaseModel):
+    """Modelo para uma página da listagem de clientes, ordenada por ID"""
+
+    customers: list[CustomerPublic] = Field(description='Clientes da página')
+    next_after: int | None = Field(
+        default=None,
+        description=(
+            'Cursor da próxima página (ID do último cliente desta página), '
+            'ou None se esta for a última'
+        ),
+    )
+
+
 class CustomerWithFavorites(CustomerBase):
     """Modelo para um cliente"""
 
@@ -44,6 +83,22 @@ class CustomerWithFavorites(CustomerBase):
     )
 
 
+class CustomerWithFavoritesPage(BaseModel):
+    """Modelo para uma página da listagem de clientes com seus favoritos,
+    ordenada por ID"""
+
+    customers: list[CustomerWithFavorites] = Field(
+        description='Clientes da página, com seus favoritos'
+    )
+    next_after: int | None = Field(
+        default=None,
+        description=(
+            'Cursor da próxima página (ID do último cliente desta página), '
+            'ou None se esta for a última'
+        ),
+    )
+
+
 class CustomerWithPassword(CustomerBase):
     """Modelo para um cliente com senha"""
 
@@ -81,5 +136,9 @@ class CustomerNotFound(CustomerBaseException):
     """Exception when a customer is not found."""
 
 
+class DuplicateEmail(CustomerBaseException):
+    """Exception when a customer with the same email already exists."""
+
+
 ### Type Adapters
 CustomerListAdapter = TypeAdapter(list[CustomerPublic])
@@ -1,5 +1,10 @@
+from typing import Annotated
+
 from pydantic import BaseModel, ConfigDict, Field
 
+# Máximo de produtos por requisição nas operações em lote
+MAX_BULK_FAVORITES = 500
+
 
 ### Models
 class FavoriteInDb(BaseModel):
@@ -23,3 +28,11 @@ class ProductPublic(BaseModel):
 
 class FavoriteUpsert(BaseModel):
     product_id: int = Field(description='ID do produto', gt=0)
+
+
+class FavoriteBulkUpsert(BaseModel):
+    product_ids: list[Annotated[int, Field(gt=0)]] = Field(
+        description='IDs dos produtos',
+        min_length=1,
+        max_length=MAX_BULK_FAVORITES,
+    )
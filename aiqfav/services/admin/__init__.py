@@ -29,5 +29,5 @@ class AdminService:
             customer
         )
 
-        await self.customer_repo.set_admin(customer_created.id)
+        await self.customer_service.set_admin(customer_created.id)
         return customer_created
@@ -1,36 +1,57 @@
 import logging
 from datetime import datetime, timedelta, timezone
-from typing import Callable, Literal
+from typing import Any, Callable, Literal
 
-from passlib.context import CryptContext
+from pydantic import ValidationError
 
-from aiqfav.adapters.base import JwtAdapter
+from aiqfav.adapters.base import JwtAdapter, PasswordHasher
 from aiqfav.adapters.exceptions import ExpiredToken, InvalidAudience
+from aiqfav.adapters.token_versions import TokenVersionStore
 from aiqfav.db.base import CustomerRepository
-from aiqfav.domain.customer import CustomerNotFound
+from aiqfav.domain.customer import (
+    AuthenticatedCustomer,
+    CustomerInDb,
+    CustomerNotFound,
+)
 from aiqfav.services.customer.exceptions import InvalidCredentials
 
 from .exceptions import InvalidToken
 
 
 class AuthService:
+    """Issues and validates the customers' JWTs.
+
+    In stateless mode, access tokens also carry the customer's profile
+    and admin claims plus their token version, so requests are
+    authenticated and authorized from the token alone. Revocation (e.g.
+    on deletion or role change) is covered by bumping the customer's
+    token version in `token_versions`.
+    """
+
     def __init__(
         self,
         customer_repo: CustomerRepository,
-        pwd_context: CryptContext,
+        password_hasher: PasswordHasher,
         access_token_expiration: timedelta,
         refresh_token_expiration: timedelta,
         jti_generator: Callable[[], str],
         jwt_adapter: JwtAdapter,
         jwt_issuer: str,
+        token_versions: TokenVersionStore | None = None,
+        stateless: bool = False,
     ):
+        assert not stateless or token_versions is not None, (
+            'token_versions is required in stateless mode'
+        )
         self.customer_repo = customer_repo
-        self.pwd_context = pwd_context
+        self.password_hasher = password_hasher
         self.access_token_expiration = access_token_expiration
         self.refresh_token_expiration = refresh_token_expiration
         self.jwt_adapter = jwt_adapter
         self.jwt_issuer = jwt_issuer
         self.jti_generator = jti_generator
+        self.token_versions = token_versions
+        self.stateless = stateless
 
     async def pair_tokens(self, email: str, password: str) -> tuple[str, str]:
         """Generate a pair of access and refresh tokens for a customer
@@ -56,10 +77,25 @@ class AuthService:
         except CustomerNotFound:
             raise invalid_credentials_exception
 
-        if not self.pwd_context.verify(password, customer.hashed_password):
+        (
+            verified,
+            new_hashed_password,
+        ) = await self.password_hasher.verify_and_update(
+            password, customer.hashed_password
+        )
+        if not verified:
             raise invalid_credentials_exception
 
-        access_token, refresh_token = self._generate_tokens(customer.id)
+        if new_hashed_password:
+            # Hashed with outdated parameters: store it with the current ones
+            logging.info('Rehashing password of customer %s', customer.id)
+            await self.customer_repo.update_hashed_password(
+                customer.id, new_hashed_password
+            )
+
+        access_token, refresh_token = await self._generate_customer_tokens(
+            customer
+        )
 
         return access_token, refresh_token
 
@@ -79,6 +115,73 @@ class AuthService:
         """
         logging.info('Getting customer ID from token')
 
+        customer_id = int(self._decode_token(token, token_type)['sub'])
+        logging.debug('Customer ID: %s', customer_id)
+
+        return customer_id
+
+    async def get_customer_from_token(
+        self, token: str
+    ) -> AuthenticatedCustomer:
+        """Get the customer from the claims of an access token, without
+        looking them up (stateless mode)
+
+        Args:
+            token (str): The access token.
+
+        Returns:
+            AuthenticatedCustomer: The customer, with their admin claim.
+
+        Raises:
+            InvalidToken: If the token is expired, invalid, revoked or does
+                not contain the customer claims.
+        """
+        logging.info('Getting customer from token claims')
+
+        token_data = self._decode_token(token, 'access')
+        await self._check_token_version(token_data)
+
+        try:
+            return AuthenticatedCustomer(
+                id=int(token_data['sub']),
+                name=token_data['name'],
+                email=token_data['email'],
+                is_admin=token_data['is_admin'],
+            )
+        except (KeyError, ValidationError) as e:
+            raise InvalidToken('Token não contém os dados do cliente') from e
+
+    async def refresh_token(self, refresh_token: str) -> tuple[str, str]:
+        """Refresh a token
+
+        Args:
+            refresh_token (str): The refresh token to refresh.
+
+        Raises:
+            InvalidToken: If the token is expired, invalid or revoked.
+        """
+        logging.info('Refreshing token')
+        if not self.stateless:
+            customer_id = self.get_customer_id_from_token(
+                refresh_token, token_type='refresh'
+            )
+            return self._generate_tokens(customer_id)
+
+        # The claims are refreshed from the database
+        token_data = self._decode_token(refresh_token, 'refresh')
+        await self._check_token_version(token_data)
+        try:
+            customer = await self.customer_repo.get_customer(
+                id=int(token_data['sub'])
+            )
+        except CustomerNotFound as e:
+            raise InvalidToken('Token inválido ou expirado') from e
+
+        return await self._generate_customer_tokens(customer)
+
+    def _decode_token(
+        self, token: str, token_type: Literal['access', 'refresh']
+    ) -> dict[str, Any]:
         try:
             token_data = self.jwt_adapter.decode(token, audience=[token_type])
         except (ExpiredToken, InvalidAudience) as e:
@@ -87,22 +190,38 @@ class AuthService:
         if 'sub' not in token_data:  # pragma: no cover
             raise InvalidToken('Token não contém um ID de cliente')
 
-        customer_id = int(token_data['sub'])
-        logging.debug('Customer ID: %s', customer_id)
+        return token_data
 
-        return customer_id
+    async def _check_token_version(self, token_data: dict[str, Any]) -> None:
+        assert self.token_versions is not None
+        customer_id = int(token_data['sub'])
+        try:
+            version = await self.token_versions.get(customer_id)
+        except CustomerNotFound as e:
+            raise InvalidToken('Token inválido ou expirado') from e
+        if token_data.get('ver', 0) < version:
+            logging.debug('Revoked token for customer %s', customer_id)
+            raise InvalidToken('Token inválido ou expirado')
 
-    def refresh_token(self, refresh_token: str) -> tuple[str, str]:
-        """Refresh a token
+    async def _generate_customer_tokens(
+        self, customer: CustomerInDb
+    ) -> tuple[str, str]:
+        if not self.stateless:
+            return self._generate_tokens(customer.id)
 
-        Args:
-            refresh_token (str): The refresh token to refresh.
-        """
-        logging.info('Refreshing token')
-        customer_id = self.get_customer_id_from_token(
-            refresh_token, token_type='refresh'
+        assert self.token_versions is not None
+        version = await self.token_versions.get(customer.id)
+        claims = {
+            'name': customer.name,
+            'email': customer.email,
+            'is_admin': customer.is_admin,
+        }
+        access_token = self._generate_token(
+            customer.id, 'access', {'ver': version, **claims}
+        )
+        refresh_token = self._generate_token(
+            customer.id, 'refresh', {'ver': version}
         )
-        access_token, refresh_token = self._generate_tokens(customer_id)
         return access_token, refresh_token
 
     def _generate_tokens(self, customer_id: int) -> tuple[str, str]:
@@ -110,7 +229,12 @@ class AuthService:
         refresh_token = self._generate_token(customer_id, 'refresh')
         return access_token, refresh_token
 
-    def _generate_token(self, customer_id: int, token_type: str) -> str:
+    def _generate_token(
+        self,
+        customer_id: int,
+        token_type: str,
+        claims: dict[str, Any] | None = None,
+    ) -> str:
         iat = datetime.now(timezone.utc)
         specific_data = {
             'access': {
@@ -132,6 +256,7 @@ class AuthService:
             'iat': iat,
             'sub': str(customer_id),
             **specific_data[token_type],
+            **(claims or {}),
         }
 
         return self.jwt_adapter.encode(token_data)
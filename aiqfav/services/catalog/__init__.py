@@ -0,0 +1,68 @@
+import asyncio
+import logging
+import math
+import uuid
+
+from aiqfav.adapters.base import StoreApiAdapter
+from aiqfav.adapters.redis_adapter import RedisAsyncProtocol
+
+__all__ = ['CatalogSyncService']
+
+CATALOG_SYNC_LEASE_KEY = 'lease:catalog_sync'
+
+
+class CatalogSyncService:
+    """Keeps the product cache warm by syncing the catalog periodically.
+
+    Every worker runs the sync loop, but a Redis lease (SET NX EX) lasting
+    one `interval` makes only one of them sync the catalog per interval.
+    The interval should be shorter than the catalog cache soft expiration,
+    so user requests never find a stale or cold catalog.
+    """
+
+    def __init__(
+        self,
+        store_api_adapter: StoreApiAdapter,
+        redis: RedisAsyncProtocol,
+        interval: float = 5 * 60,
+        owner: str | None = None,
+    ):
+        self.store_api_adapter = store_api_adapter
+        self.redis = redis
+        self.interval = interval
+        self.owner = owner or uuid.uuid4().hex
+
+    async def sync_once(self) -> bool:
+        """Sync the catalog, unless another worker holds the lease.
+
+        Returns:
+            bool: whether this worker synced the catalog.
+        """
+        acquired = await self.redis.set(
+            CATALOG_SYNC_LEASE_KEY,
+            self.owner,
+            ex=max(1, math.floor(self.interval)),
+            nx=True,
+        )
+        if not acquired:
+            logging.debug('Catalog sync lease held by another worker')
+            return False
+
+        try:
+            changed = await self.store_api_adapter.sync_catalog()
+        except Exception:
+            # Let another worker retry on its next tick
+            await self.redis.delete(CATALOG_SYNC_LEASE_KEY)
+            raise
+
+        logging.info('Catalog synced, %s products changed', changed)
+        return True
+
+    async def run(self) -> None:
+        """Sync the catalog every `interval` seconds, until cancelled"""
+        while True:
+            try:
+                await self.sync_once()
+            except Exception:
+                logging.exception('Catalog sync failed')
+            await asyncio.sleep(self.interval)
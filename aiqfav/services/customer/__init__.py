@@ -1,18 +1,23 @@
 import logging
 
-from passlib.context import CryptContext
-
-from aiqfav.adapters.base import StoreApiAdapter
+from aiqfav.adapters.base import PasswordHasher, StoreApiAdapter
 from aiqfav.adapters.redis_adapter import RedisAsyncProtocol
+from aiqfav.adapters.token_versions import TokenVersionStore
 from aiqfav.db.base import CustomerRepository
 from aiqfav.domain.customer import (
     CustomerCreate,
-    CustomerListAdapter,
     CustomerNotFound,
+    CustomerPage,
+    CustomerProfile,
     CustomerPublic,
+    CustomerWithFavoritesPage,
     CustomerWithPassword,
+    DuplicateEmail,
 )
 from aiqfav.domain.product import ProductListAdapter, ProductPublic
+from aiqfav.utils.background import run_in_background
+from aiqfav.utils.cache import CacheEntry, TTLCache
+from aiqfav.utils.singleflight import SingleFlight
 
 from .exceptions import EmailAlreadyExists
 
@@ -22,15 +27,27 @@ class CustomerService:
         self,
         customer_repo: CustomerRepository,
         store_api_adapter: StoreApiAdapter,
-        pwd_context: CryptContext,
+        password_hasher: PasswordHasher,
         redis: RedisAsyncProtocol,
         cache_expiration: int = 60 * 60,
+        local_cache: TTLCache[CustomerPublic] | None = None,
+        favorites_cache_soft_expiration: int | None = None,
+        single_flight: SingleFlight | None = None,
+        token_versions: TokenVersionStore | None = None,
     ):
         self.customer_repo = customer_repo
         self.store_api_adapter = store_api_adapter
-        self.pwd_context = pwd_context
+        self.password_hasher = password_hasher
         self.redis = redis
         self.cache_expiration = cache_expiration
+        self.local_cache = local_cache
+        self.favorites_cache_soft_expiration = (
+            favorites_cache_soft_expiration or cache_expiration
+        )
+        self.single_flight = single_flight or SingleFlight()
+        self.token_versions = token_versions or TokenVersionStore(
+            redis, customer_repo
+        )
 
     async def get_customer_by_id(self, id: int) -> CustomerPublic:
         logging.info('Getting customer by id %s', id)
@@ -49,54 +66,123 @@ class CustomerService:
 
         return customer
 
-    async def list_customers(self) -> list[CustomerPublic]:
-        logging.info('Listing customers')
+    async def get_customer_profile(
+        self, customer: CustomerPublic
+    ) -> CustomerProfile:
+        """Get a customer with their favorite products, in one document.
 
-        if cached_customers_data := await self._get_cached_customers():
-            logging.debug('Cache hit for customers')
-            return cached_customers_data
-        else:
-            logging.debug('Cache miss for customers')
+        The customer is the one already resolved by the caller (e.g. the
+        authenticated customer), so only the favorites are loaded, through
+        their cache and with its stale-while-revalidate semantics.
 
-        customers_in_db = await self.customer_repo.list_customers()
+        Raises:
+            CustomerNotFound: if the customer cannot be found.
+        """
+        logging.info('Getting profile of customer %s', customer.id)
 
+        favorites = await self.list_favorites_for_customer(customer.id)
+        return CustomerProfile(
+            id=customer.id,
+            name=customer.name,
+            email=customer.email,
+            favorites=favorites,
+        )
+
+    async def list_customers(
+        self, limit: int = 50, after: int | None = None
+    ) -> CustomerPage:
+        """List a page of customers, ordered by id.
+
+        Each page is cached on its own, under the current version of the
+        listing; creating or deleting a customer bumps the version, which
+        invalidates all the cached pages at once.
+
+        Args:
+            limit (int): the max number of customers in the page.
+            after (int | None): the cursor of the page, i.e. the last
+                customer id of the previous page (None for the first page).
+        """
+        logging.info('Listing customers (limit %s, after %s)', limit, after)
+
+        version = await self._get_customers_version()
+        key = f'customers:v{version}:{after or 0}:{limit}'
+        if cached_page := await self._get_cached_customers(key):
+            logging.debug('Cache hit for customers page %s', key)
+            return cached_page
+        else:
+            logging.debug('Cache miss for customers page %s', key)
+
+        # One more customer tells if there is a next page
+        customers_in_db = await self.customer_repo.list_customers(
+            limit + 1, after
+        )
         customers = [
             CustomerPublic.model_validate(customer)
-            for customer in customers_in_db
+            for customer in customers_in_db[:limit]
         ]
+        page = CustomerPage(
+            customers=customers,
+            next_after=(
+                customers[-1].id if len(customers_in_db) > limit else None
+            ),
+        )
+
+        await self._cache_customers(key, page)
+
+        return page
+
+    async def list_customers_with_favorites(
+        self, limit: int = 50, after: int | None = None
+    ) -> CustomerWithFavoritesPage:
+        """List a page of customers with their favorites, ordered by id.
+
+        The page is loaded with its favorites at once and isn't cached, as
+        any favorite change of its customers would invalidate it.
 
-        await self._cache_customers(customers)
+        Args:
+            limit (int): the max number of customers in the page.
+            after (int | None): the cursor of the page, i.e. the last
+                customer id of the previous page (None for the first page).
+        """
+        logging.info(
+            'Listing customers with favorites (limit %s, after %s)',
+            limit,
+            after,
+        )
 
-        return customers
+        # One more customer tells if there is a next page
+        customers = await self.customer_repo.list_customers_with_favorites(
+            limit + 1, after
+        )
+        return CustomerWithFavoritesPage(
+            customers=customers[:limit],
+            next_after=customers[limit - 1].id
+            if len(customers) > limit
+            else None,
+        )
 
     async def create_customer(
         self, customer: CustomerCreate
     ) -> CustomerPublic:
         logging.info('Creating customer %s', customer.email)
 
-        try:
-            customer_in_db = await self.customer_repo.get_customer(
-                email=customer.email
-            )
-        except CustomerNotFound:
-            pass
-        else:
-            raise EmailAlreadyExists('Já existe um cliente com este e-mail')
-
-        hashed_password = self.pwd_context.hash(customer.password)
+        hashed_password = await self.password_hasher.hash(customer.password)
         customer_with_password = CustomerWithPassword(
             name=customer.name,
             email=customer.email,
             hashed_password=hashed_password,
         )
-        customer_in_db = await self.customer_repo.create_customer(
-            customer_with_password
-        )
+        try:
+            customer_in_db = await self.customer_repo.create_customer(
+                customer_with_password
+            )
+        except DuplicateEmail:
+            raise EmailAlreadyExists('Já existe um cliente com este e-mail')
 
         new_customer = CustomerPublic.model_validate(customer_in_db)
 
         await self._cache_customer(new_customer)
-        await self._delete_cached_customers()
+        await self._invalidate_cached_customers()
 
         return new_customer
 
@@ -104,8 +190,21 @@ class CustomerService:
         logging.info('Deleting customer %s', id)
 
         await self.customer_repo.delete_customer(id=id)
+        await self.token_versions.delete(id)
         await self._delete_cached_customer(id)
-        await self._delete_cached_customers()
+        await self._invalidate_cached_customers()
+
+    async def set_admin(self, id: int) -> None:
+        """Set a customer as admin, revoking their tokens so new ones are
+        issued with the admin claim.
+
+        Args:
+            id (int): the customer id.
+        """
+        logging.info('Setting customer %s as admin', id)
+
+        await self.customer_repo.set_admin(id)
+        await self.token_versions.bump(id)
 
     async def check_is_admin(self, id: int) -> bool:
         logging.info('Checking if customer %s is admin', id)
@@ -115,34 +214,46 @@ class CustomerService:
     async def list_favorites_for_customer(
         self, customer_id: int
     ) -> list[ProductPublic]:
+        """List the favorite products of a customer.
+
+        The cached list is served while it is fresh. After its soft TTL
+        (`favorites_cache_soft_expiration`) it is still served, but
+        refreshed in background; only after the hard TTL
+        (`cache_expiration`) the request waits for the database and the
+        store API.
+
+        Raises:
+            CustomerNotFound: if the customer cannot be found.
+        """
         logging.info('Listing favorites for customer %s', customer_id)
 
-        cached_favorites_data = await self._get_cached_favorites(customer_id)
-        if cached_favorites_data:
+        key = f'favorites:{customer_id}'
+        cached_favorites = await self._get_cached_favorites(customer_id)
+        if cached_favorites is not None:
             logging.debug(
                 'Cache hit for favorites for customer %s', customer_id
             )
-            return cached_favorites_data
+            favorites, is_stale = cached_favorites
+            if is_stale and key not in self.single_flight:
+                logging.debug(
+                    'Stale favorites for customer %s, refreshing in '
+                    'background',
+                    customer_id,
+                )
+                run_in_background(
+                    self.single_flight.do(
+                        key, lambda: self._load_favorites(customer_id)
+                    )
+                )
+            return favorites
         else:
             logging.debug(
                 'Cache miss for favorites for customer %s', customer_id
             )
 
-        # Valida se o cliente existe
-        # Raises CustomerNotFound, se o cliente não existe
-        await self.customer_repo.get_customer(id=customer_id)
-
-        favorites_in_db = await self.customer_repo.list_favorites_for_customer(
-            customer_id
+        return await self.single_flight.do(
+            key, lambda: self._load_favorites(customer_id)
         )
-        product_ids = [favorite.product_id for favorite in favorites_in_db]
-        favorite_products = await self.store_api_adapter.get_products_in_batch(
-            product_ids
-        )
-
-        await self._cache_favorites(customer_id, favorite_products)
-
-        return favorite_products
 
     async def add_favorite(
         self, customer_id: int, product_id: int
@@ -170,6 +281,46 @@ class CustomerService:
 
         return product
 
+    async def add_favorites(
+        self, customer_id: int, product_ids: list[int]
+    ) -> list[ProductPublic]:
+        """Add products to customer's favorites at once.
+
+        All the products are validated with a single catalog lookup and
+        written with a single insert, and the cache is invalidated once.
+
+        Args:
+            customer_id (int): the customer id.
+            product_ids (list[int]): the product ids.
+
+        Returns:
+            list[ProductPublic]: the added products.
+
+        Raises:
+            CustomerNotFound: if the customer cannot be found.
+            StoreApiNotFoundError: if one of the products cannot be found.
+        """
+        product_ids = list(dict.fromkeys(product_ids))
+        logging.info(
+            'Adding favorite products %s for customer %s',
+            product_ids,
+            customer_id,
+        )
+
+        # Valida se o cliente existe antes de consultar a API da loja
+        # Raises CustomerNotFound, se o cliente não existe
+        await self.customer_repo.get_customer(id=customer_id)
+
+        products = await self.store_api_adapter.get_products_in_batch(
+            product_ids
+        )
+
+        # Raises CustomerNotFound, se o cliente foi removido nesse meio tempo
+        await self.customer_repo.add_favorites(customer_id, product_ids)
+        await self._delete_cached_favorites(customer_id)
+
+        return products
+
     async def remove_favorite(self, customer_id: int, product_id: int) -> None:
         """Remove a product from customer's favorites.
 
@@ -187,6 +338,30 @@ class CustomerService:
         await self.customer_repo.remove_favorite(customer_id, product_id)
         await self._delete_cached_favorites(customer_id)
 
+    async def remove_favorites(
+        self, customer_id: int, product_ids: list[int]
+    ) -> None:
+        """Remove products from customer's favorites at once, invalidating
+        the cache once.
+
+        Args:
+            customer_id (int): the customer id.
+            product_ids (list[int]): the product ids.
+
+        Raises:
+            CustomerNotFound: if the customer cannot be found.
+        """
+        product_ids = list(dict.fromkeys(product_ids))
+        logging.info(
+            'Removing favorite products %s for customer %s',
+            product_ids,
+            customer_id,
+        )
+
+        await self.customer_repo.get_customer(id=customer_id)
+        await self.customer_repo.remove_favorites(customer_id, product_ids)
+        await self._delete_cached_favorites(customer_id)
+
     async def check_email_valid(self, email: str) -> bool:
         """Check if an email is valid, i.e. if it does not exist in
         the database.
@@ -206,48 +381,92 @@ class CustomerService:
         else:
             return False
 
+    async def _load_favorites(self, customer_id: int) -> list[ProductPublic]:
+        """Load the favorite products of a customer and cache them"""
+        # Valida se o cliente existe
+        # Raises CustomerNotFound, se o cliente não existe
+        await self.customer_repo.get_customer(id=customer_id)
+
+        favorites_in_db = await self.customer_repo.list_favorites_for_customer(
+            customer_id
+        )
+        product_ids = [favorite.product_id for favorite in favorites_in_db]
+        favorite_products = await self.store_api_adapter.get_products_in_batch(
+            product_ids
+        )
+
+        await self._cache_favorites(customer_id, favorite_products)
+
+        return favorite_products
+
     ### Caching
     async def _get_cached_customer(self, id: int) -> CustomerPublic | None:
+        if self.local_cache is not None and (
+            customer := self.local_cache.get(f'customer:{id}')
+        ):
+            return customer
+
         cached_customer_data = await self.redis.get(f'customer:{id}')
         if cached_customer_data:
-            return CustomerPublic.model_validate_json(cached_customer_data)
+            customer = CustomerPublic.model_validate_json(cached_customer_data)
+            if self.local_cache is not None:
+                self.local_cache.set(f'customer:{id}', customer)
+            return customer
         else:
             return None
 
-    async def _get_cached_customers(self) -> list[CustomerPublic] | None:
-        cached_customers_data = await self.redis.get('customers')
-        if cached_customers_data:
-            return CustomerListAdapter.validate_json(cached_customers_data)
+    async def _get_customers_version(self) -> int:
+        # If the version key is evicted, the listing goes back to version 0;
+        # pages cached under it expire after `cache_expiration` at most
+        version = await self.redis.get('customers:version')
+        return int(version) if version else 0
+
+    async def _get_cached_customers(self, key: str) -> CustomerPage | None:
+        cached_page_data = await self.redis.get(key)
+        if cached_page_data:
+            return CustomerPage.model_validate_json(cached_page_data)
         else:
             return None
 
     async def _get_cached_favorites(
         self, customer_id: int
-    ) -> list[ProductPublic] | None:
+    ) -> tuple[list[ProductPublic], bool] | None:
+        """Get the cached favorites and whether they are stale"""
         cached_favorites_data = await self.redis.get(
             f'favorites:{customer_id}'
         )
-        if cached_favorites_data:
-            return ProductListAdapter.validate_json(cached_favorites_data)
+        entry = (
+            CacheEntry.loads(cached_favorites_data)
+            if cached_favorites_data
+            else None
+        )
+        if entry is not None:
+            favorites = ProductListAdapter.validate_python(entry.value)
+            return favorites, entry.is_stale()
         else:
             return None
 
     async def _cache_customer(self, customer: CustomerPublic) -> None:
+        if self.local_cache is not None:
+            self.local_cache.set(f'customer:{customer.id}', customer)
+
         customer_data = customer.model_dump_json()
         await self.redis.set(
             f'customer:{customer.id}', customer_data, ex=self.cache_expiration
         )
 
-    async def _cache_customers(self, customers: list[CustomerPublic]) -> None:
-        customers_data = CustomerListAdapter.dump_json(customers)
+    async def _cache_customers(self, key: str, page: CustomerPage) -> None:
         await self.redis.set(
-            'customers', customers_data, ex=self.cache_expiration
+            key, page.model_dump_json(), ex=self.cache_expiration
         )
 
     async def _cache_favorites(
         self, customer_id: int, favorites: list[ProductPublic]
     ) -> None:
-        favorites_data = ProductListAdapter.dump_json(favorites)
+        favorites_data = CacheEntry.create(
+            ProductListAdapter.dump_python(favorites, mode='json'),
+            self.favorites_cache_soft_expiration,
+        ).dumps()
         await self.redis.set(
             f'favorites:{customer_id}',
             favorites_data,
@@ -255,10 +474,13 @@ class CustomerService:
         )
 
     async def _delete_cached_customer(self, id: int) -> None:
+        if self.local_cache is not None:
+            self.local_cache.delete(f'customer:{id}')
+
         await self.redis.delete(f'customer:{id}')
 
-    async def _delete_cached_customers(self) -> None:
-        await self.redis.delete('customers')
+    async def _invalidate_cached_customers(self) -> None:
+        await self.redis.incr('customers:version')
 
     async def _delete_cached_favorites(self, customer_id: int) -> None:
         await self.redis.delete(f'favorites:{customer_id}')
@@ -0,0 +1,97 @@
+import csv
+import io
+import json
+import logging
+from enum import StrEnum
+from typing import AsyncIterator
+
+from aiqfav.db.base import CustomerRepository
+from aiqfav.domain.customer import CustomerWithFavorites
+
+__all__ = ['ExportFormat', 'ExportService']
+
+CSV_HEADER = ['id', 'name', 'email', 'favorite_product_ids']
+
+
+class ExportFormat(StrEnum):
+    NDJSON = 'ndjson'
+    CSV = 'csv'
+
+    @property
+    def media_type(self) -> str:
+        return {
+            ExportFormat.NDJSON: 'application/x-ndjson',
+            ExportFormat.CSV: 'text/csv',
+        }[self]
+
+
+class ExportService:
+    """Exports all customers and their favorites, as NDJSON or CSV.
+
+    The export is streamed line by line from a server-side cursor, with
+    one line per customer ordered by id, so memory use is constant
+    regardless of the table size. An interrupted export is resumed by
+    passing the id of the last complete line as `after`.
+    """
+
+    def __init__(
+        self, customer_repo: CustomerRepository, batch_size: int = 1000
+    ):
+        self.customer_repo = customer_repo
+        self.batch_size = batch_size
+
+    async def export_customers(
+        self, format: ExportFormat, after: int | None = None
+    ) -> AsyncIterator[str]:
+        """Export the customers, one line at a time.
+
+        Args:
+            format (ExportFormat): the output format. A CSV export starts
+                with a header line, unless it is resumed.
+            after (int | None): export only the customers with an id
+                greater than this one.
+        """
+        logging.info('Exporting customers as %s (after %s)', format, after)
+
+        if format == ExportFormat.CSV and after is None:
+            yield self._to_csv_line(CSV_HEADER)
+
+        customers = self.customer_repo.stream_customers_with_favorites(
+            after, self.batch_size
+        )
+        async for customer in customers:
+            if format == ExportFormat.CSV:
+                yield self._to_csv_line(
+                    [
+                        customer.id,
+                        customer.name,
+                        customer.email,
+                        ';'.join(
+                            str(favorite.product_id)
+                            for favorite in customer.favorites
+                        ),
+                    ]
+                )
+            else:
+                yield self._to_json_line(customer)
+
+    def _to_json_line(self, customer: CustomerWithFavorites) -> str:
+        return (
+            json.dumps(
+                {
+                    'id': customer.id,
+                    'name': customer.name,
+                    'email': customer.email,
+                    'favorite_product_ids': [
+                        favorite.product_id for favorite in customer.favorites
+                    ],
+                },
+                ensure_ascii=False,
+            )
+            + '\n'
+        )
+
+    def _to_csv_line(self, row: list) -> str:
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator='\n').writerow(row)
+        return buffer.getvalue()
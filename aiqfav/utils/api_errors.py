@@ -17,6 +17,7 @@ class ErrorCodes(StrEnum):
     INVALID_TOKEN = 'invalid_token'
     MISSING_TOKEN = 'missing_token'
     FORBIDDEN = 'forbidden'
+    STORE_API_UNAVAILABLE = 'store_api_unavailable'
 
 
 def get_error_response(
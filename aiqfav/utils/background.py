@@ -0,0 +1,31 @@
+import asyncio
+import logging
+from typing import Any, Coroutine
+
+__all__ = ['run_in_background', 'wait_background_tasks']
+
+# Strong references to the running tasks, so they are not garbage
+# collected before finishing (see asyncio.create_task docs)
+_tasks: set[asyncio.Task] = set()
+
+
+def run_in_background(coro: Coroutine[Any, Any, Any]) -> asyncio.Task:
+    """Run a coroutine in background, logging it if it fails"""
+    task = asyncio.create_task(coro)
+    _tasks.add(task)
+    task.add_done_callback(_on_done)
+    return task
+
+
+def _on_done(task: asyncio.Task) -> None:
+    _tasks.discard(task)
+    if not task.cancelled() and (exc := task.exception()):
+        logging.error('Background task failed', exc_info=exc)
+
+
+async def wait_background_tasks(timeout: float | None = None) -> None:
+    """Wait for the background tasks of the current event loop"""
+    loop = asyncio.get_running_loop()
+    tasks = [task for task in _tasks if task.get_loop() is loop]
+    if tasks:
+        await asyncio.wait(tasks, timeout=timeout)
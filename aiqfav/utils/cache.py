@@ -0,0 +1,133 @@
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Generic, TypeVar
+
+__all__ = ['CacheEntry', 'CacheStats', 'TTLCache']
+
+V = TypeVar('V')
+
+
+@dataclass
+class CacheStats:
+    """Counters for a cache layer (shared by all requests of a worker)"""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def as_dict(self) -> dict[str, float]:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_ratio': self.hit_ratio,
+        }
+
+
+class TTLCache(Generic[V]):
+    """Bounded in-memory cache with LRU eviction and a TTL per entry.
+
+    Meant as a per-worker L1 in front of Redis: values are kept already
+    deserialized, so a hit costs neither a network round trip nor a new
+    validation. Keep the TTL short, since entries are not invalidated
+    across workers.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        assert maxsize > 0, 'maxsize must be positive'
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.stats = CacheStats()
+        self._data: OrderedDict[str, tuple[float, V]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: str) -> V | None:
+        entry = self._data.get(key)
+        if entry is None:
+            self.stats.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at <= self.clock():
+            del self._data[key]
+            self.stats.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self.stats.hits += 1
+        return value
+
+    def set(self, key: str, value: V) -> None:
+        self._data[key] = (self.clock() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.stats.evictions += 1
+
+    def delete(self, key: str) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+
+@dataclass
+class CacheEntry:
+    """A value stored in Redis with a soft TTL (stale-while-revalidate).
+
+    The Redis expiration of the key is the hard TTL: once it has passed
+    the value is gone and readers must block on a refresh. Before that,
+    after `fresh_until` the value is stale: readers may still serve it,
+    while refreshing it in background.
+    """
+
+    value: Any
+    fresh_until: float
+
+    @classmethod
+    def create(
+        cls,
+        value: Any,
+        soft_ttl: float,
+        clock: Callable[[], float] = time.time,
+    ) -> 'CacheEntry':
+        return cls(value=value, fresh_until=clock() + soft_ttl)
+
+    @classmethod
+    def loads(cls, data: str | bytes) -> 'CacheEntry | None':
+        """Load an entry, or None if `data` is not an entry.
+
+        Values cached before entries were introduced (the raw value,
+        without the envelope) are still around until they expire; callers
+        treat them as a cache miss.
+        """
+        entry = json.loads(data)
+        if not (
+            isinstance(entry, dict)
+            and entry.keys() == {'value', 'fresh_until'}
+        ):
+            return None
+        return cls(value=entry['value'], fresh_until=entry['fresh_until'])
+
+    def dumps(self) -> str:
+        return json.dumps(
+            {'value': self.value, 'fresh_until': self.fresh_until}
+        )
+
+    def is_stale(self, clock: Callable[[], float] = time.time) -> bool:
+        return self.fresh_until <= clock()
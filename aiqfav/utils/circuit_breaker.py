@@ -0,0 +1,127 @@
+import logging
+import time
+from enum import StrEnum
+from typing import Awaitable, Callable, TypeVar
+
+__all__ = ['CircuitBreaker', 'CircuitOpenError', 'CircuitState']
+
+T = TypeVar('T')
+
+
+class CircuitState(StrEnum):
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    """Exception when a call is rejected because the circuit is open"""
+
+
+class CircuitBreaker:
+    """Fails fast while a dependency is unhealthy.
+
+    After `failure_threshold` consecutive failures the circuit opens and
+    calls are rejected with `CircuitOpenError`, without reaching the
+    dependency. After `recovery_timeout` seconds it becomes half-open: a
+    single probe call is let through, closing the circuit if it succeeds
+    or opening it again if it fails.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.clock = clock
+
+        self._state = CircuitState.CLOSED
+        self._opened_at = 0.0
+        self._probing = False
+        self.consecutive_failures = 0
+        self.total_failures = 0
+        self.total_rejections = 0
+        self.times_opened = 0
+
+    @property
+    def state(self) -> CircuitState:
+        if (
+            self._state is CircuitState.OPEN
+            and self.clock() - self._opened_at >= self.recovery_timeout
+        ):
+            return CircuitState.HALF_OPEN
+        return self._state
+
+    async def call(
+        self,
+        fn: Callable[[], Awaitable[T]],
+        is_failure: Callable[[Exception], bool] = lambda _: True,
+    ) -> T:
+        """Call `fn` through the circuit.
+
+        Args:
+            fn: the call to the dependency.
+            is_failure: tells whether an exception raised by `fn` means
+                the dependency is unhealthy (e.g. a timeout), as opposed to
+                an expected error (e.g. a not found response).
+
+        Raises:
+            CircuitOpenError: if the circuit is open, or half-open with a
+                probe call already in flight.
+        """
+        state = self.state
+        if state is CircuitState.OPEN or (
+            state is CircuitState.HALF_OPEN and self._probing
+        ):
+            self.total_rejections += 1
+            raise CircuitOpenError(f'Circuit {self.name} is open')
+
+        probing = state is CircuitState.HALF_OPEN
+        self._probing = probing
+        try:
+            result = await fn()
+        except Exception as e:
+            if is_failure(e):
+                self._on_failure()
+            else:
+                self._on_success()
+            raise
+        else:
+            self._on_success()
+            return result
+        finally:
+            if probing:
+                self._probing = False
+
+    def _on_success(self) -> None:
+        if self._state is not CircuitState.CLOSED:
+            logging.info('Circuit %s closed', self.name)
+        self._state = CircuitState.CLOSED
+        self.consecutive_failures = 0
+
+    def _on_failure(self) -> None:
+        self.consecutive_failures += 1
+        self.total_failures += 1
+        if (
+            self._state is not CircuitState.CLOSED
+            or self.consecutive_failures >= self.failure_threshold
+        ):
+            if self._state is CircuitState.CLOSED:
+                self.times_opened += 1
+            logging.warning('Circuit %s opened', self.name)
+            self._state = CircuitState.OPEN
+            self._opened_at = self.clock()
+
+    def as_dict(self) -> dict[str, str | int]:
+        return {
+            'state': self.state.value,
+            'consecutive_failures': self.consecutive_failures,
+            'total_failures': self.total_failures,
+            'total_rejections': self.total_rejections,
+            'times_opened': self.times_opened,
+        }
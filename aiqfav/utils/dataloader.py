@@ -0,0 +1,97 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Generic, Hashable, TypeVar
+
+from aiqfav.utils.background import run_in_background
+
+__all__ = ['DataLoader']
+
+K = TypeVar('K', bound=Hashable)
+V = TypeVar('V')
+
+
+class DataLoader(Generic[K, V]):
+    """Batches the loads of concurrent callers into a single call.
+
+    Keys requested within a batch window are collected and loaded at
+    once by `batch_fn`, which returns the found values by key; each
+    caller then gets its own value (None if not found). A window of 0
+    collects the keys requested within one event loop iteration. A batch
+    is dispatched early once it reaches `max_batch_size` keys.
+
+    Like `SingleFlight`, callers awaiting the same key share the result,
+    and a cancelled caller does not cancel the load for the others.
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[list[K]], Awaitable[dict[K, V]]],
+        batch_window: float = 0,
+        max_batch_size: int = 100,
+    ):
+        assert max_batch_size > 0, 'max_batch_size must be positive'
+        self.batch_fn = batch_fn
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+        self.loads = 0
+        self.batches = 0
+        self._pending: dict[K, asyncio.Future[V | None]] = {}
+        self._dispatch_handle: asyncio.Handle | None = None
+
+    async def load(self, key: K) -> V | None:
+        self.loads += 1
+        future = self._pending.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self._pending[key] = loop.create_future()
+            if len(self._pending) >= self.max_batch_size:
+                self._dispatch()
+            elif self._dispatch_handle is None:
+                if self.batch_window > 0:
+                    self._dispatch_handle = loop.call_later(
+                        self.batch_window, self._dispatch
+                    )
+                else:
+                    self._dispatch_handle = loop.call_soon(self._dispatch)
+
+        return await asyncio.shield(future)
+
+    def as_dict(self) -> dict[str, float]:
+        return {
+            'loads': self.loads,
+            'batches': self.batches,
+            'avg_batch_size': (
+                self.loads / self.batches if self.batches else 0.0
+            ),
+        }
+
+    def _dispatch(self) -> None:
+        if self._dispatch_handle is not None:
+            self._dispatch_handle.cancel()
+            self._dispatch_handle = None
+
+        batch, self._pending = self._pending, {}
+        if batch:
+            self.batches += 1
+            run_in_background(self._load_batch(batch))
+
+    async def _load_batch(
+        self, batch: dict[K, asyncio.Future[V | None]]
+    ) -> None:
+        keys = list(batch)
+        try:
+            values = await self.batch_fn(keys)
+        except Exception as exc:
+            # Every caller of the batch gets the error, so it is logged once
+            # here, with the keys that were loaded together
+            logging.exception(
+                'Failed to load a batch of %d keys: %s', len(keys), keys
+            )
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        for key, future in batch.items():
+            if not future.done():
+                future.set_result(values.get(key))
@@ -0,0 +1,63 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Hashable, Iterator
+
+__all__ = [
+    'RequestContext',
+    'count_db_query',
+    'count_redis_command',
+    'get_request_context',
+    'request_context',
+]
+
+
+@dataclass
+class RequestContext:
+    """State scoped to a single request.
+
+    Holds the identity map, so an entity is loaded at most once per
+    request, and counters of the database and Redis round trips made
+    while serving it.
+    """
+
+    identity_map: dict[Hashable, Any] = field(default_factory=dict)
+    db_queries: int = 0
+    redis_commands: int = 0
+
+
+_current: ContextVar[RequestContext | None] = ContextVar(
+    'request_context', default=None
+)
+
+
+def get_request_context() -> RequestContext | None:
+    """Get the context of the current request, if inside one"""
+    return _current.get()
+
+
+@contextmanager
+def request_context() -> Iterator[RequestContext]:
+    """Run the enclosed code within a new request context"""
+    context = RequestContext()
+    token = _current.set(context)
+    try:
+        yield context
+    finally:
+        _current.reset(token)
+
+
+def count_db_query(*args: Any) -> None:
+    """Count a database round trip in the current request.
+
+    Accepts any arguments so it can be used as a SQLAlchemy event
+    listener.
+    """
+    if (context := _current.get()) is not None:
+        context.db_queries += 1
+
+
+def count_redis_command() -> None:
+    """Count a Redis round trip in the current request"""
+    if (context := _current.get()) is not None:
+        context.redis_commands += 1
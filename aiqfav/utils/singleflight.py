@@ -0,0 +1,39 @@
+import asyncio
+from typing import Any, Awaitable, Callable, TypeVar
+
+__all__ = ['SingleFlight']
+
+T = TypeVar('T')
+
+
+class SingleFlight:
+    """Coalesces concurrent calls for the same key into a single call.
+
+    While a call for a key is in flight, other callers for that key await
+    its result instead of starting a new one. The call is shielded, so a
+    cancelled caller does not cancel the result shared with the others.
+    """
+
+    def __init__(self):
+        self._calls: dict[str, asyncio.Task[Any]] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._calls
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        task = self._calls.get(key)
+        if task is None:
+            self.calls += 1
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda _: self._forget(key, task))
+        else:
+            self.coalesced += 1
+
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task[Any]) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
@@ -0,0 +1,34 @@
+"""Add token_version to customer
+
+Revision ID: 7c1e4b9a2f30
+Revises: 556085356e34
+Create Date: 2026-10-17 21:40:12.318204
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '7c1e4b9a2f30'
+down_revision: Union[str, Sequence[str], None] = '556085356e34'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'customer',
+        sa.Column(
+            'token_version', sa.Integer(), nullable=False, server_default='0'
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('customer', 'token_version')
@@ -0,0 +1,138 @@
+"""Compare per-call latency and memory allocated by the ORM
+(`CustomerRepositoryImpl`) and the asyncpg (`CustomerRepositoryAsyncpg`)
+customer repositories.
+
+Runs against the database of `DATABASE_URL`, creating the tables if
+needed, and deletes the customer it creates at the end.
+
+Usage:
+    python -m benchmarks.customer_repository --calls 1000 --favorites 20
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import tracemalloc
+import uuid
+from typing import Awaitable, Callable
+
+from environs import Env
+from sqlalchemy import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from aiqfav.db.base import CustomerRepository
+from aiqfav.db.implementations.customer import CustomerRepositoryImpl
+from aiqfav.db.implementations.customer_asyncpg import (
+    CustomerRepositoryAsyncpg,
+)
+from aiqfav.db.implementations.models import Base
+from aiqfav.domain.customer import CustomerWithPassword
+
+
+async def measure(
+    calls: int, fn: Callable[[int], Awaitable[object]]
+) -> dict[str, float]:
+    """Latency percentiles, then the average peak of memory allocated per
+    call (measured in a second pass, since tracing slows the calls).
+
+    The peak includes the event loop's socket read buffer (256 KiB),
+    which is the same for both repositories; compare the differences.
+    """
+    for i in range(min(calls, 50)):  # Warm up pools and statement caches
+        await fn(i)
+
+    latencies = []
+    for i in range(calls):
+        start = time.perf_counter()
+        await fn(i)
+        latencies.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    allocated = 0
+    for i in range(calls):
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        await fn(i)
+        _, peak = tracemalloc.get_traced_memory()
+        allocated += peak - before
+    tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        'p50_us': round(statistics.median(latencies) * 1e6, 1),
+        'p95_us': round(latencies[int(len(latencies) * 0.95)] * 1e6, 1),
+        'peak_alloc_kib': round(allocated / calls / 1024, 2),
+    }
+
+
+async def run(
+    repository: CustomerRepository, calls: int, favorites: int
+) -> dict:
+    customer = await repository.create_customer(
+        CustomerWithPassword(
+            name='Benchmark',
+            email=f'benchmark-{uuid.uuid4().hex}@example.com',
+            hashed_password='$benchmark$',
+        )
+    )
+    try:
+        for product_id in range(1, favorites + 1):
+            await repository.add_favorite(customer.id, product_id)
+
+        return {
+            'repository': type(repository).__name__,
+            'get_customer': await measure(
+                calls, lambda _: repository.get_customer(id=customer.id)
+            ),
+            'list_favorites_for_customer': await measure(
+                calls,
+                lambda _: repository.list_favorites_for_customer(customer.id),
+            ),
+            # Mostly conflicting inserts, as favorites are idempotent
+            'add_favorite': await measure(
+                calls,
+                lambda i: repository.add_favorite(
+                    customer.id, i % (favorites * 2) + 1
+                ),
+            ),
+        }
+    finally:
+        await repository.delete_customer(customer.id)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--calls', type=int, default=1000)
+    parser.add_argument('--favorites', type=int, default=20)
+    args = parser.parse_args()
+
+    env = Env()
+    env.read_env()
+    database_url = env('DATABASE_URL')
+
+    engine = create_async_engine(database_url, pool_size=1)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    orm_repository = CustomerRepositoryImpl(
+        async_sessionmaker(engine, expire_on_commit=False)
+    )
+    asyncpg_repository = CustomerRepositoryAsyncpg(
+        make_url(database_url)
+        .set(drivername='postgresql')
+        .render_as_string(hide_password=False),
+        min_size=1,
+        max_size=1,
+    )
+
+    for repository in (orm_repository, asyncpg_repository):
+        result = await run(repository, args.calls, args.favorites)
+        print(json.dumps(result))
+
+    await asyncpg_repository.aclose()
+    await engine.dispose()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
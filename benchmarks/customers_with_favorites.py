@@ -0,0 +1,129 @@
+"""Compare loading a page of customers with their favorites in a fixed
+number of queries (`list_customers_with_favorites`) against the N+1
+approach (`list_customers`, then `list_favorites_for_customer` for each
+customer), with the ORM and the asyncpg customer repositories.
+
+Runs against the database of `DATABASE_URL`, creating the tables if
+needed, and deletes the customers it creates at the end.
+
+Usage:
+    python -m benchmarks.customers_with_favorites --customers 100 --calls 200
+"""
+
+import argparse
+import asyncio
+import json
+import uuid
+
+from environs import Env
+from sqlalchemy import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from aiqfav.db.base import CustomerRepository
+from aiqfav.db.implementations.customer import CustomerRepositoryImpl
+from aiqfav.db.implementations.customer_asyncpg import (
+    CustomerRepositoryAsyncpg,
+)
+from aiqfav.db.implementations.models import Base
+from aiqfav.domain.customer import CustomerWithFavorites, CustomerWithPassword
+
+from .customer_repository import measure
+
+
+async def list_with_n_plus_one(
+    repository: CustomerRepository, limit: int, after: int
+) -> list[CustomerWithFavorites]:
+    customers = await repository.list_customers(limit, after)
+    return [
+        CustomerWithFavorites(
+            id=customer.id,
+            name=customer.name,
+            email=customer.email,
+            favorites=await repository.list_favorites_for_customer(
+                customer.id
+            ),
+        )
+        for customer in customers
+    ]
+
+
+async def run(
+    repository: CustomerRepository,
+    calls: int,
+    customers: int,
+    favorites: int,
+) -> dict:
+    created = [
+        await repository.create_customer(
+            CustomerWithPassword(
+                name='Benchmark',
+                email=f'benchmark-{uuid.uuid4().hex}@example.com',
+                hashed_password='$benchmark$',
+            )
+        )
+        for _ in range(customers)
+    ]
+    try:
+        for customer in created:
+            await repository.add_favorites(
+                customer.id, list(range(1, favorites + 1))
+            )
+
+        # The page of the created customers
+        after = created[0].id - 1
+        return {
+            'repository': type(repository).__name__,
+            'customers': customers,
+            'n_plus_one': await measure(
+                calls,
+                lambda _: list_with_n_plus_one(repository, customers, after),
+            ),
+            'list_customers_with_favorites': await measure(
+                calls,
+                lambda _: repository.list_customers_with_favorites(
+                    customers, after
+                ),
+            ),
+        }
+    finally:
+        for customer in created:
+            await repository.delete_customer(customer.id)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--calls', type=int, default=200)
+    parser.add_argument('--customers', type=int, default=100)
+    parser.add_argument('--favorites', type=int, default=10)
+    args = parser.parse_args()
+
+    env = Env()
+    env.read_env()
+    database_url = env('DATABASE_URL')
+
+    engine = create_async_engine(database_url, pool_size=1)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    orm_repository = CustomerRepositoryImpl(
+        async_sessionmaker(engine, expire_on_commit=False)
+    )
+    asyncpg_repository = CustomerRepositoryAsyncpg(
+        make_url(database_url)
+        .set(drivername='postgresql')
+        .render_as_string(hide_password=False),
+        min_size=1,
+        max_size=1,
+    )
+
+    for repository in (orm_repository, asyncpg_repository):
+        result = await run(
+            repository, args.calls, args.customers, args.favorites
+        )
+        print(json.dumps(result))
+
+    await asyncpg_repository.aclose()
+    await engine.dispose()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,109 @@
+"""In-memory stand-ins used by the benchmarks, so they measure the code
+under test without the noise (nor the side effects) of a shared Redis.
+"""
+
+from typing import Any, Awaitable, Callable, Iterable, Mapping
+
+from aiqfav.adapters.redis_adapter import (
+    AnyKeyT,
+    EncodableT,
+    ExpiryT,
+    FieldT,
+    KeyT,
+    ResponseT,
+)
+
+__all__ = ['InMemoryRedis']
+
+
+class InMemoryPipeline:
+    """Pipeline of `InMemoryRedis`, running the queued commands on
+    `execute`"""
+
+    def __init__(self, redis: 'InMemoryRedis'):
+        self.redis = redis
+        self._commands: list[Callable[[], Awaitable[Any]]] = []
+
+    def set(
+        self, name: KeyT, value: EncodableT, ex: ExpiryT | None = None
+    ) -> 'InMemoryPipeline':
+        self._commands.append(lambda: self.redis.set(name, value, ex))
+        return self
+
+    def delete(self, *names: KeyT) -> 'InMemoryPipeline':
+        self._commands.append(lambda: self.redis.delete(*names))
+        return self
+
+    def hset(
+        self, name: KeyT, *, mapping: Mapping[FieldT, EncodableT]
+    ) -> 'InMemoryPipeline':
+        self._commands.append(lambda: self.redis.hset(name, mapping=mapping))
+        return self
+
+    def expire(self, name: KeyT, time: ExpiryT) -> 'InMemoryPipeline':
+        self._commands.append(lambda: self.redis.expire(name, time))
+        return self
+
+    async def execute(self) -> list[Any]:
+        commands, self._commands = self._commands, []
+        return [await command() for command in commands]
+
+
+class InMemoryRedis:
+    """The subset of Redis used by the app, kept in a dict.
+
+    Keys never expire: the benchmarks are shorter than any TTL.
+    """
+
+    def __init__(self):
+        self._data: dict[Any, Any] = {}
+
+    async def get(self, key: KeyT) -> ResponseT | None:
+        return self._data.get(key)
+
+    async def set(
+        self,
+        key: KeyT,
+        value: EncodableT,
+        ex: ExpiryT | None = None,
+        nx: bool = False,
+    ) -> ResponseT:
+        if nx and key in self._data:
+            return None
+        self._data[key] = value
+        return True
+
+    async def delete(self, *names: KeyT) -> ResponseT:
+        deleted = [name for name in names if name in self._data]
+        for name in deleted:
+            del self._data[name]
+        return len(deleted)
+
+    async def mget(self, keys: Iterable[KeyT]) -> list[ResponseT | None]:
+        return [self._data.get(key) for key in keys]
+
+    async def incr(self, key: KeyT) -> int:
+        self._data[key] = int(self._data.get(key, 0)) + 1
+        return self._data[key]
+
+    async def mset(self, mapping: Mapping[AnyKeyT, EncodableT]) -> ResponseT:
+        self._data.update(mapping)
+        return True
+
+    async def hset(
+        self, name: KeyT, *, mapping: Mapping[FieldT, EncodableT]
+    ) -> ResponseT:
+        self._data.setdefault(name, {}).update(mapping)
+        return len(mapping)
+
+    async def hmget(
+        self, name: KeyT, keys: Iterable[str]
+    ) -> list[ResponseT | None]:
+        hash = self._data.get(name, {})
+        return [hash.get(key) for key in keys]
+
+    async def expire(self, name: KeyT, time: ExpiryT) -> ResponseT:
+        return name in self._data
+
+    def pipeline(self) -> InMemoryPipeline:
+        return InMemoryPipeline(self)
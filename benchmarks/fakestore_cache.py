@@ -0,0 +1,121 @@
+"""Compare upstream calls of the cache-first `FakeStoreApi.get_product`
+with the previous network-first flow.
+
+Usage:
+    python -m benchmarks.fakestore_cache --requests 500 --products 20 \
+        --latency 0.02 --jitter 0.01
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+
+import httpx
+
+from aiqfav.adapters.exceptions import (
+    StoreApiNotFoundError,
+    StoreApiUnexpectedResponseError,
+)
+from aiqfav.adapters.fakestore_api import FakeStoreApi
+from aiqfav.domain.product import ProductPublic
+from aiqfav.utils.cache import CacheEntry
+from aiqfav.utils.httpx import raise_for_status
+
+from .fakes import InMemoryRedis
+from .fakestore_server import FakeStoreServer
+
+
+class NetworkFirstFakeStoreApi(FakeStoreApi):
+    """Previous flow: calls the store API before checking the cache"""
+
+    async def get_product(self, product_id: int) -> ProductPublic:
+        response = await self.client.get(
+            f'{self.base_url}/products/{product_id}'
+        )
+
+        cached_data = await self.redis.get(f'product:{product_id}')
+        if cached_data and (entry := CacheEntry.loads(cached_data)):
+            self.cache_stats.hits += 1
+            return self._validate_product(entry.value)
+        self.cache_stats.misses += 1
+
+        if response.content == b'':
+            raise StoreApiNotFoundError(response.content, response.status_code)
+
+        data = raise_for_status(
+            response, exc_class=StoreApiUnexpectedResponseError
+        )
+        assert isinstance(data, dict)
+        await self.redis.set(
+            f'product:{product_id}',
+            self._dump_entry(data),
+            ex=self.cache_expiration,
+        )
+        return self._validate_product(data)
+
+
+async def run(
+    adapter_class: type[FakeStoreApi],
+    requests: int,
+    products: int,
+    concurrency: int,
+    latency: float = 0.0,
+    jitter: float = 0.0,
+) -> dict:
+    server = FakeStoreServer(
+        catalog_size=products, latency=latency, jitter=jitter, seed=42
+    )
+    rng = random.Random(42)
+    product_ids = [rng.randint(1, products) for _ in range(requests)]
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    async with server.serve() as base_url, httpx.AsyncClient() as client:
+        adapter = adapter_class(base_url, client=client, redis=InMemoryRedis())
+
+        async def get_product(product_id: int) -> None:
+            async with semaphore:
+                start = time.perf_counter()
+                await adapter.get_product(product_id)
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*[get_product(id) for id in product_ids])
+        elapsed = time.perf_counter() - start
+
+    return {
+        'strategy': adapter_class.__name__,
+        'calls': requests,
+        'upstream_requests': server.request_count,
+        **adapter.cache_stats.as_dict(),
+        'elapsed_s': round(elapsed, 3),
+        'p50_ms': round(statistics.median(latencies) * 1000, 3),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--products', type=int, default=20)
+    parser.add_argument('--concurrency', type=int, default=10)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--jitter', type=float, default=0.0)
+    args = parser.parse_args()
+
+    for adapter_class in (NetworkFirstFakeStoreApi, FakeStoreApi):
+        result = await run(
+            adapter_class,
+            args.requests,
+            args.products,
+            args.concurrency,
+            latency=args.latency,
+            jitter=args.jitter,
+        )
+        print(json.dumps(result))
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,186 @@
+"""Local stand-in for the Fake Store API (https://fakestoreapi.com).
+
+Serves a generated catalog over real HTTP so benchmarks and load tests
+can exercise connection handling, caching and failure handling of
+`FakeStoreApi` without network access. Latency, jitter, server errors
+and not found responses can be injected, and requests are counted.
+
+Usage (standalone, pointing `FAKE_STORE_API_URL` to it):
+    python -m benchmarks.fakestore_server --port 8001 --latency 0.05
+"""
+
+import argparse
+import asyncio
+import random
+from collections import Counter
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+__all__ = ['FakeStoreServer']
+
+
+def make_product(product_id: int) -> dict:
+    return {
+        'id': product_id,
+        'title': f'Product {product_id}',
+        'price': round(10 + product_id * 1.5, 2),
+        'description': f'Description of product {product_id}',
+        'category': 'benchmark',
+        'image': f'https://fakestoreapi.com/img/{product_id}.jpg',
+        'rating': {'rate': 4.5, 'count': product_id},
+    }
+
+
+class FakeStoreServer:
+    """ASGI app mimicking the upstream store API, counting requests.
+
+    Args:
+        catalog_size: number of products in the catalog (ids 1..N).
+        latency: seconds to wait before answering each request.
+        jitter: max extra seconds, drawn uniformly, added to `latency`.
+        error_rate: fraction of requests answered with status 500.
+        not_found_status: status of the empty-body response for unknown
+            products (the upstream answers 200).
+        seed: seed of the random generator, for reproducible runs.
+    """
+
+    def __init__(
+        self,
+        catalog_size: int = 20,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        not_found_status: int = 200,
+        seed: int | None = None,
+    ):
+        self.products = {
+            product_id: make_product(product_id)
+            for product_id in range(1, catalog_size + 1)
+        }
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.not_found_status = not_found_status
+        self.random = random.Random(seed)
+
+        self.request_count = 0
+        self.requests_by_route: Counter[str] = Counter()
+        self.errors_injected = 0
+        self.not_found_count = 0
+
+        self.app = Starlette(
+            routes=[
+                Route('/products', self.list_products),
+                Route('/products/{product_id:int}', self.get_product),
+                Route('/_stats', self.get_stats),
+                Route('/_stats', self.reset_stats, methods=['DELETE']),
+            ]
+        )
+
+    def reset(self) -> None:
+        """Reset the request counters"""
+        self.request_count = 0
+        self.requests_by_route.clear()
+        self.errors_injected = 0
+        self.not_found_count = 0
+
+    def stats(self) -> dict:
+        return {
+            'request_count': self.request_count,
+            'requests_by_route': dict(self.requests_by_route),
+            'errors_injected': self.errors_injected,
+            'not_found_count': self.not_found_count,
+        }
+
+    async def _handle(self, route: str) -> Response | None:
+        """Count the request and inject latency and errors.
+
+        Returns:
+            Response | None: an injected error response, if any.
+        """
+        self.request_count += 1
+        self.requests_by_route[route] += 1
+
+        delay = self.latency + self.random.uniform(0, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        if self.error_rate and self.random.random() < self.error_rate:
+            self.errors_injected += 1
+            return JSONResponse({'error': 'injected'}, status_code=500)
+        return None
+
+    async def list_products(self, request: Request) -> Response:
+        if error := await self._handle('/products'):
+            return error
+        return JSONResponse(list(self.products.values()))
+
+    async def get_product(self, request: Request) -> Response:
+        if error := await self._handle('/products/{id}'):
+            return error
+        product = self.products.get(request.path_params['product_id'])
+        if product is None:
+            # Same as the upstream: status 200 with an empty body
+            self.not_found_count += 1
+            return Response(b'', status_code=self.not_found_status)
+        return JSONResponse(product)
+
+    async def get_stats(self, request: Request) -> Response:
+        return JSONResponse(self.stats())
+
+    async def reset_stats(self, request: Request) -> Response:
+        self.reset()
+        return Response(status_code=204)
+
+    @asynccontextmanager
+    async def serve(
+        self, host: str = '127.0.0.1', port: int = 0
+    ) -> AsyncIterator[str]:
+        """Run the server in the current event loop, yielding its base URL"""
+        config = uvicorn.Config(
+            self.app, host=host, port=port, log_level='warning'
+        )
+        server = uvicorn.Server(config)
+        task = asyncio.create_task(server.serve())
+        while not server.started:
+            await asyncio.sleep(0.01)
+
+        port = server.servers[0].sockets[0].getsockname()[1]
+        try:
+            yield f'http://{host}:{port}'
+        finally:
+            server.should_exit = True
+            await task
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8001)
+    parser.add_argument('--catalog-size', type=int, default=20)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--not-found-status', type=int, default=200)
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args()
+
+    server = FakeStoreServer(
+        catalog_size=args.catalog_size,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        not_found_status=args.not_found_status,
+        seed=args.seed,
+    )
+    uvicorn.run(server.app, host=args.host, port=args.port)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,201 @@
+"""Measure how much a storm of `/v1/auth/pair` logins delays other
+endpoints of the same worker, with argon2 running inline on the event
+loop (previous flow) and in the password hasher thread pool.
+
+Runs against the database of `DATABASE_URL` (with its tables created),
+and deletes the customer it creates at the end.
+
+Usage:
+    python -m benchmarks.login_storm --logins 40 --concurrency 8
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import uuid
+from datetime import timedelta
+
+import httpx
+from environs import Env
+from passlib.context import CryptContext
+from sqlalchemy import make_url
+
+from aiqfav.adapters.base import PasswordHasher
+from aiqfav.adapters.fakestore_api import FakeStoreApi
+from aiqfav.adapters.jwt import JwtAdapterImpl
+from aiqfav.adapters.password_hasher import PasswordHasherImpl
+from aiqfav.api.app import create_app
+from aiqfav.api.dependencies import get_auth_service, get_store_api_adapter
+from aiqfav.db.base import CustomerRepository
+from aiqfav.db.implementations.customer_asyncpg import (
+    CustomerRepositoryAsyncpg,
+)
+from aiqfav.domain.customer import CustomerWithPassword
+from aiqfav.services.auth import AuthService
+
+from .fakes import InMemoryRedis
+from .fakestore_server import FakeStoreServer
+
+PASSWORD = 'P@ssw0rd!'
+
+
+class InlinePasswordHasher(PasswordHasher):
+    """Previous flow: hashes on the event loop, blocking it"""
+
+    def __init__(self, pwd_context: CryptContext):
+        self.pwd_context = pwd_context
+
+    async def hash(self, password: str) -> str:
+        return self.pwd_context.hash(password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return self.pwd_context.verify(password, hashed_password)
+
+    async def verify_and_update(
+        self, password: str, hashed_password: str
+    ) -> tuple[bool, str | None]:
+        return self.pwd_context.verify_and_update(password, hashed_password)
+
+
+async def run(
+    password_hasher: PasswordHasher,
+    customer_repo: CustomerRepository,
+    store_api: FakeStoreApi,
+    logins: int,
+    concurrency: int,
+) -> dict:
+    customer = await customer_repo.create_customer(
+        CustomerWithPassword(
+            name='Storm',
+            email=f'storm-{uuid.uuid4().hex}@example.com',
+            hashed_password=await password_hasher.hash(PASSWORD),
+        )
+    )
+    try:
+        return await storm(
+            password_hasher,
+            customer_repo,
+            store_api,
+            customer.email,
+            logins,
+            concurrency,
+        )
+    finally:
+        await customer_repo.delete_customer(customer.id)
+
+
+async def storm(
+    password_hasher: PasswordHasher,
+    customer_repo: CustomerRepository,
+    store_api: FakeStoreApi,
+    email: str,
+    logins: int,
+    concurrency: int,
+) -> dict:
+    auth_service = AuthService(
+        customer_repo=customer_repo,
+        password_hasher=password_hasher,
+        access_token_expiration=timedelta(minutes=5),
+        refresh_token_expiration=timedelta(days=1),
+        jti_generator=lambda: uuid.uuid4().hex,
+        jwt_adapter=JwtAdapterImpl('benchmark-secret-' + 'x' * 32, 'HS256'),
+        jwt_issuer='aiqfav',
+    )
+
+    app = create_app()
+    app.dependency_overrides[get_auth_service] = lambda: auth_service
+    app.dependency_overrides[get_store_api_adapter] = lambda: store_api
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url='http://aiqfav'
+    ) as client:
+        semaphore = asyncio.Semaphore(concurrency)
+        probe_latencies: list[float] = []
+        storm_done = asyncio.Event()
+
+        async def login() -> None:
+            async with semaphore:
+                response = await client.post(
+                    '/v1/auth/pair',
+                    json={'email': email, 'password': PASSWORD},
+                )
+                assert response.status_code == 200
+
+        async def probe() -> None:
+            # Another endpoint, answered from the in-memory catalog
+            while not storm_done.is_set():
+                start = time.perf_counter()
+                response = await client.get('/v1/products')
+                assert response.status_code == 200
+                probe_latencies.append(time.perf_counter() - start)
+                await asyncio.sleep(0.005)
+
+        probe_task = asyncio.create_task(probe())
+        start = time.perf_counter()
+        await asyncio.gather(*[login() for _ in range(logins)])
+        elapsed = time.perf_counter() - start
+        storm_done.set()
+        await probe_task
+
+    probe_latencies.sort()
+    return {
+        'hasher': type(password_hasher).__name__,
+        'logins': logins,
+        'logins_per_s': round(logins / elapsed, 1),
+        'probes': len(probe_latencies),
+        'probe_p50_ms': round(statistics.median(probe_latencies) * 1000, 2),
+        'probe_p95_ms': round(
+            probe_latencies[int(len(probe_latencies) * 0.95)] * 1000, 2
+        ),
+        'probe_max_ms': round(probe_latencies[-1] * 1000, 2),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--logins', type=int, default=40)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--workers', type=int, default=2)
+    args = parser.parse_args()
+
+    env = Env()
+    env.read_env()
+    customer_repo = CustomerRepositoryAsyncpg(
+        make_url(env('DATABASE_URL'))
+        .set(drivername='postgresql')
+        .render_as_string(hide_password=False),
+        min_size=1,
+        max_size=args.concurrency,
+    )
+
+    pwd_context = CryptContext(schemes=['argon2'], deprecated='auto')
+    server = FakeStoreServer()
+    async with server.serve() as base_url, httpx.AsyncClient() as client:
+        store_api = FakeStoreApi(
+            base_url, client=client, redis=InMemoryRedis()
+        )
+        await store_api.list_products()
+
+        pool_hasher = PasswordHasherImpl(pwd_context, max_workers=args.workers)
+        for password_hasher in (
+            InlinePasswordHasher(pwd_context),
+            pool_hasher,
+        ):
+            result = await run(
+                password_hasher,
+                customer_repo,
+                store_api,
+                args.logins,
+                args.concurrency,
+            )
+            print(json.dumps(result))
+        pool_hasher.shutdown()
+
+    await customer_repo.aclose()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
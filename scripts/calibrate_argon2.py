@@ -0,0 +1,85 @@
+#! /usr/bin/env python3
+
+import argparse
+import statistics
+import time
+
+from passlib.context import CryptContext
+
+
+def measure_verify(
+    time_cost: int, memory_cost: int, parallelism: int, rounds: int
+) -> float:
+    """Median time, in seconds, to verify a password with the given
+    argon2 parameters on this host."""
+    pwd_context = CryptContext(
+        schemes=['argon2'],
+        argon2__time_cost=time_cost,
+        argon2__memory_cost=memory_cost,
+        argon2__parallelism=parallelism,
+    )
+    hashed_password = pwd_context.hash('calibration')
+
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        pwd_context.verify('calibration', hashed_password)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def calibrate_argon2(
+    target_ms: float,
+    memory_cost: int,
+    parallelism: int,
+    rounds: int,
+    max_time_cost: int,
+):
+    """Suggest the argon2 time cost whose verification takes the closest
+    to (without exceeding) the target latency on this host."""
+
+    print('=' * 50)
+    print('CALIBRAÇÃO DO ARGON2')
+    print(f'Memória: {memory_cost} KiB, paralelismo: {parallelism}')
+    print(f'Latência alvo: {target_ms} ms')
+    print('=' * 50)
+
+    time_cost = 1
+    for candidate in range(1, max_time_cost + 1):
+        elapsed_ms = (
+            measure_verify(candidate, memory_cost, parallelism, rounds) * 1000
+        )
+        print(f'time_cost={candidate}: {elapsed_ms:.1f} ms')
+        if elapsed_ms > target_ms:
+            break
+        time_cost = candidate
+
+    print('=' * 50)
+    print('Parâmetros sugeridos (.env):')
+    print(f'ARGON2_TIME_COST={time_cost}')
+    print(f'ARGON2_MEMORY_COST={memory_cost}')
+    print(f'ARGON2_PARALLELISM={parallelism}')
+    print('=' * 50)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description=(
+            'Mede o argon2 neste host e sugere parâmetros para uma '
+            'latência de verificação alvo'
+        )
+    )
+    parser.add_argument('--target-ms', type=float, default=250)
+    parser.add_argument('--memory-cost', type=int, default=64 * 1024)
+    parser.add_argument('--parallelism', type=int, default=4)
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--max-time-cost', type=int, default=20)
+    args = parser.parse_args()
+
+    calibrate_argon2(
+        args.target_ms,
+        args.memory_cost,
+        args.parallelism,
+        args.rounds,
+        args.max_time_cost,
+    )
@@ -4,68 +4,25 @@ import asyncio
 import getpass
 import sys
 
-import httpx
-import redis.asyncio as redis
-from environs import Env
-from passlib.context import CryptContext
 from pydantic import ValidationError
-from sqlalchemy.ext.asyncio import (
-    AsyncSession,
-    async_sessionmaker,
-    create_async_engine,
-)
 
-from aiqfav.adapters.fakestore_api import FakeStoreApi
-from aiqfav.adapters.redis_adapter import RedisAdapter
-from aiqfav.db.implementations.customer import CustomerRepositoryImpl
+from aiqfav.container import Container
 from aiqfav.domain.customer import CustomerCreate
 from aiqfav.services.admin import AdminService
-from aiqfav.services.customer import CustomerService
 from aiqfav.services.customer.exceptions import EmailAlreadyExists
 
-env = Env()
-env.read_env()
-
-
-def get_async_session() -> async_sessionmaker[AsyncSession]:
-    """Dependency para obter uma sessão assíncrona"""
-    DATABASE_URL = env('DATABASE_URL')
-    engine = create_async_engine(DATABASE_URL, echo=False)
-    return async_sessionmaker(engine, expire_on_commit=False)
-
 
 async def create_admin_customer():
     """Create a new admin customer."""
 
-    # We could simplify the instantiation of the dependencies by using a
-    # DI framework, like Dependency Injector
-    # (https://python-dependency-injector.ets-labs.org/)
-    customer_repo = CustomerRepositoryImpl(get_async_session())
-    pwd_context = CryptContext(schemes=['argon2'], deprecated='auto')
-    redis_instance = RedisAdapter(
-        redis.Redis(
-            host=env('REDIS_HOST'),
-            port=env.int('REDIS_PORT'),
-            db=env.int('REDIS_DB'),
-        )
-    )
-
-    customer_service = CustomerService(
-        customer_repo=customer_repo,
-        pwd_context=pwd_context,
-        redis=redis_instance,
-        store_api_adapter=FakeStoreApi(
-            base_url=env('FAKE_STORE_API_URL'),
-            client_factory=lambda: httpx.AsyncClient(),
-            redis=redis_instance,
-        ),
-    )
+    container = Container()
+    try:
+        await _create_admin_customer(container.admin_service)
+    finally:
+        await container.aclose()
 
-    admin_service = AdminService(
-        customer_repo=customer_repo,
-        customer_service=customer_service,
-    )
 
+async def _create_admin_customer(admin_service: AdminService):
     print('=' * 50)
     print('CRIAÇÃO DE CLIENTE ADMINISTRADOR')
     print('=' * 50)
@@ -0,0 +1,66 @@
+#! /usr/bin/env python3
+
+import argparse
+import asyncio
+import contextlib
+import logging
+import sys
+from typing import TextIO
+
+from aiqfav.container import Container
+from aiqfav.services.export import ExportFormat
+
+
+async def export_customers(
+    format: ExportFormat, after: int | None, file: TextIO
+):
+    """Export all customers and their favorites, as NDJSON or CSV."""
+
+    container = Container()
+    lines = 0
+    try:
+        async for line in container.export_service.export_customers(
+            format, after
+        ):
+            file.write(line)
+            lines += 1
+    finally:
+        await container.aclose()
+
+    print(f'{lines} linhas exportadas', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Exporta os clientes e seus produtos favoritos'
+    )
+    parser.add_argument(
+        '--format',
+        type=ExportFormat,
+        choices=list(ExportFormat),
+        default=ExportFormat.NDJSON,
+    )
+    parser.add_argument(
+        '--after',
+        type=int,
+        help=(
+            'retoma a exportação após o cliente com este ID (o da última '
+            'linha completa do arquivo)'
+        ),
+    )
+    parser.add_argument(
+        '--output',
+        help=(
+            'arquivo de saída, aberto para acréscimo, para que a exportação '
+            'possa ser retomada (padrão: saída padrão)'
+        ),
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    with (
+        open(args.output, 'a', encoding='utf-8')
+        if args.output
+        else contextlib.nullcontext(sys.stdout)
+    ) as file:
+        asyncio.run(export_customers(args.format, args.after, file))
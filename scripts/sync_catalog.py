@@ -0,0 +1,40 @@
+#! /usr/bin/env python3
+
+import argparse
+import asyncio
+import logging
+
+from aiqfav.container import Container
+
+
+async def sync_catalog(once: bool):
+    """Sync the product catalog into the cache, once or periodically."""
+
+    container = Container()
+    catalog_sync = container.catalog_sync
+    if catalog_sync.interval <= 0:
+        catalog_sync.interval = 5 * 60
+
+    try:
+        if once:
+            synced = await catalog_sync.sync_once()
+            print('Catálogo sincronizado' if synced else 'Lease ocupado')
+        else:
+            await catalog_sync.run()
+    finally:
+        await container.aclose()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Sincroniza o catálogo de produtos no cache'
+    )
+    parser.add_argument(
+        '--once',
+        action='store_true',
+        help='sincroniza uma única vez, em vez de periodicamente',
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(sync_catalog(args.once))
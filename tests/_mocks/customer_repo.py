@@ -1,8 +1,12 @@
+from typing import AsyncIterator
+
 from aiqfav.db.base import CustomerRepository
 from aiqfav.domain.customer import (
     CustomerInDb,
     CustomerNotFound,
+    CustomerWithFavorites,
     CustomerWithPassword,
+    DuplicateEmail,
 )
 from aiqfav.domain.favorite import FavoriteInDb
 
@@ -11,6 +15,7 @@ class CustomerRepositoryMock(CustomerRepository):
     def __init__(self):
         self._customers: list[CustomerInDb] = []
         self._favorites: list[FavoriteInDb] = []
+        self._token_versions: dict[int, int] = {}
 
     async def get_customer(
         self, *, email: str | None = None, id: int | None = None
@@ -41,12 +46,60 @@ class CustomerRepositoryMock(CustomerRepository):
 
         return customer
 
-    async def list_customers(self) -> list[CustomerInDb]:
-        return self._customers
+    async def get_customers_by_ids(self, ids: list[int]) -> list[CustomerInDb]:
+        return [customer for customer in self._customers if customer.id in ids]
+
+    async def list_customers(
+        self, limit: int | None = None, after: int | None = None
+    ) -> list[CustomerInDb]:
+        customers = sorted(
+            (
+                customer
+                for customer in self._customers
+                if after is None or customer.id > after
+            ),
+            key=lambda customer: customer.id,
+        )
+        return customers[:limit]
+
+    async def list_customers_with_favorites(
+        self, limit: int | None = None, after: int | None = None
+    ) -> list[CustomerWithFavorites]:
+        return [
+            CustomerWithFavorites(
+                id=customer.id,
+                name=customer.name,
+                email=customer.email,
+                favorites=sorted(
+                    await self.list_favorites_for_customer(customer.id),
+                    key=lambda favorite: favorite.product_id,
+                ),
+            )
+            for customer in await self.list_customers(limit, after)
+        ]
+
+    async def stream_customers_with_favorites(
+        self, after: int | None = None, batch_size: int = 1000
+    ) -> AsyncIterator[CustomerWithFavorites]:
+        for customer in await self.list_customers(after=after):
+            yield CustomerWithFavorites(
+                id=customer.id,
+                name=customer.name,
+                email=customer.email,
+                favorites=sorted(
+                    await self.list_favorites_for_customer(customer.id),
+                    key=lambda favorite: favorite.product_id,
+                ),
+            )
 
     async def create_customer(
         self, customer: CustomerWithPassword
     ) -> CustomerInDb:
+        if any(c.email == customer.email for c in self._customers):
+            raise DuplicateEmail(
+                f'Customer with email {customer.email} already exists'
+            )
+
         customer_in_db = CustomerInDb(
             id=self._get_next_id(),
             name=customer.name,
@@ -78,6 +131,19 @@ class CustomerRepositoryMock(CustomerRepository):
             )
         )
 
+    async def add_favorites(
+        self, customer_id: int, product_ids: list[int]
+    ) -> None:
+        if not any(c.id == customer_id for c in self._customers):
+            raise CustomerNotFound(f'Customer with id {customer_id} not found')
+
+        for product_id in product_ids:
+            favorite = FavoriteInDb(
+                customer_id=customer_id, product_id=product_id
+            )
+            if favorite not in self._favorites:
+                self._favorites.append(favorite)
+
     async def remove_favorite(self, customer_id: int, product_id: int) -> None:
         self._favorites = [
             favorite
@@ -86,12 +152,41 @@ class CustomerRepositoryMock(CustomerRepository):
             or favorite.product_id != product_id
         ]
 
-    async def set_admin(self, id: int) -> None:
+    async def remove_favorites(
+        self, customer_id: int, product_ids: list[int]
+    ) -> None:
+        self._favorites = [
+            favorite
+            for favorite in self._favorites
+            if favorite.customer_id != customer_id
+            or favorite.product_id not in product_ids
+        ]
+
+    async def set_admin(self, id: int) -> CustomerInDb:
         for customer in self._customers:
             if customer.id == id:
                 customer.is_admin = True
+                return customer
+
+        raise CustomerNotFound(f'Customer with id {id} not found')
+
+    async def update_hashed_password(
+        self, id: int, hashed_password: str
+    ) -> None:
+        for customer in self._customers:
+            if customer.id == id:
+                customer.hashed_password = hashed_password
                 break
 
+    async def get_token_version(self, id: int) -> int:
+        await self.get_customer(id=id)
+        return self._token_versions.get(id, 0)
+
+    async def bump_token_version(self, id: int) -> int:
+        await self.get_customer(id=id)
+        self._token_versions[id] = self._token_versions.get(id, 0) + 1
+        return self._token_versions[id]
+
     def _get_next_id(self) -> int:
         max_id = max((customer.id for customer in self._customers), default=0)
         return max_id + 1
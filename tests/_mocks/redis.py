@@ -1,33 +1,48 @@
 from __future__ import annotations
 
-import asyncio
+from typing import Any, Awaitable, Callable, Iterable, Mapping
 
-from aiqfav.adapters.redis_adapter import EncodableT, ExpiryT, KeyT, ResponseT
+from aiqfav.adapters.redis_adapter import (
+    AnyKeyT,
+    EncodableT,
+    ExpiryT,
+    FieldT,
+    KeyT,
+    ResponseT,
+)
 
 
 class PipelineMock:
     """Mock para o pipeline do Redis assíncrono."""
 
     def __init__(self, client: RedisMock):
-        self._cache = {}
+        self._commands: list[Callable[[], Awaitable[Any]]] = []
         self._client = client
 
     def set(self, name: KeyT, value: EncodableT, ex: ExpiryT | None = None):
         """Mock do método set do pipeline do Redis."""
-        self._cache[name] = value
-        return True
+        self._commands.append(lambda: self._client.set(name, value, ex))
+        return self
+
+    def delete(self, *names: KeyT):
+        """Mock do método delete do pipeline do Redis."""
+        self._commands.append(lambda: self._client.delete(*names))
+        return self
+
+    def hset(self, name: KeyT, mapping: Mapping[FieldT, EncodableT]):
+        """Mock do método hset do pipeline do Redis."""
+        self._commands.append(lambda: self._client.hset(name, mapping))
+        return self
+
+    def expire(self, name: KeyT, time: ExpiryT):
+        """Mock do método expire do pipeline do Redis."""
+        self._commands.append(lambda: self._client.expire(name, time))
+        return self
 
     async def execute(self):
         """Mock do método execute do pipeline do Redis."""
-        cache_length = len(self._cache)
-        await asyncio.gather(
-            *[
-                self._client.set(key, value)
-                for key, value in self._cache.items()
-            ]
-        )
-        self._cache.clear()
-        return [True] * cache_length
+        commands, self._commands = self._commands, []
+        return [await command() for command in commands]
 
 
 class RedisMock:
@@ -35,25 +50,60 @@ class RedisMock:
 
     def __init__(self):
         self._cache = {}
-        self._pipeline = PipelineMock(self)
 
     async def get(self, key: KeyT) -> ResponseT | None:
         """Mock do método get do Redis."""
         return self._cache.get(key)
 
     async def set(
-        self, key: KeyT, value: EncodableT, ex: ExpiryT | None = None
+        self,
+        key: KeyT,
+        value: EncodableT,
+        ex: ExpiryT | None = None,
+        nx: bool = False,
     ):
         """Mock do método set do Redis."""
+        if nx and key in self._cache:
+            return None
         self._cache[key] = value
         return True
 
-    async def delete(self, key: KeyT) -> ResponseT:
+    async def delete(self, *keys: KeyT) -> ResponseT:
         """Mock do método delete do Redis."""
-        if key in self._cache:
+        deleted = [key for key in keys if key in self._cache]
+        for key in deleted:
             del self._cache[key]
-            return 1
-        return 0
+        return len(deleted)
+
+    async def mget(self, keys: Iterable[KeyT]) -> list[ResponseT | None]:
+        """Mock do método mget do Redis."""
+        return [self._cache.get(key) for key in keys]
+
+    async def incr(self, key: KeyT) -> int:
+        """Mock do método incr do Redis."""
+        self._cache[key] = int(self._cache.get(key, 0)) + 1
+        return self._cache[key]
+
+    async def mset(self, mapping: Mapping[AnyKeyT, EncodableT]) -> ResponseT:
+        """Mock do método mset do Redis."""
+        self._cache.update(mapping)
+        return True
+
+    async def hset(self, name: KeyT, mapping: Mapping[FieldT, EncodableT]):
+        """Mock do método hset do Redis."""
+        self._cache.setdefault(name, {}).update(mapping)
+        return len(mapping)
+
+    async def hmget(
+        self, name: KeyT, keys: Iterable[str]
+    ) -> list[ResponseT | None]:
+        """Mock do método hmget do Redis."""
+        hash = self._cache.get(name, {})
+        return [hash.get(key) for key in keys]
+
+    async def expire(self, name: KeyT, time: ExpiryT):
+        """Mock do método expire do Redis (as chaves não expiram)."""
+        return name in self._cache
 
     def pipeline(self) -> PipelineMock:
-        return self._pipeline
+        return PipelineMock(self)
@@ -0,0 +1,360 @@
+import asyncio
+import json
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from aiqfav.adapters.base import StoreApiAdapter
+from aiqfav.adapters.exceptions import (
+    StoreApiNotFoundError,
+    StoreApiUnavailableError,
+)
+from aiqfav.adapters.fakestore_api import FakeStoreApi
+from aiqfav.utils.background import wait_background_tasks
+from aiqfav.utils.cache import CacheEntry, TTLCache
+from aiqfav.utils.circuit_breaker import CircuitBreaker, CircuitState
+from tests._mocks.httpx import HttpxAsyncClientMock
+from tests._mocks.redis import RedisMock
+
+PRODUCT = {
+    'id': 1,
+    'title': 'Product 1',
+    'price': 100.0,
+    'rating': {
+        'rate': 5.0,
+    },
+    'image': 'https://via.placeholder.com/150',
+}
+
+
+@pytest.mark.asyncio
+class TestFakeStoreApi:
+    async def test_get_product_cache_hit_skips_upstream(
+        self,
+        store_api_adapter: FakeStoreApi,
+        client_mock: HttpxAsyncClientMock,
+    ):
+        client_mock.get.return_value = httpx.Response(
+            status_code=200, json=PRODUCT
+        )
+
+        product = await store_api_adapter.get_product(1)
+        assert product.id == 1
+        assert client_mock.get.call_count == 1
+
+        # Second call should hit the cache, without calling the store API
+        product = await store_api_adapter.get_product(1)
+        assert product.id == 1
+        assert client_mock.get.call_count == 1
+
+        assert store_api_adapter.cache_stats.hits == 1
+        assert store_api_adapter.cache_stats.misses == 1
+
+    async def test_get_product_not_found(
+        self,
+        store_api_adapter: StoreApiAdapter,
+        client_mock: HttpxAsyncClientMock,
+    ):
+        client_mock.get.return_value = httpx.Response(
+            status_code=200, content=b''
+        )
+
+        with pytest.raises(StoreApiNotFoundError):
+            await store_api_adapter.get_product(1)
+
+    async def test_list_products_fills_product_cache(
+        self,
+        store_api_adapter: StoreApiAdapter,
+        client_mock: HttpxAsyncClientMock,
+    ):
+        client_mock.get.return_value = httpx.Response(
+            status_code=200, json=[PRODUCT]
+        )
+
+        products = await store_api_adapter.list_products()
+        assert [product.id for product in products] == [1]
+
+        product = await store_api_adapter.get_product(1)
+        assert product.id == 1
+        assert client_mock.get.call_count == 1
+
+    async def test_get_products_in_batch_fetches_only_misses(
+        self,
+        store_api_adapter: FakeStoreApi,
+        client_mock: HttpxAsyncClientMock,
+        redis_mock: RedisMock,
+    ):
+        client_mock.get.side_effect = lambda url: httpx.Response(
+            status_code=200,
+            json={**PRODUCT, 'id': int(url.rsplit('/', 1)[-1])},
+        )
+        await store_api_adapter.get_product(1)
+        client_mock.get.reset_mock()
+
+        with patch.object(redis_mock, 'get', wraps=redis_mock.get) as get:
+            products = await store_api_adapter.get_products_in_batch(
+                [1, 2, 3, 2]
+            )
+
+        assert [product.id for product in products] == [1, 2, 3, 2]
+        assert get.call_count == 0
+        fetched_urls = sorted(
+            call.args[0] for call in client_mock.get.call_args_list
+        )
+        assert fetched_urls == [
+            'https://fakestoreapi.com/products/2',
+            'https://fakestoreapi.com/products/3',
+        ]
+
+        # Everything is cached now
+        client_mock.get.reset_mock()
+        await store_api_adapter.get_products_in_batch([1, 2, 3])
+        client_mock.get.assert_not_called()
+
+    async def test_get_products_in_batch_not_found(
+        self,
+        store_api_adapter: StoreApiAdapter,
+        client_mock: HttpxAsyncClientMock,
+    ):
+        client_mock.get.return_value = httpx.Response(
+            status_code=200, content=b''
+        )
+
+        with pytest.raises(StoreApiNotFoundError):
+            await store_api_adapter.get_products_in_batch([1, 2])
+
+    async def test_get_product_coalesces_concurrent_misses(
+        self,
+        store_api_adapter: FakeStoreApi,
+        client_mock: HttpxAsyncClientMock,
+    ):
+        async def get(url: str) -> httpx.Response:
+            await asyncio.sleep(0.01)
+            return httpx.Response(status_code=200, json=PRODUCT)
+
+        client_mock.get.side_effect = get
+
+        products = await asyncio.gather(
+            *[store_api_adapter.get_product(1) for _ in range(10)]
+        )
+
+        assert all(product.id == 1 for product in products)
+        assert client_mock.get.call_count == 1
+
+    async def test_get_product_waits_for_fill_lock_owner(
+        self,
+        store_api_adapter: FakeStoreApi,
+        client_mock: HttpxAsyncClientMock,
+        redis_mock: RedisMock,
+    ):
+        store_api_adapter.fill_lock_timeout = 1
+        # Another worker holds the lock and fills the cache
+        await redis_mock.set('lock:product:1', '1', nx=True)
+
+        async def fill_cache():
+            await asyncio.sleep(0.1)
+            await redis_mock.set(
+                'product:1', CacheEntry.create(PRODUCT, 60).dumps()
+            )
+
+        _, product = await asyncio.gather(
+            fill_cache(), store_api_adapter.get_product(1)
+        )
+
+        assert product.id == 1
+        client_mock.get.assert_not_called()
+
+    async def test_batch_does_not_join_fill_of_not_found_product(
+        self,
+        store_api_adapter: FakeStoreApi,
+        client_mock: HttpxAsyncClientMock,
+        redis_mock: RedisMock,
+    ):
+        store_api_adapter.fill_lock_timeout = 1
+        client_mock.get.return_value = httpx.Response(
+            status_code=200, content=b''
+        )
+        # Another worker holds the lock and caches a tombstone
+        await redis_mock.set('lock:product:1', '1', nx=True)
+
+        async def fill_cache():
+            await asyncio.sleep(0.1)
+            await redis_mock.set(
+                'product:1', CacheEntry.create(None, 60).dumps()
+            )
+
+        results = await asyncio.gather(
+            fill_cache(),
+            store_api_adapter.get_product(1),
+            store_api_adapter.get_products_in_batch([1]),
+            return_exceptions=True,
+        )
+
+        assert isinstance(results[1], StoreApiNotFoundError)
+        assert isinstance(results[2], StoreApiNotFoundError)
+
+    async def test_get_product_local_cache(
+        self,
+        store_api_adapter: FakeStoreApi,
+        client_mock: HttpxAsyncClientMock,
+        redis_mock: RedisMock,
+    ):
+        store_api_adapter.local_cache = TTLCache(maxsize=10, ttl=60)
+        client_mock.get.return_value = httpx.Response(
+            status_code=200, json=PRODUCT
+        )
+        await store_api_adapter.get_product(1)
+
+        with patch.object(redis_mock, 'mget', wraps=redis_mock.mget) as mget:
+            product = await store_api_adapter.get_product(1)
+            products = await store_api_adapter.get_products_in_batch([1])
+
+        assert product.id == products[0].id == 1
+        mget.assert_not_called()
+        assert client_mock.get.call_count == 1
+
+    async def test_get_product_stale_while_revalidate(
+        self,
+        store_api_adapter: FakeStoreApi,
+        client_mock: HttpxAsyncClientMock,
+        redis_mock: RedisMock,
+    ):
+        stale_entry = CacheEntry(
+            value={**PRODUCT, 'title': 'Stale'}, fresh_until=0
+        )
+        await redis_mock.set('product:1', stale_entry.dumps())
+        client_mock.get.return_value = httpx.Response(
+            status_code=200, json=PRODUCT
+        )
+
+        # The stale product is served right away...
+        product = await store_api_adapter.get_product(1)
+        assert product.title == 'Stale'
+
+        # ...and refreshed in background
+        await wait_background_tasks()
+        assert client_mock.get.call_count == 1
+
+        product = await store_api_adapter.get_product(1)
+        assert product.title == PRODUCT['title']
+        assert client_mock.get.call_count == 1
+
+    async def test_catalog_index_answers_misses(
+        self,
+        store_api_adapter: FakeStoreApi,
+        client_mock: HttpxAsyncClientMock,
+        redis_mock: RedisMock,
+    ):
+        client_mock.get.return_value = httpx.Response(
+            status_code=200, json=[PRODUCT]
+        )
+        await store_api_adapter.list_products()
+        await redis_mock.delete('product:1')
+
+        # Unknown products are rejected without calling the store API
+        with pytest.raises(StoreApiNotFoundError):
+            await store_api_adapter.get_product(2)
+
+        # Index lookups count as cache hits
+        await store_api_adapter.get_products_in_batch([1])
+        assert store_api_adapter.cache_stats.hits == 2
+        assert store_api_adapter.cache_stats.misses == 1
+
+        # Another worker, without the in-memory index, uses the Redis one
+        other_adapter = FakeStoreApi(
+            store_api_adapter.base_url,
+            client=store_api_adapter.client,
+            redis=redis_mock,
+        )
+        product = await other_adapter.get_product(1)
+        assert product.id == 1
+        with pytest.raises(StoreApiNotFoundError):
+            await other_adapter.get_products_in_batch([1, 2])
+
+        assert client_mock.get.call_count == 1
+
+    async def test_get_product_not_found_is_cached(
+        self,
+        store_api_adapter: FakeStoreApi,
+        client_mock: HttpxAsyncClientMock,
+    ):
+        client_mock.get.return_value = httpx.Response(
+            status_code=200, content=b''
+        )
+
+        with pytest.raises(StoreApiNotFoundError):
+            await store_api_adapter.get_product(1)
+        with pytest.raises(StoreApiNotFoundError):
+            await store_api_adapter.get_product(1)
+        with pytest.raises(StoreApiNotFoundError):
+            await store_api_adapter.get_products_in_batch([1])
+
+        assert client_mock.get.call_count == 1
+
+    async def test_legacy_cache_format_is_a_miss(
+        self,
+        store_api_adapter: FakeStoreApi,
+        client_mock: HttpxAsyncClientMock,
+        redis_mock: RedisMock,
+    ):
+        # Values cached before CacheEntry: the raw product and catalog
+        await redis_mock.set('product:1', json.dumps(PRODUCT))
+        await redis_mock.set('product:2', json.dumps({**PRODUCT, 'id': 2}))
+        await redis_mock.set('products', json.dumps([PRODUCT]))
+        client_mock.get.side_effect = lambda url: httpx.Response(
+            status_code=200,
+            json={**PRODUCT, 'id': int(url.rsplit('/', 1)[-1])},
+        )
+
+        product = await store_api_adapter.get_product(1)
+        assert product.id == 1
+        products = await store_api_adapter.get_products_in_batch([2])
+        assert [product.id for product in products] == [2]
+        assert client_mock.get.call_count == 2
+        assert store_api_adapter.cache_stats.misses == 2
+
+        # ...and overwritten with entries
+        for key in ('product:1', 'product:2'):
+            cached_data = await redis_mock.get(key)
+            assert cached_data and CacheEntry.loads(cached_data) is not None
+
+        client_mock.get.side_effect = None
+        client_mock.get.return_value = httpx.Response(
+            status_code=200, json=[PRODUCT]
+        )
+        products = await store_api_adapter.list_products()
+        assert [product.id for product in products] == [1]
+
+    async def test_circuit_breaker_fails_fast(
+        self,
+        store_api_adapter: FakeStoreApi,
+        client_mock: HttpxAsyncClientMock,
+    ):
+        store_api_adapter.circuit_breaker = CircuitBreaker(
+            'store_api', failure_threshold=2
+        )
+        client_mock.get.side_effect = httpx.ConnectTimeout('timeout')
+
+        for product_id in (1, 2):
+            with pytest.raises(StoreApiUnavailableError):
+                await store_api_adapter.get_product(product_id)
+        assert client_mock.get.call_count == 2
+        assert store_api_adapter.circuit_breaker.state is CircuitState.OPEN
+
+        # The circuit is open: fail without calling the store API
+        with pytest.raises(StoreApiUnavailableError):
+            await store_api_adapter.get_product(3)
+        assert client_mock.get.call_count == 2
+
+    async def test_server_error_counts_as_failure(
+        self,
+        store_api_adapter: FakeStoreApi,
+        client_mock: HttpxAsyncClientMock,
+    ):
+        client_mock.get.return_value = httpx.Response(status_code=503)
+
+        with pytest.raises(StoreApiUnavailableError):
+            await store_api_adapter.get_product(1)
+
+        assert store_api_adapter.circuit_breaker.consecutive_failures == 1
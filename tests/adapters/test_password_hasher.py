@@ -0,0 +1,38 @@
+import asyncio
+
+import pytest
+from passlib.context import CryptContext
+
+from aiqfav.adapters.password_hasher import PasswordHasherImpl
+
+
+@pytest.mark.asyncio
+class TestPasswordHasherImpl:
+    async def test_hash_and_verify(self, pwd_context: CryptContext):
+        password_hasher = PasswordHasherImpl(pwd_context)
+
+        hashed_password = await password_hasher.hash('password')
+        assert await password_hasher.verify('password', hashed_password)
+        assert not await password_hasher.verify('wrong', hashed_password)
+
+        password_hasher.shutdown()
+
+    async def test_queue_depth(self, pwd_context: CryptContext):
+        password_hasher = PasswordHasherImpl(pwd_context, max_workers=1)
+        hashed_password = await password_hasher.hash('password')
+
+        verifications = [
+            asyncio.create_task(
+                password_hasher.verify('password', hashed_password)
+            )
+            for _ in range(3)
+        ]
+        await asyncio.sleep(0.01)
+        assert password_hasher.stats()['running'] == 1
+        assert password_hasher.stats()['queued'] == 2
+
+        assert all(await asyncio.gather(*verifications))
+        assert password_hasher.stats()['running'] == 0
+        assert password_hasher.stats()['queued'] == 0
+
+        password_hasher.shutdown()
@@ -1,3 +1,5 @@
+from typing import Iterator
+
 import pytest
 from faker import Faker
 from fastapi.testclient import TestClient
@@ -12,12 +14,14 @@ from aiqfav.services.customer import CustomerService
 
 
 @pytest.fixture
-def http_client(override_env) -> TestClient:
+def http_client(override_env) -> Iterator[TestClient]:
     from aiqfav.api.app import create_app
 
     app = create_app()
 
-    return TestClient(app)
+    # O context manager executa o lifespan da aplicação
+    with TestClient(app) as client:
+        yield client
 
 
 @pytest.fixture
@@ -1,7 +1,11 @@
+import json
+
 import pytest
+from faker import Faker
 from fastapi.testclient import TestClient
 
-from aiqfav.domain.customer import CustomerPublic
+from aiqfav.db.base import CustomerRepository
+from aiqfav.domain.customer import CustomerPublic, CustomerWithPassword
 
 
 @pytest.mark.asyncio
@@ -45,3 +49,149 @@ class TestCustomersEndpoints:
         assert response.json()[0]['id'] == customer_admin.id
         assert response.json()[0]['name'] == customer_admin.name
         assert response.json()[0]['email'] == customer_admin.email
+
+    async def test_bulk_favorites_validates_payload(
+        self,
+        http_client: TestClient,
+        access_token_non_admin: str,
+    ):
+        headers = {'Authorization': f'Bearer {access_token_non_admin}'}
+
+        response = http_client.put(
+            '/v1/customers/me/favorites/bulk',
+            json={'product_ids': []},
+            headers=headers,
+        )
+        assert response.status_code == 422
+
+        response = http_client.delete(
+            '/v1/customers/me/favorites/bulk', headers=headers
+        )
+        assert response.status_code == 422
+
+    async def test_remove_favorites_in_bulk(
+        self,
+        http_client: TestClient,
+        access_token_non_admin: str,
+    ):
+        response = http_client.delete(
+            '/v1/customers/me/favorites/bulk',
+            params={'product_ids': [1, 2, 3]},
+            headers={'Authorization': f'Bearer {access_token_non_admin}'},
+        )
+        assert response.status_code == 204
+
+    async def test_admin_removes_favorites_in_bulk(
+        self,
+        http_client: TestClient,
+        customer_admin: CustomerPublic,
+        access_token_admin: str,
+    ):
+        response = http_client.delete(
+            f'/v1/customers/{customer_admin.id}/favorites/bulk',
+            params={'product_ids': [1, 2, 3]},
+            headers={'Authorization': f'Bearer {access_token_admin}'},
+        )
+        assert response.status_code == 204
+
+    async def test_export_customers(
+        self,
+        http_client: TestClient,
+        customer_admin: CustomerPublic,
+        access_token_admin: str,
+    ):
+        response = http_client.get(
+            '/v1/customers/export',
+            params={'format': 'ndjson'},
+            headers={'Authorization': f'Bearer {access_token_admin}'},
+        )
+        assert response.status_code == 200
+        assert response.headers['content-type'] == 'application/x-ndjson'
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert [line['id'] for line in lines] == [customer_admin.id]
+
+    async def test_get_me_includes_favorites(
+        self,
+        http_client: TestClient,
+        access_token_non_admin: str,
+    ):
+        headers = {'Authorization': f'Bearer {access_token_non_admin}'}
+
+        response = http_client.get('/v1/customers/me', headers=headers)
+        assert response.status_code == 200
+        assert 'favorites' not in response.json()
+
+        response = http_client.get(
+            '/v1/customers/me',
+            params={'include': 'favorites'},
+            headers=headers,
+        )
+        assert response.status_code == 200
+        assert response.json()['favorites'] == []
+
+        response = http_client.get(
+            '/v1/customers/me',
+            params={'include': 'unknown'},
+            headers=headers,
+        )
+        assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+class TestRequestStatsHeaders:
+    @pytest.fixture(autouse=True)
+    def enable_stats_headers(self, monkeypatch: pytest.MonkeyPatch):
+        monkeypatch.setenv('REQUEST_STATS_HEADERS', 'true')
+
+    async def test_admin_route_loads_customer_once(
+        self,
+        http_client: TestClient,
+        customer_admin: CustomerPublic,
+        access_token_admin: str,
+    ):
+        response = http_client.delete(
+            f'/v1/customers/{customer_admin.id}/favorites/1',
+            headers={'Authorization': f'Bearer {access_token_admin}'},
+        )
+        assert response.status_code == 204
+        # Uma consulta do cliente (autenticação, checagem de admin e
+        # validação do cliente compartilham o identity map) e o DELETE
+        assert response.headers['X-DB-Queries'] == '2'
+        assert int(response.headers['X-Redis-Commands']) > 0
+
+    async def test_list_customers_with_favorites_in_constant_queries(
+        self,
+        http_client: TestClient,
+        customer_admin: CustomerPublic,
+        access_token_admin: str,
+        customer_repo_impl: CustomerRepository,
+        fake: Faker,
+    ):
+        for _ in range(5):
+            customer = await customer_repo_impl.create_customer(
+                CustomerWithPassword(
+                    name=fake.name(),
+                    email=fake.unique.email(),
+                    hashed_password='$fake_hash$',
+                )
+            )
+            await customer_repo_impl.add_favorites(customer.id, [1, 2])
+
+        response = http_client.get(
+            '/v1/customers/with-favorites',
+            params={'limit': 4},
+            headers={'Authorization': f'Bearer {access_token_admin}'},
+        )
+        assert response.status_code == 200
+        customers = response.json()
+        assert [customer['id'] for customer in customers] == [
+            customer_admin.id + i for i in range(4)
+        ]
+        assert customers[1]['favorites'] == [
+            {'customer_id': customer_admin.id + 1, 'product_id': 1},
+            {'customer_id': customer_admin.id + 1, 'product_id': 2},
+        ]
+        assert response.headers['X-Next-Cursor'] == str(customers[-1]['id'])
+        # O administrador, a página de clientes e os favoritos de toda a
+        # página, em vez de uma consulta de favoritos por cliente
+        assert response.headers['X-DB-Queries'] == '3'
@@ -0,0 +1,20 @@
+import pytest
+from fastapi.testclient import TestClient
+
+
+@pytest.mark.asyncio
+class TestMetricsEndpoints:
+    async def test_metrics_requires_token(self, http_client: TestClient):
+        response = http_client.get('/v1/metrics')
+        assert response.status_code == 401
+
+    async def test_metrics_requires_admin_token(
+        self,
+        http_client: TestClient,
+        access_token_non_admin: str,
+    ):
+        response = http_client.get(
+            '/v1/metrics',
+            headers={'Authorization': f'Bearer {access_token_non_admin}'},
+        )
+        assert response.status_code == 403
@@ -0,0 +1,46 @@
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from aiqfav.adapters.base import StoreApiAdapter
+from aiqfav.api.dependencies import get_store_api_adapter
+from tests._mocks.httpx import HttpxAsyncClientMock
+
+
+@pytest.mark.asyncio
+class TestProductsEndpoints:
+    @pytest.fixture(autouse=True)
+    def override_store_api_adapter(
+        self, http_client: TestClient, store_api_adapter: StoreApiAdapter
+    ):
+        http_client.app.dependency_overrides[get_store_api_adapter] = (  # pyright: ignore[reportAttributeAccessIssue]
+            lambda: store_api_adapter
+        )
+
+    async def test_list_products(
+        self, http_client: TestClient, client_mock: HttpxAsyncClientMock
+    ):
+        client_mock.get.return_value = httpx.Response(
+            status_code=200,
+            json=[
+                {
+                    'id': 1,
+                    'title': 'Product 1',
+                    'price': 100.0,
+                    'image': 'https://via.placeholder.com/150',
+                }
+            ],
+        )
+
+        response = http_client.get('/v1/products')
+        assert response.status_code == 200
+        assert response.json()[0]['id'] == 1
+
+    async def test_list_products_store_api_unavailable(
+        self, http_client: TestClient, client_mock: HttpxAsyncClientMock
+    ):
+        client_mock.get.side_effect = httpx.ConnectError('unavailable')
+
+        response = http_client.get('/v1/products')
+        assert response.status_code == 503
+        assert response.json()['detail']['type'] == 'store_api_unavailable'
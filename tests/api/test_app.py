@@ -0,0 +1,102 @@
+import uuid
+
+import httpx
+import pytest
+import redis.asyncio as redis
+from fastapi.testclient import TestClient
+
+from aiqfav.api.app import create_app
+from aiqfav.container import Container
+
+
+def product_response(request: httpx.Request) -> httpx.Response:
+    product_id = int(request.url.path.rsplit('/', 1)[1])
+    return httpx.Response(
+        status_code=200,
+        json={
+            'id': product_id,
+            'title': f'Product {product_id}',
+            'price': 100.0,
+            'image': 'https://via.placeholder.com/150',
+        },
+    )
+
+
+@pytest.mark.asyncio
+class TestAppLifespan:
+    async def test_http_client_is_shared_and_closed(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+        access_token_non_admin: str,
+    ):
+        clients: list[httpx.AsyncClient] = []
+        requests: list[httpx.Request] = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            return product_response(request)
+
+        def create_http_client(self: Container) -> httpx.AsyncClient:
+            client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            clients.append(client)
+            return client
+
+        monkeypatch.setattr(
+            Container, '_create_http_client', create_http_client
+        )
+        # IDs que não estão em nenhum cache, para chamar a API de loja
+        product_ids = [uuid.uuid4().int % 10**9 + 1 for _ in range(2)]
+
+        app = create_app()
+        with TestClient(app) as client:
+            container: Container = app.state.container
+            for product_id in product_ids:
+                response = client.put(
+                    '/v1/customers/me/favorites',
+                    json={'product_id': product_id},
+                    headers={
+                        'Authorization': f'Bearer {access_token_non_admin}'
+                    },
+                )
+                assert response.status_code == 200
+
+            assert container.store_api_adapter.client is clients[0]  # pyright: ignore[reportAttributeAccessIssue]
+            assert not clients[0].is_closed
+
+        # Um único cliente atendeu todas as requisições...
+        assert len(clients) == 1
+        assert len(requests) == 2
+        # ...e foi fechado no encerramento do lifespan
+        assert clients[0].is_closed
+
+    async def test_redis_pool_is_shared_and_disconnected(
+        self, access_token_non_admin: str
+    ):
+        app = create_app()
+        with TestClient(app) as client:
+            container: Container = app.state.container
+            pool = container.redis_client.connection_pool
+            assert isinstance(pool, redis.BlockingConnectionPool)
+            assert container.redis.client is container.redis_client
+
+            for _ in range(3):
+                response = client.get(
+                    '/v1/customers/me/favorites',
+                    headers={
+                        'Authorization': f'Bearer {access_token_non_admin}'
+                    },
+                )
+                assert response.status_code == 200
+
+            # As requisições reutilizam a mesma conexão do pool
+            assert container.redis_client.connection_pool is pool
+            assert container.redis.pool_stats() == {
+                'max_connections': pool.max_connections,
+                'in_use': 0,
+                'available': 1,
+            }
+            connections = list(pool._available_connections)
+            assert all(connection.is_connected for connection in connections)
+
+        # O lifespan desconecta o pool no encerramento
+        assert not any(connection.is_connected for connection in connections)
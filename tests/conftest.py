@@ -1,5 +1,6 @@
 import uuid
 from datetime import timedelta
+from typing import Iterator
 
 import asyncpg
 import httpx
@@ -14,9 +15,10 @@ from sqlalchemy.ext.asyncio import (
 )
 from sqlalchemy.pool import NullPool
 
-from aiqfav.adapters.base import JwtAdapter, StoreApiAdapter
+from aiqfav.adapters.base import JwtAdapter, PasswordHasher, StoreApiAdapter
 from aiqfav.adapters.fakestore_api import FakeStoreApi
 from aiqfav.adapters.jwt import JwtAdapterImpl
+from aiqfav.adapters.password_hasher import PasswordHasherImpl
 from aiqfav.adapters.redis_adapter import RedisAsyncProtocol
 from aiqfav.db.base import CustomerRepository
 from aiqfav.db.implementations.customer import CustomerRepositoryImpl
@@ -55,7 +57,7 @@ def store_api_adapter(
 ) -> StoreApiAdapter:
     return FakeStoreApi(
         'https://fakestoreapi.com',
-        client_factory=lambda: client_mock,
+        client=client_mock,
         redis=redis_mock,
     )
 
@@ -65,17 +67,24 @@ def pwd_context() -> CryptContext:
     return CryptContext(schemes=['argon2'], deprecated='auto')
 
 
+@pytest.fixture
+def password_hasher(pwd_context: CryptContext) -> Iterator[PasswordHasher]:
+    password_hasher = PasswordHasherImpl(pwd_context)
+    yield password_hasher
+    password_hasher.shutdown()
+
+
 @pytest.fixture
 def customer_service(
     customer_repo: CustomerRepository,
     store_api_adapter: StoreApiAdapter,
-    pwd_context: CryptContext,
+    password_hasher: PasswordHasher,
     redis_mock: RedisAsyncProtocol,
 ) -> CustomerService:
     return CustomerService(
         customer_repo=customer_repo,
         store_api_adapter=store_api_adapter,
-        pwd_context=pwd_context,
+        password_hasher=password_hasher,
         redis=redis_mock,
     )
 
@@ -91,12 +100,12 @@ def jwt_adapter() -> JwtAdapter:
 @pytest.fixture
 def auth_service(
     customer_repo: CustomerRepository,
-    pwd_context: CryptContext,
+    password_hasher: PasswordHasher,
     jwt_adapter: JwtAdapter,
 ) -> AuthService:
     return AuthService(
         customer_repo=customer_repo,
-        pwd_context=pwd_context,
+        password_hasher=password_hasher,
         access_token_expiration=timedelta(days=1),
         refresh_token_expiration=timedelta(days=30),
         jwt_adapter=jwt_adapter,
@@ -214,13 +223,13 @@ def customer_repo_impl(
 def customer_service_impl(
     customer_repo_impl: CustomerRepository,
     store_api_adapter: StoreApiAdapter,
-    pwd_context: CryptContext,
+    password_hasher: PasswordHasher,
     redis_mock: RedisAsyncProtocol,
 ) -> CustomerService:
     return CustomerService(
         customer_repo=customer_repo_impl,
         store_api_adapter=store_api_adapter,
-        pwd_context=pwd_context,
+        password_hasher=password_hasher,
         redis=redis_mock,
     )
 
@@ -231,8 +240,9 @@ def override_env(temp_db_url: str, monkeypatch: pytest.MonkeyPatch):
     monkeypatch.setenv('DATABASE_URL', temp_db_url)
     monkeypatch.setenv('SECRET_KEY', 'secret')
     monkeypatch.setenv('ALGORITHM', 'HS256')
+    monkeypatch.setenv('CATALOG_SYNC_INTERVAL', '0')
 
-    from aiqfav.api.dependencies import env
+    from aiqfav.container import env
 
     # Reload env variables
     env.read_env()
@@ -241,12 +251,12 @@ def override_env(temp_db_url: str, monkeypatch: pytest.MonkeyPatch):
 @pytest.fixture
 def auth_service_impl(
     customer_repo_impl: CustomerRepository,
-    pwd_context: CryptContext,
+    password_hasher: PasswordHasher,
     jwt_adapter: JwtAdapter,
 ) -> AuthService:
     return AuthService(
         customer_repo=customer_repo_impl,
-        pwd_context=pwd_context,
+        password_hasher=password_hasher,
         jwt_adapter=jwt_adapter,
         access_token_expiration=timedelta(days=1),
         refresh_token_expiration=timedelta(days=30),
@@ -2,7 +2,11 @@ import pytest
 from faker import Faker
 
 from aiqfav.db.base import CustomerRepository
-from aiqfav.domain.customer import CustomerNotFound, CustomerWithPassword
+from aiqfav.domain.customer import (
+    CustomerNotFound,
+    CustomerWithPassword,
+    DuplicateEmail,
+)
 
 
 @pytest.mark.asyncio
@@ -34,6 +38,21 @@ class TestCustomerRepositoryImpl:
         assert customer.id is not None
         assert customer.is_admin is False
 
+    async def test_create_customer_duplicate_email(
+        self,
+        customer_repo_impl: CustomerRepository,
+        customer_with_password: CustomerWithPassword,
+    ):
+        """Testa que o e-mail repetido é rejeitado pela constraint única."""
+        await customer_repo_impl.create_customer(customer_with_password)
+
+        with pytest.raises(DuplicateEmail):
+            await customer_repo_impl.create_customer(customer_with_password)
+
+        # A falha não deixa a sessão inutilizável
+        customers = await customer_repo_impl.list_customers()
+        assert len(customers) == 1
+
     async def test_get_customer(
         self,
         customer_repo_impl: CustomerRepository,
@@ -68,6 +87,51 @@ class TestCustomerRepositoryImpl:
         with pytest.raises(CustomerNotFound):
             await customer_repo_impl.get_customer(email=fake.email())
 
+    async def test_get_customers_by_ids(
+        self,
+        customer_repo_impl: CustomerRepository,
+        fake: Faker,
+    ):
+        """Testa a busca de vários clientes em uma única consulta."""
+        created = [
+            await customer_repo_impl.create_customer(
+                CustomerWithPassword(
+                    name=fake.name(),
+                    email=fake.unique.email(),
+                    hashed_password='$fake_hash$' + fake.password(),
+                )
+            )
+            for _ in range(3)
+        ]
+
+        customers = await customer_repo_impl.get_customers_by_ids(
+            [created[0].id, created[2].id, 9999]
+        )
+        assert sorted(customer.id for customer in customers) == [
+            created[0].id,
+            created[2].id,
+        ]
+
+        assert await customer_repo_impl.get_customers_by_ids([]) == []
+
+    async def test_get_customers_by_bigint_ids(
+        self,
+        customer_repo_impl: CustomerRepository,
+        customer_with_password: CustomerWithPassword,
+    ):
+        """Testa a busca por IDs acima do limite de int32 (coluna BIGINT)."""
+        customer = await customer_repo_impl.create_customer(
+            customer_with_password
+        )
+
+        customers = await customer_repo_impl.get_customers_by_ids(
+            [customer.id, 3_000_000_000]
+        )
+        assert [c.id for c in customers] == [customer.id]
+
+        with pytest.raises(CustomerNotFound):
+            await customer_repo_impl.get_customer(id=3_000_000_000)
+
     async def test_list_customers(
         self,
         customer_repo_impl: CustomerRepository,
@@ -80,6 +144,33 @@ class TestCustomerRepositoryImpl:
         assert customers[0].name == customer_with_password.name
         assert customers[0].email == customer_with_password.email
 
+    async def test_list_customers_keyset_pagination(
+        self,
+        customer_repo_impl: CustomerRepository,
+        fake: Faker,
+    ):
+        """Testa a paginação por ID da listagem de clientes."""
+        ids = [
+            (
+                await customer_repo_impl.create_customer(
+                    CustomerWithPassword(
+                        name=fake.name(),
+                        email=fake.unique.email(),
+                        hashed_password='$fake_hash$',
+                    )
+                )
+            ).id
+            for _ in range(3)
+        ]
+
+        first_page = await customer_repo_impl.list_customers(limit=2)
+        assert [customer.id for customer in first_page] == ids[:2]
+
+        second_page = await customer_repo_impl.list_customers(
+            limit=2, after=first_page[-1].id
+        )
+        assert [customer.id for customer in second_page] == ids[2:]
+
     async def test_delete_customer(
         self,
         customer_repo_impl: CustomerRepository,
@@ -107,10 +198,28 @@ class TestCustomerRepositoryImpl:
         customer = await customer_repo_impl.create_customer(
             customer_with_password
         )
-        await customer_repo_impl.set_admin(customer.id)
+        updated = await customer_repo_impl.set_admin(customer.id)
+        assert updated.is_admin
         customer = await customer_repo_impl.get_customer(id=customer.id)
         assert customer.is_admin
 
+        with pytest.raises(CustomerNotFound):
+            await customer_repo_impl.set_admin(customer.id + 1)
+
+    async def test_update_hashed_password(
+        self,
+        customer_repo_impl: CustomerRepository,
+        customer_with_password: CustomerWithPassword,
+    ):
+        customer = await customer_repo_impl.create_customer(
+            customer_with_password
+        )
+        await customer_repo_impl.update_hashed_password(
+            customer.id, '$new_hash$'
+        )
+        customer = await customer_repo_impl.get_customer(id=customer.id)
+        assert customer.hashed_password == '$new_hash$'
+
     async def test_favorites(
         self,
         customer_repo_impl: CustomerRepository,
@@ -132,3 +241,158 @@ class TestCustomerRepositoryImpl:
             customer.id
         )
         assert len(favorites) == 0
+
+    async def test_bulk_favorites(
+        self,
+        customer_repo_impl: CustomerRepository,
+        customer_with_password: CustomerWithPassword,
+    ):
+        """Testa a adição e remoção de favoritos em lote."""
+        customer = await customer_repo_impl.create_customer(
+            customer_with_password
+        )
+        await customer_repo_impl.add_favorite(customer.id, 1)
+        # O produto já favoritado é ignorado
+        await customer_repo_impl.add_favorites(customer.id, [1, 2, 3])
+        favorites = await customer_repo_impl.list_favorites_for_customer(
+            customer.id
+        )
+        assert sorted(favorite.product_id for favorite in favorites) == [
+            1,
+            2,
+            3,
+        ]
+
+        await customer_repo_impl.remove_favorites(customer.id, [1, 3, 4])
+        favorites = await customer_repo_impl.list_favorites_for_customer(
+            customer.id
+        )
+        assert [favorite.product_id for favorite in favorites] == [2]
+
+        with pytest.raises(CustomerNotFound):
+            await customer_repo_impl.add_favorites(customer.id + 1, [1])
+
+    async def test_bulk_favorites_bigint_product_ids(
+        self,
+        customer_repo_impl: CustomerRepository,
+        customer_with_password: CustomerWithPassword,
+    ):
+        """Testa favoritos em lote com IDs acima do limite de int32."""
+        customer = await customer_repo_impl.create_customer(
+            customer_with_password
+        )
+        await customer_repo_impl.add_favorites(customer.id, [3_000_000_000])
+        favorites = await customer_repo_impl.list_favorites_for_customer(
+            customer.id
+        )
+        assert [favorite.product_id for favorite in favorites] == [
+            3_000_000_000
+        ]
+
+        await customer_repo_impl.remove_favorites(
+            customer.id, [3_000_000_000, 3_000_000_001]
+        )
+        assert (
+            await customer_repo_impl.list_favorites_for_customer(customer.id)
+            == []
+        )
+
+    async def test_list_customers_with_favorites(
+        self,
+        customer_repo_impl: CustomerRepository,
+        fake: Faker,
+    ):
+        """Testa a listagem paginada dos clientes com seus favoritos."""
+        customers = [
+            await customer_repo_impl.create_customer(
+                CustomerWithPassword(
+                    name=fake.name(),
+                    email=fake.unique.email(),
+                    hashed_password='$fake_hash$',
+                )
+            )
+            for _ in range(3)
+        ]
+        await customer_repo_impl.add_favorites(customers[0].id, [2, 1])
+        await customer_repo_impl.add_favorites(customers[2].id, [3])
+
+        first_page = await customer_repo_impl.list_customers_with_favorites(
+            limit=2
+        )
+        assert [customer.id for customer in first_page] == [
+            customers[0].id,
+            customers[1].id,
+        ]
+        assert [
+            [favorite.product_id for favorite in customer.favorites]
+            for customer in first_page
+        ] == [[1, 2], []]
+        assert first_page[0].favorites[0].customer_id == customers[0].id
+
+        second_page = await customer_repo_impl.list_customers_with_favorites(
+            limit=2, after=first_page[-1].id
+        )
+        assert [customer.id for customer in second_page] == [customers[2].id]
+        assert [
+            favorite.product_id for favorite in second_page[0].favorites
+        ] == [3]
+
+    async def test_stream_customers_with_favorites(
+        self,
+        customer_repo_impl: CustomerRepository,
+        fake: Faker,
+    ):
+        """Testa a leitura dos clientes e favoritos por cursor."""
+        customers = [
+            await customer_repo_impl.create_customer(
+                CustomerWithPassword(
+                    name=fake.name(),
+                    email=fake.unique.email(),
+                    hashed_password='$fake_hash$',
+                )
+            )
+            for _ in range(3)
+        ]
+        await customer_repo_impl.add_favorites(customers[0].id, [2, 1])
+        await customer_repo_impl.add_favorites(customers[2].id, [3])
+
+        streamed = [
+            customer
+            async for customer in customer_repo_impl.stream_customers_with_favorites(
+                batch_size=2
+            )
+        ]
+        assert [customer.id for customer in streamed] == [
+            customer.id for customer in customers
+        ]
+        assert [
+            [favorite.product_id for favorite in customer.favorites]
+            for customer in streamed
+        ] == [[1, 2], [], [3]]
+
+        # Retomada após o primeiro cliente
+        resumed = [
+            customer.id
+            async for customer in customer_repo_impl.stream_customers_with_favorites(
+                after=customers[0].id
+            )
+        ]
+        assert resumed == [customers[1].id, customers[2].id]
+
+    async def test_token_version(
+        self,
+        customer_repo_impl: CustomerRepository,
+        customer_with_password: CustomerWithPassword,
+    ):
+        """Testa a versão dos tokens do cliente."""
+        customer = await customer_repo_impl.create_customer(
+            customer_with_password
+        )
+        assert await customer_repo_impl.get_token_version(customer.id) == 0
+        assert await customer_repo_impl.bump_token_version(customer.id) == 1
+        assert await customer_repo_impl.get_token_version(customer.id) == 1
+
+        with pytest.raises(CustomerNotFound):
+            await customer_repo_impl.get_token_version(customer.id + 1)
+        with pytest.raises(CustomerNotFound):
+            await customer_repo_impl.bump_token_version(customer.id + 1)
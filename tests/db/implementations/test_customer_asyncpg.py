@@ -0,0 +1,57 @@
+from typing import AsyncIterator
+
+import asyncpg
+import pytest
+
+from aiqfav.db.implementations.customer_asyncpg import (
+    CustomerRepositoryAsyncpg,
+)
+
+from . import test_customer
+
+
+@pytest.mark.asyncio
+class TestCustomerRepositoryAsyncpg(test_customer.TestCustomerRepositoryImpl):
+    """Executa os mesmos testes do repositório ORM na implementação asyncpg"""
+
+    @pytest.fixture
+    async def customer_repo_impl(
+        self, temp_db_url: str
+    ) -> AsyncIterator[CustomerRepositoryAsyncpg]:
+        repository = CustomerRepositoryAsyncpg(
+            temp_db_url.replace('postgresql+asyncpg', 'postgresql')
+        )
+        yield repository
+        await repository.aclose()
+
+    async def test_pool_timeout(self, temp_db_url: str):
+        repository = CustomerRepositoryAsyncpg(
+            temp_db_url.replace('postgresql+asyncpg', 'postgresql'),
+            pool_timeout=0.1,
+            min_size=0,
+            max_size=1,
+        )
+        # A única conexão do pool está em uso
+        async with repository._acquire():
+            assert repository.pool_stats()['checked_out'] == 1
+            with pytest.raises(TimeoutError):
+                await repository.list_customers()
+
+        assert repository.pool_stats()['checked_out'] == 0
+        await repository.aclose()
+
+    async def test_pre_ping_replaces_closed_connections(
+        self, temp_db_url: str
+    ):
+        dsn = temp_db_url.replace('postgresql+asyncpg', 'postgresql')
+        repository = CustomerRepositoryAsyncpg(dsn, pre_ping=True)
+        async with repository._acquire() as conn:
+            pid = conn.get_server_pid()
+
+        # O servidor encerra a conexão que está no pool
+        other = await asyncpg.connect(dsn)
+        await other.execute('SELECT pg_terminate_backend($1)', pid)
+        await other.close()
+
+        assert await repository.list_customers() == []
+        await repository.aclose()
@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+
+from aiqfav.db.base import CustomerRepository
+from aiqfav.db.batching import BatchingCustomerRepository
+from aiqfav.domain.customer import (
+    CustomerInDb,
+    CustomerNotFound,
+    CustomerWithPassword,
+)
+from tests._mocks.customer_repo import CustomerRepositoryMock
+
+
+class CountingCustomerRepositoryMock(CustomerRepositoryMock):
+    def __init__(self):
+        super().__init__()
+        self.batches: list[list[int]] = []
+
+    async def get_customers_by_ids(self, ids: list[int]) -> list[CustomerInDb]:
+        self.batches.append(ids)
+        return await super().get_customers_by_ids(ids)
+
+
+@pytest.mark.asyncio
+class TestBatchingCustomerRepository:
+    async def test_concurrent_lookups_share_one_query(self):
+        inner_repo = CountingCustomerRepositoryMock()
+        customers = [
+            await inner_repo.create_customer(
+                CustomerWithPassword(
+                    name=f'Customer {i}',
+                    email=f'customer{i}@example.com',
+                    hashed_password='hashed',
+                )
+            )
+            for i in range(3)
+        ]
+        repo = BatchingCustomerRepository(inner_repo)
+
+        results = await asyncio.gather(
+            *(repo.get_customer(id=customer.id) for customer in customers),
+            repo.get_customer(id=9999),
+            return_exceptions=True,
+        )
+
+        assert results[:3] == customers
+        assert isinstance(results[3], CustomerNotFound)
+        assert inner_repo.batches == [[1, 2, 3, 9999]]
+
+    async def test_large_id_does_not_fail_the_batch(
+        self,
+        customer_repo_impl: CustomerRepository,
+    ):
+        customer = await customer_repo_impl.create_customer(
+            CustomerWithPassword(
+                name='Customer',
+                email='customer@example.com',
+                hashed_password='hashed',
+            )
+        )
+        repo = BatchingCustomerRepository(customer_repo_impl)
+
+        # Um ID acima do limite de int32 no mesmo lote que um ID válido
+        results = await asyncio.gather(
+            repo.get_customer(id=customer.id),
+            repo.get_customer(id=3_000_000_000),
+            return_exceptions=True,
+        )
+
+        assert results[0] == customer
+        assert isinstance(results[1], CustomerNotFound)
+        assert repo.loader.batches == 1
@@ -0,0 +1,105 @@
+import pytest
+
+from aiqfav.db.identity_map import IdentityMapCustomerRepository
+from aiqfav.domain.customer import CustomerInDb, CustomerWithPassword
+from aiqfav.utils.request_context import request_context
+from tests._mocks.customer_repo import CustomerRepositoryMock
+
+
+class CountingCustomerRepositoryMock(CustomerRepositoryMock):
+    def __init__(self):
+        super().__init__()
+        self.get_customer_calls = 0
+
+    async def get_customer(
+        self, *, email: str | None = None, id: int | None = None
+    ) -> CustomerInDb:
+        self.get_customer_calls += 1
+        return await super().get_customer(email=email, id=id)
+
+
+@pytest.fixture
+def inner_repo() -> CountingCustomerRepositoryMock:
+    return CountingCustomerRepositoryMock()
+
+
+@pytest.fixture
+async def customer(
+    inner_repo: CountingCustomerRepositoryMock,
+) -> CustomerInDb:
+    return await inner_repo.create_customer(
+        CustomerWithPassword(
+            name='John Doe',
+            email='john@example.com',
+            hashed_password='hashed',
+        )
+    )
+
+
+@pytest.mark.asyncio
+class TestIdentityMapCustomerRepository:
+    async def test_loads_customer_once_per_request(
+        self,
+        inner_repo: CountingCustomerRepositoryMock,
+        customer: CustomerInDb,
+    ):
+        repo = IdentityMapCustomerRepository(inner_repo)
+
+        with request_context() as context:
+            assert await repo.get_customer(id=customer.id) == customer
+            assert await repo.get_customer(id=customer.id) == customer
+            # Also mapped by email
+            assert await repo.get_customer(email=customer.email) == customer
+
+        assert inner_repo.get_customer_calls == 1
+        assert context.identity_map
+
+        # A new request starts with an empty map
+        with request_context():
+            await repo.get_customer(id=customer.id)
+
+        assert inner_repo.get_customer_calls == 2
+
+    async def test_passes_through_outside_a_request(
+        self,
+        inner_repo: CountingCustomerRepositoryMock,
+        customer: CustomerInDb,
+    ):
+        repo = IdentityMapCustomerRepository(inner_repo)
+
+        await repo.get_customer(id=customer.id)
+        await repo.get_customer(id=customer.id)
+
+        assert inner_repo.get_customer_calls == 2
+
+    async def test_writes_evict_the_customer(
+        self,
+        inner_repo: CountingCustomerRepositoryMock,
+        customer: CustomerInDb,
+    ):
+        repo = IdentityMapCustomerRepository(inner_repo)
+
+        with request_context() as context:
+            await repo.get_customer(id=customer.id)
+            await repo.update_hashed_password(customer.id, 'new-hash')
+            assert context.identity_map == {}
+
+            await repo.get_customer(email=customer.email)
+            await repo.delete_customer(customer.id)
+            assert context.identity_map == {}
+
+        assert inner_repo.get_customer_calls == 2
+
+    async def test_set_admin_maps_the_updated_customer(
+        self,
+        inner_repo: CountingCustomerRepositoryMock,
+        customer: CustomerInDb,
+    ):
+        repo = IdentityMapCustomerRepository(inner_repo)
+
+        with request_context():
+            await repo.set_admin(customer.id)
+            customer_in_db = await repo.get_customer(id=customer.id)
+
+        assert customer_in_db.is_admin
+        assert inner_repo.get_customer_calls == 0
@@ -0,0 +1,27 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from aiqfav.db.pool import PoolStats
+
+
+@pytest.mark.asyncio
+class TestPoolStats:
+    async def test_counts_checkouts_and_reuses_connections(
+        self, temp_db_url: str
+    ):
+        engine = create_async_engine(temp_db_url, pool_size=2)
+        pool_stats = PoolStats(engine)
+
+        for _ in range(3):
+            async with engine.connect() as conn:
+                await conn.execute(text('SELECT 1'))
+                assert pool_stats.as_dict()['checked_out'] == 1
+
+        stats = pool_stats.as_dict()
+        assert stats['connects'] == 1
+        assert stats['checkouts'] == 3
+        assert stats['checkins'] == 3
+        assert stats['checked_out'] == 0
+
+        await engine.dispose()
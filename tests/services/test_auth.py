@@ -1,7 +1,10 @@
 import pytest
 from faker import Faker
+from passlib.context import CryptContext
 
 from aiqfav.adapters.base import JwtAdapter
+from aiqfav.adapters.password_hasher import PasswordHasherImpl
+from aiqfav.adapters.token_versions import TokenVersionStore
 from aiqfav.db.base import CustomerRepository
 from aiqfav.domain.customer import (
     CustomerCreate,
@@ -11,6 +14,7 @@ from aiqfav.services.auth import AuthService
 from aiqfav.services.auth.exceptions import InvalidToken
 from aiqfav.services.customer import CustomerService
 from aiqfav.services.customer.exceptions import InvalidCredentials
+from tests._mocks.redis import RedisMock
 
 
 @pytest.mark.asyncio
@@ -53,6 +57,32 @@ class TestAuthService:
         assert jwt_adapter.decode(access, audience=['access']) is not None
         assert jwt_adapter.decode(refresh, audience=['refresh']) is not None
 
+    async def test_pair_tokens_rehashes_outdated_password(
+        self,
+        auth_service: AuthService,
+        customer_and_password: tuple[CustomerInDb, str],
+        customer_repo: CustomerRepository,
+    ):
+        customer_in_db, password = customer_and_password
+        hashed_password = customer_in_db.hashed_password
+        auth_service.password_hasher = PasswordHasherImpl(
+            CryptContext(schemes=['argon2'], argon2__time_cost=4)
+        )
+
+        await auth_service.pair_tokens(
+            email=customer_in_db.email, password=password
+        )
+
+        customer = await customer_repo.get_customer(id=customer_in_db.id)
+        assert customer.hashed_password != hashed_password
+        assert ',t=4,' in customer.hashed_password
+
+        # The new hash is used on the next login
+        await auth_service.pair_tokens(
+            email=customer_in_db.email, password=password
+        )
+        auth_service.password_hasher.shutdown()
+
     async def test_pair_tokens_invalid_email(
         self,
         auth_service: AuthService,
@@ -93,7 +123,7 @@ class TestAuthService:
         )
         assert customer_id == customer_in_db.id
 
-        new_access, new_refresh = auth_service.refresh_token(refresh)
+        new_access, new_refresh = await auth_service.refresh_token(refresh)
         assert new_access is not None
         assert new_refresh is not None
         assert isinstance(new_access, str)
@@ -125,3 +155,53 @@ class TestAuthService:
             auth_service.get_customer_id_from_token(
                 refresh, token_type='access'
             )
+
+    async def test_stateless_tokens(
+        self,
+        auth_service: AuthService,
+        customer_and_password: tuple[CustomerInDb, str],
+        customer_service: CustomerService,
+        redis_mock: RedisMock,
+    ):
+        customer_in_db, password = customer_and_password
+        auth_service.token_versions = TokenVersionStore(
+            redis_mock, auth_service.customer_repo
+        )
+        auth_service.stateless = True
+
+        access, refresh = await auth_service.pair_tokens(
+            email=customer_in_db.email,
+            password=password,
+        )
+        customer = await auth_service.get_customer_from_token(access)
+        assert customer.id == customer_in_db.id
+        assert customer.email == customer_in_db.email
+        assert not customer.is_admin
+
+        # Becoming admin revokes the tokens issued so far...
+        await customer_service.set_admin(customer_in_db.id)
+        with pytest.raises(InvalidToken):
+            await auth_service.get_customer_from_token(access)
+        with pytest.raises(InvalidToken):
+            await auth_service.refresh_token(refresh)
+
+        # ...even if the cached version is evicted from Redis
+        await redis_mock.delete(f'token_version:{customer_in_db.id}')
+        with pytest.raises(InvalidToken):
+            await auth_service.get_customer_from_token(access)
+
+        # ...and the new ones carry the admin claim
+        access, refresh = await auth_service.pair_tokens(
+            email=customer_in_db.email,
+            password=password,
+        )
+        access, _ = await auth_service.refresh_token(refresh)
+        customer = await auth_service.get_customer_from_token(access)
+        assert customer.is_admin
+
+        await customer_service.delete_customer(customer_in_db.id)
+        with pytest.raises(InvalidToken):
+            await auth_service.get_customer_from_token(access)
+        await redis_mock.delete(f'token_version:{customer_in_db.id}')
+        with pytest.raises(InvalidToken):
+            await auth_service.get_customer_from_token(access)
@@ -0,0 +1,79 @@
+import httpx
+import pytest
+
+from aiqfav.adapters.base import StoreApiAdapter
+from aiqfav.adapters.exceptions import StoreApiUnavailableError
+from aiqfav.services.catalog import CatalogSyncService
+from tests._mocks.httpx import HttpxAsyncClientMock
+from tests._mocks.redis import RedisMock
+
+PRODUCTS = [
+    {
+        'id': product_id,
+        'title': f'Product {product_id}',
+        'price': 10.0 * product_id,
+        'image': 'https://via.placeholder.com/150',
+    }
+    for product_id in (1, 2, 3)
+]
+
+
+@pytest.mark.asyncio
+class TestCatalogSyncService:
+    async def test_sync_once_holds_lease(
+        self,
+        store_api_adapter: StoreApiAdapter,
+        client_mock: HttpxAsyncClientMock,
+        redis_mock: RedisMock,
+    ):
+        client_mock.get.return_value = httpx.Response(
+            status_code=200, json=PRODUCTS
+        )
+
+        catalog_sync = CatalogSyncService(store_api_adapter, redis_mock)
+        assert await catalog_sync.sync_once()
+        assert await redis_mock.get('product:1')
+
+        # Another worker doesn't sync while the lease is held
+        other_catalog_sync = CatalogSyncService(store_api_adapter, redis_mock)
+        assert not await other_catalog_sync.sync_once()
+
+        assert client_mock.get.call_count == 1
+
+    async def test_sync_once_releases_lease_on_failure(
+        self,
+        store_api_adapter: StoreApiAdapter,
+        client_mock: HttpxAsyncClientMock,
+        redis_mock: RedisMock,
+    ):
+        client_mock.get.side_effect = httpx.ConnectError('unavailable')
+
+        catalog_sync = CatalogSyncService(store_api_adapter, redis_mock)
+        with pytest.raises(StoreApiUnavailableError):
+            await catalog_sync.sync_once()
+
+        assert await redis_mock.get('lease:catalog_sync') is None
+
+    async def test_sync_rewrites_only_changed_products(
+        self,
+        store_api_adapter: StoreApiAdapter,
+        client_mock: HttpxAsyncClientMock,
+    ):
+        client_mock.get.return_value = httpx.Response(
+            status_code=200, json=PRODUCTS
+        )
+        assert await store_api_adapter.sync_catalog() == 3
+
+        changed_products = [
+            {**PRODUCTS[0], 'price': 5.0},
+            PRODUCTS[1],
+            {**PRODUCTS[1], 'id': 4},
+        ]
+        client_mock.get.return_value = httpx.Response(
+            status_code=200, json=changed_products
+        )
+        # Product 1 changed, 3 was removed and 4 was added
+        assert await store_api_adapter.sync_catalog() == 3
+
+        product = await store_api_adapter.get_product(1)
+        assert product.price == 5.0
@@ -1,7 +1,11 @@
+import json
+from unittest.mock import patch
+
 import httpx
 import pytest
 from faker import Faker
 
+from aiqfav.adapters.exceptions import StoreApiNotFoundError
 from aiqfav.db.base import CustomerRepository
 from aiqfav.domain.customer import (
     CustomerCreate,
@@ -10,7 +14,10 @@ from aiqfav.domain.customer import (
 )
 from aiqfav.services.customer import CustomerService
 from aiqfav.services.customer.exceptions import EmailAlreadyExists
+from aiqfav.utils.background import wait_background_tasks
+from aiqfav.utils.cache import CacheEntry, TTLCache
 from tests._mocks.httpx import HttpxAsyncClientMock
+from tests._mocks.redis import RedisMock
 
 
 @pytest.mark.asyncio
@@ -64,6 +71,31 @@ class TestCustomerService:
         assert customer.name == customer_in_db.name
         assert customer.email == customer_in_db.email
 
+    async def test_get_customer_by_id_local_cache(
+        self,
+        customer_service: CustomerService,
+        customer_with_password: CustomerWithPassword,
+        customer_repo: CustomerRepository,
+        redis_mock: RedisMock,
+    ):
+        customer_service.local_cache = TTLCache(maxsize=10, ttl=60)
+        customer_in_db = await customer_repo.create_customer(
+            customer_with_password
+        )
+        await customer_service.get_customer_by_id(customer_in_db.id)
+
+        # Second call should be served from memory, without calling Redis
+        with patch.object(redis_mock, 'get', wraps=redis_mock.get) as get:
+            customer = await customer_service.get_customer_by_id(
+                customer_in_db.id
+            )
+        get.assert_not_called()
+        assert customer.id == customer_in_db.id
+
+        await customer_service.delete_customer(customer_in_db.id)
+        with pytest.raises(CustomerNotFound):
+            await customer_service.get_customer_by_id(customer_in_db.id)
+
     async def test_list_customers(
         self,
         customer_service: CustomerService,
@@ -73,28 +105,91 @@ class TestCustomerService:
         customer_in_db = await customer_repo.create_customer(
             customer_with_password
         )
-        customers = await customer_service.list_customers()
-        assert len(customers) == 1
-        assert customers[0].id == customer_in_db.id
-        assert customers[0].name == customer_in_db.name
-        assert customers[0].email == customer_in_db.email
+        page = await customer_service.list_customers()
+        assert len(page.customers) == 1
+        assert page.customers[0].id == customer_in_db.id
+        assert page.customers[0].name == customer_in_db.name
+        assert page.customers[0].email == customer_in_db.email
+        assert page.next_after is None
+
+    async def test_list_customers_pagination(
+        self,
+        customer_service: CustomerService,
+        customer_repo: CustomerRepository,
+        fake: Faker,
+    ):
+        for _ in range(5):
+            await customer_repo.create_customer(
+                CustomerWithPassword(
+                    name=fake.name(),
+                    email=fake.unique.email(),
+                    hashed_password='hashed',
+                )
+            )
+
+        pages, after = [], None
+        while True:
+            page = await customer_service.list_customers(limit=2, after=after)
+            pages.append([customer.id for customer in page.customers])
+            if (after := page.next_after) is None:
+                break
+
+        assert pages == [[1, 2], [3, 4], [5]]
+
+    async def test_list_customers_with_favorites(
+        self,
+        customer_service: CustomerService,
+        customer_repo: CustomerRepository,
+        fake: Faker,
+    ):
+        customers = [
+            await customer_repo.create_customer(
+                CustomerWithPassword(
+                    name=fake.name(),
+                    email=fake.unique.email(),
+                    hashed_password='hashed',
+                )
+            )
+            for _ in range(3)
+        ]
+        await customer_repo.add_favorites(customers[1].id, [1, 2])
+
+        page = await customer_service.list_customers_with_favorites(limit=2)
+        assert [customer.id for customer in page.customers] == [1, 2]
+        assert [
+            favorite.product_id for favorite in page.customers[1].favorites
+        ] == [1, 2]
+        assert page.next_after == 2
+
+        page = await customer_service.list_customers_with_favorites(
+            limit=2, after=page.next_after
+        )
+        assert [customer.id for customer in page.customers] == [3]
+        assert page.next_after is None
 
     async def test_list_customers_cache(
         self,
         customer_service: CustomerService,
         customer_with_password: CustomerWithPassword,
+        customer_create: CustomerCreate,
         customer_repo: CustomerRepository,
     ):
         customer_in_db = await customer_repo.create_customer(
             customer_with_password
         )
-        customers = await customer_service.list_customers()
-        customers = await customer_service.list_customers()
+        await customer_service.list_customers()
 
-        assert len(customers) == 1
-        assert customers[0].id == customer_in_db.id
-        assert customers[0].name == customer_in_db.name
-        assert customers[0].email == customer_in_db.email
+        # Bypass the service: the cached page is served
+        await customer_repo.delete_customer(customer_in_db.id)
+        page = await customer_service.list_customers()
+        assert [customer.id for customer in page.customers] == [
+            customer_in_db.id
+        ]
+
+        # Creating a customer invalidates every cached page
+        customer = await customer_service.create_customer(customer_create)
+        page = await customer_service.list_customers()
+        assert [customer.id for customer in page.customers] == [customer.id]
 
     async def test_create_customer(
         self,
@@ -188,6 +283,182 @@ class TestCustomerService:
         )
         assert len(favorites) == 0
 
+    async def test_customer_profile(
+        self,
+        customer_service: CustomerService,
+        client_mock: HttpxAsyncClientMock,
+        customer_with_password: CustomerWithPassword,
+        customer_repo: CustomerRepository,
+    ):
+        def product_response(url: str) -> httpx.Response:
+            product_id = int(url.rsplit('/', 1)[1])
+            return httpx.Response(
+                status_code=200,
+                json={
+                    'id': product_id,
+                    'title': f'Product {product_id}',
+                    'price': 100.0,
+                    'image': 'https://via.placeholder.com/150',
+                },
+            )
+
+        client_mock.get.side_effect = product_response
+        customer_in_db = await customer_repo.create_customer(
+            customer_with_password
+        )
+        customer = await customer_service.get_customer_by_id(customer_in_db.id)
+        await customer_service.add_favorites(customer.id, [1, 2])
+
+        profile = await customer_service.get_customer_profile(customer)
+        assert profile.id == customer.id
+        assert profile.email == customer.email
+        assert profile.favorites is not None
+        assert [product.id for product in profile.favorites] == [1, 2]
+
+        # Os favoritos vêm do cache: uma alteração direta no banco não é
+        # vista, e o cliente já resolvido não é buscado de novo
+        await customer_repo.add_favorite(customer.id, 3)
+        with patch.object(
+            customer_repo, 'get_customer', wraps=customer_repo.get_customer
+        ) as get_customer:
+            profile = await customer_service.get_customer_profile(customer)
+        get_customer.assert_not_called()
+        assert profile.favorites is not None
+        assert [product.id for product in profile.favorites] == [1, 2]
+
+        # Alterar os favoritos invalida o cache
+        await customer_service.remove_favorite(customer.id, 1)
+        profile = await customer_service.get_customer_profile(customer)
+        assert profile.favorites is not None
+        assert [product.id for product in profile.favorites] == [2, 3]
+
+        with pytest.raises(CustomerNotFound):
+            await customer_service.get_customer_profile(
+                customer.model_copy(update={'id': customer.id + 1})
+            )
+
+    async def test_bulk_favorites(
+        self,
+        customer_service: CustomerService,
+        client_mock: HttpxAsyncClientMock,
+        customer_with_password: CustomerWithPassword,
+        customer_repo: CustomerRepository,
+    ):
+        def product_response(url: str) -> httpx.Response:
+            product_id = int(url.rsplit('/', 1)[1])
+            if product_id > 3:
+                return httpx.Response(status_code=200, content=b'')
+            return httpx.Response(
+                status_code=200,
+                json={
+                    'id': product_id,
+                    'title': f'Product {product_id}',
+                    'price': 100.0,
+                    'image': 'https://via.placeholder.com/150',
+                },
+            )
+
+        client_mock.get.side_effect = product_response
+        customer = await customer_repo.create_customer(customer_with_password)
+        # Cacheia a lista vazia, para verificar a invalidação
+        await customer_service.list_favorites_for_customer(customer.id)
+
+        products = await customer_service.add_favorites(
+            customer.id, [1, 2, 3, 2]
+        )
+        assert [product.id for product in products] == [1, 2, 3]
+        favorites = await customer_service.list_favorites_for_customer(
+            customer.id
+        )
+        assert [favorite.id for favorite in favorites] == [1, 2, 3]
+
+        # Nenhum produto é adicionado se algum não existe
+        with pytest.raises(StoreApiNotFoundError):
+            await customer_service.add_favorites(customer.id, [1, 4])
+
+        # O cliente é validado antes de consultar a API da loja
+        client_mock.get.reset_mock()
+        with pytest.raises(CustomerNotFound):
+            await customer_service.add_favorites(customer.id + 1, [5])
+        client_mock.get.assert_not_called()
+
+        await customer_service.remove_favorites(customer.id, [1, 3])
+        favorites = await customer_service.list_favorites_for_customer(
+            customer.id
+        )
+        assert [favorite.id for favorite in favorites] == [2]
+
+    async def test_favorites_for_customer_stale_while_revalidate(
+        self,
+        customer_service: CustomerService,
+        client_mock: HttpxAsyncClientMock,
+        customer_with_password: CustomerWithPassword,
+        customer_repo: CustomerRepository,
+    ):
+        client_mock.get.return_value = httpx.Response(
+            status_code=200,
+            json={
+                'id': 1,
+                'title': 'Product 1',
+                'price': 100.0,
+                'image': 'https://via.placeholder.com/150',
+            },
+        )
+        customer = await customer_repo.create_customer(customer_with_password)
+
+        # Every cached list is already stale
+        customer_service.favorites_cache_soft_expiration = 0
+        favorites = await customer_service.list_favorites_for_customer(
+            customer.id
+        )
+        assert len(favorites) == 0
+
+        # Bypass the service, so the cached list is not invalidated
+        await customer_repo.add_favorite(customer.id, 1)
+
+        # The stale list is served and refreshed in background
+        favorites = await customer_service.list_favorites_for_customer(
+            customer.id
+        )
+        assert len(favorites) == 0
+        await wait_background_tasks()
+
+        favorites = await customer_service.list_favorites_for_customer(
+            customer.id
+        )
+        assert [favorite.id for favorite in favorites] == [1]
+        await wait_background_tasks()
+
+    async def test_favorites_for_customer_legacy_cache_format(
+        self,
+        customer_service: CustomerService,
+        client_mock: HttpxAsyncClientMock,
+        customer_with_password: CustomerWithPassword,
+        customer_repo: CustomerRepository,
+        redis_mock: RedisMock,
+    ):
+        client_mock.get.return_value = httpx.Response(
+            status_code=200,
+            json={
+                'id': 1,
+                'title': 'Product 1',
+                'price': 100.0,
+                'image': 'https://via.placeholder.com/150',
+            },
+        )
+        customer = await customer_repo.create_customer(customer_with_password)
+        await customer_repo.add_favorite(customer.id, 1)
+        # List cached before CacheEntry, without the envelope
+        await redis_mock.set(f'favorites:{customer.id}', json.dumps([]))
+
+        favorites = await customer_service.list_favorites_for_customer(
+            customer.id
+        )
+        assert [favorite.id for favorite in favorites] == [1]
+
+        cached_data = await redis_mock.get(f'favorites:{customer.id}')
+        assert cached_data and CacheEntry.loads(cached_data) is not None
+
     async def test_check_email_valid(
         self,
         customer_with_password: CustomerWithPassword,
@@ -0,0 +1,79 @@
+import json
+
+import pytest
+
+from aiqfav.db.base import CustomerRepository
+from aiqfav.domain.customer import CustomerWithPassword
+from aiqfav.services.export import ExportFormat, ExportService
+
+
+@pytest.mark.asyncio
+class TestExportService:
+    @pytest.fixture
+    async def customer_ids(
+        self, customer_repo: CustomerRepository
+    ) -> list[int]:
+        ids = []
+        for name in ['Ana, a primeira', 'Bruno']:
+            customer = await customer_repo.create_customer(
+                CustomerWithPassword(
+                    name=name,
+                    email=f'{name[:3].lower()}@example.com',
+                    hashed_password='hashed',
+                )
+            )
+            ids.append(customer.id)
+        await customer_repo.add_favorites(ids[0], [1, 2])
+        return ids
+
+    async def test_export_ndjson(
+        self, customer_repo: CustomerRepository, customer_ids: list[int]
+    ):
+        export_service = ExportService(customer_repo)
+
+        lines = [
+            json.loads(line)
+            async for line in export_service.export_customers(
+                ExportFormat.NDJSON
+            )
+        ]
+
+        assert lines == [
+            {
+                'id': customer_ids[0],
+                'name': 'Ana, a primeira',
+                'email': 'ana@example.com',
+                'favorite_product_ids': [1, 2],
+            },
+            {
+                'id': customer_ids[1],
+                'name': 'Bruno',
+                'email': 'bru@example.com',
+                'favorite_product_ids': [],
+            },
+        ]
+
+    async def test_export_csv(
+        self, customer_repo: CustomerRepository, customer_ids: list[int]
+    ):
+        export_service = ExportService(customer_repo)
+
+        lines = [
+            line
+            async for line in export_service.export_customers(ExportFormat.CSV)
+        ]
+
+        assert lines == [
+            'id,name,email,favorite_product_ids\n',
+            f'{customer_ids[0]},"Ana, a primeira",ana@example.com,1;2\n',
+            f'{customer_ids[1]},Bruno,bru@example.com,\n',
+        ]
+
+        # A exportação retomada não repete o cabeçalho
+        lines = [
+            line
+            async for line in export_service.export_customers(
+                ExportFormat.CSV, after=customer_ids[0]
+            )
+        ]
+        assert lines == [f'{customer_ids[1]},Bruno,bru@example.com,\n']
@@ -0,0 +1,38 @@
+import pytest
+
+from aiqfav.container import Container
+
+
+@pytest.mark.asyncio
+class TestContainer:
+    async def test_services_share_adapters(self):
+        container = Container()
+
+        customer_service = container.customer_service
+        assert customer_service.customer_repo is container.customer_repository
+        assert customer_service.store_api_adapter is (
+            container.store_api_adapter
+        )
+        assert container.auth_service.password_hasher is (
+            container.password_hasher
+        )
+
+        await container.aclose()
+
+    async def test_asyncpg_repository(self, monkeypatch: pytest.MonkeyPatch):
+        monkeypatch.setenv('DB_REPOSITORY', 'asyncpg')
+        container = Container()
+
+        repository = container.customer_repository_asyncpg
+        assert repository is not None
+        # Sem um segundo pool, do SQLAlchemy
+        assert container.db_engine is None
+        assert container.async_session is None
+        assert repository.pool_timeout == 30
+        assert repository.pre_ping
+
+        customers = await container.customer_repository.list_customers()
+        assert customers == []
+        assert repository.pool_stats()['checked_out'] == 0
+
+        await container.aclose()
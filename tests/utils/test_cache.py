@@ -0,0 +1,55 @@
+from aiqfav.utils.cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestTTLCache:
+    def test_get_and_set(self):
+        cache = TTLCache[str](maxsize=2, ttl=10)
+
+        assert cache.get('a') is None
+        cache.set('a', 'value')
+        assert cache.get('a') == 'value'
+
+        assert cache.stats.hits == 1
+        assert cache.stats.misses == 1
+
+    def test_expires_after_ttl(self):
+        clock = FakeClock()
+        cache = TTLCache[str](maxsize=2, ttl=10, clock=clock)
+        cache.set('a', 'value')
+
+        clock.now = 9.9
+        assert cache.get('a') == 'value'
+
+        clock.now = 10
+        assert cache.get('a') is None
+        assert len(cache) == 0
+
+    def test_evicts_least_recently_used(self):
+        cache = TTLCache[str](maxsize=2, ttl=10)
+        cache.set('a', 'a')
+        cache.set('b', 'b')
+
+        # 'a' becomes the most recently used
+        cache.get('a')
+        cache.set('c', 'c')
+
+        assert cache.get('b') is None
+        assert cache.get('a') == 'a'
+        assert cache.get('c') == 'c'
+        assert cache.stats.evictions == 1
+
+    def test_delete(self):
+        cache = TTLCache[str](maxsize=2, ttl=10)
+        cache.set('a', 'a')
+        cache.delete('a')
+        cache.delete('missing')
+
+        assert cache.get('a') is None
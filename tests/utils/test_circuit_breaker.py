@@ -0,0 +1,69 @@
+import pytest
+
+from aiqfav.utils.circuit_breaker import (
+    CircuitBreaker,
+    CircuitOpenError,
+    CircuitState,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+async def fail():
+    raise ConnectionError('unavailable')
+
+
+async def succeed():
+    return 'ok'
+
+
+@pytest.mark.asyncio
+class TestCircuitBreaker:
+    async def test_opens_after_consecutive_failures(self):
+        breaker = CircuitBreaker('test', failure_threshold=2)
+
+        with pytest.raises(ConnectionError):
+            await breaker.call(fail)
+        assert breaker.state is CircuitState.CLOSED
+
+        with pytest.raises(ConnectionError):
+            await breaker.call(fail)
+        assert breaker.state is CircuitState.OPEN
+
+        with pytest.raises(CircuitOpenError):
+            await breaker.call(succeed)
+        assert breaker.total_rejections == 1
+
+    async def test_expected_errors_do_not_open(self):
+        breaker = CircuitBreaker('test', failure_threshold=1)
+
+        with pytest.raises(ConnectionError):
+            await breaker.call(fail, is_failure=lambda _: False)
+
+        assert breaker.state is CircuitState.CLOSED
+
+    async def test_half_open_probe(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(
+            'test', failure_threshold=1, recovery_timeout=10, clock=clock
+        )
+        with pytest.raises(ConnectionError):
+            await breaker.call(fail)
+
+        # A failed probe opens the circuit again
+        clock.now = 10
+        assert breaker.state is CircuitState.HALF_OPEN
+        with pytest.raises(ConnectionError):
+            await breaker.call(fail)
+        assert breaker.state is CircuitState.OPEN
+
+        # A successful probe closes it
+        clock.now = 20
+        assert await breaker.call(succeed) == 'ok'
+        assert breaker.state is CircuitState.CLOSED
@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+
+from aiqfav.utils.dataloader import DataLoader
+
+
+class BatchFnMock:
+    def __init__(self, fail: bool = False):
+        self.batches: list[list[int]] = []
+        self.fail = fail
+
+    async def __call__(self, keys: list[int]) -> dict[int, str]:
+        self.batches.append(keys)
+        if self.fail:
+            raise RuntimeError('boom')
+        # Chaves negativas não existem
+        return {key: f'value-{key}' for key in keys if key > 0}
+
+
+@pytest.mark.asyncio
+class TestDataLoader:
+    async def test_batches_concurrent_loads(self):
+        batch_fn = BatchFnMock()
+        loader = DataLoader(batch_fn)
+
+        results = await asyncio.gather(
+            loader.load(1), loader.load(2), loader.load(1), loader.load(-1)
+        )
+
+        assert results == ['value-1', 'value-2', 'value-1', None]
+        # Uma única chamada, sem chaves repetidas
+        assert batch_fn.batches == [[1, 2, -1]]
+        assert loader.as_dict()['loads'] == 4
+        assert loader.as_dict()['batches'] == 1
+
+    async def test_sequential_loads_are_not_batched(self):
+        batch_fn = BatchFnMock()
+        loader = DataLoader(batch_fn)
+
+        assert await loader.load(1) == 'value-1'
+        assert await loader.load(2) == 'value-2'
+
+        assert batch_fn.batches == [[1], [2]]
+
+    async def test_batch_window(self):
+        batch_fn = BatchFnMock()
+        loader = DataLoader(batch_fn, batch_window=0.01)
+
+        async def load_later(key: int) -> str | None:
+            await asyncio.sleep(0.001)
+            return await loader.load(key)
+
+        await asyncio.gather(loader.load(1), load_later(2))
+
+        assert batch_fn.batches == [[1, 2]]
+
+    async def test_max_batch_size(self):
+        batch_fn = BatchFnMock()
+        loader = DataLoader(batch_fn, max_batch_size=2)
+
+        await asyncio.gather(*(loader.load(key) for key in range(1, 6)))
+
+        assert batch_fn.batches == [[1, 2], [3, 4], [5]]
+
+    async def test_failure_is_raised_to_every_caller(
+        self, caplog: pytest.LogCaptureFixture
+    ):
+        loader = DataLoader(BatchFnMock(fail=True))
+
+        results = await asyncio.gather(
+            loader.load(1), loader.load(2), return_exceptions=True
+        )
+
+        assert all(isinstance(result, RuntimeError) for result in results)
+        # Registrado uma única vez, com as chaves do lote
+        errors = [r for r in caplog.records if r.levelname == 'ERROR']
+        assert len(errors) == 1
+        assert errors[0].getMessage() == (
+            'Failed to load a batch of 2 keys: [1, 2]'
+        )